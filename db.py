@@ -1,9 +1,19 @@
 import sqlite3
 import os
+import json
 from datetime import datetime
 from typing import Dict, Optional
 
 
+def _ensure_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> bool:
+    """Add a column to an existing table if it is missing (lightweight migration). True if added."""
+    cols = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+    if column not in cols:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {decl}')
+        return True
+    return False
+
+
 def init_db(db_path: str) -> sqlite3.Connection:
     """
     Initialize SQLite database and create the posts table.
@@ -39,9 +49,19 @@ def init_db(db_path: str) -> sqlite3.Connection:
             error_message TEXT,
             dm_thread TEXT,
             local_path TEXT,
+            duration_ms INTEGER,         -- wall time of the download (pacing forecasts)
+            account TEXT,                -- rotation account that downloaded it (NULL = default)
+            attempts INTEGER DEFAULT 0,  -- failed attempts since the last success
+            terminal INTEGER DEFAULT 0,  -- 1 when the post is gone (deleted/private), never retried
             UNIQUE(shortcode, source)
         )
     ''')
+    _ensure_column(conn, 'posts', 'duration_ms', 'INTEGER')
+    _ensure_column(conn, 'posts', 'account', 'TEXT')
+    _ensure_column(conn, 'posts', 'attempts', 'INTEGER DEFAULT 0')
+    if _ensure_column(conn, 'posts', 'terminal', 'INTEGER DEFAULT 0'):
+        # Older databases only have the message of a deleted/private post
+        conn.execute("UPDATE posts SET terminal = 1 WHERE status = 'failed' AND error_message = 'Deleted/private/unavailable'")
     
     # Create index on shortcode for faster lookups
     conn.execute('''
@@ -61,6 +81,52 @@ def init_db(db_path: str) -> sqlite3.Connection:
         ON posts(source, dm_thread)
     ''')
     
+    # Per-account/source high-water marks for incremental re-export processing
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS watermarks (
+            account TEXT NOT NULL,           -- dump account key (dump name without date)
+            source TEXT NOT NULL,            -- 'dm' | 'saved' | 'liked'
+            scope TEXT NOT NULL DEFAULT '',  -- DM thread name, '' for whole source
+            max_timestamp_ms INTEGER NOT NULL,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY(account, source, scope)
+        )
+    ''')
+    
+    # Per-username profile crawl watermarks (incremental profile refreshes)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS profile_crawls (
+            username TEXT PRIMARY KEY,
+            newest_shortcode TEXT,           -- first (newest) post seen on the last crawl
+            newest_timestamp_ms INTEGER,     -- newest post time seen (network crawl mode)
+            complete INTEGER DEFAULT 0,      -- 1 once a crawl reached the end of its range
+            last_crawled_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Extra copies (hard links or copies) of a downloaded post in other folders;
+    # the posts row keeps the primary file
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS links (
+            shortcode TEXT NOT NULL,
+            target_dir TEXT NOT NULL,        -- folder the copy lives in
+            local_path TEXT,
+            source TEXT,                     -- source that wanted the copy ('dm','saved','liked')
+            dm_thread TEXT,
+            linked_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY(shortcode, target_dir)
+        )
+    ''')
+    
+    # Small key/value store for state that must survive restarts (JSON values)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS state (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
     conn.commit()
     return conn
 
@@ -110,7 +176,8 @@ def record_download(conn: sqlite3.Connection, post: Dict, local_path: Optional[s
         conn: Database connection
         post: Dictionary containing post information with keys:
               shortcode, url, description, original_owner, caption,
-              source, username, timestamp_ms, status (optional)
+              source, username, timestamp_ms, status (optional),
+              duration_ms, account (optional)
         local_path: Optional path to the downloaded file
               
     Returns:
@@ -121,9 +188,9 @@ def record_download(conn: sqlite3.Connection, post: Dict, local_path: Optional[s
             INSERT INTO posts (
                 shortcode, url, description, original_owner, caption,
                 source, username, timestamp_ms, status, downloaded_at,
-                error_message, dm_thread, local_path
+                error_message, dm_thread, local_path, duration_ms, account
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'success', CURRENT_TIMESTAMP, NULL, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'success', CURRENT_TIMESTAMP, NULL, ?, ?, ?, ?)
             ON CONFLICT(shortcode, source) DO UPDATE SET
                 status='success',
                 error_message=NULL,
@@ -135,7 +202,11 @@ def record_download(conn: sqlite3.Connection, post: Dict, local_path: Optional[s
                 username=excluded.username,
                 timestamp_ms=excluded.timestamp_ms,
                 dm_thread=excluded.dm_thread,
-                local_path=excluded.local_path
+                local_path=excluded.local_path,
+                duration_ms=excluded.duration_ms,
+                account=excluded.account,
+                attempts=0,
+                terminal=0
         ''', (
             post.get('shortcode'),
             post.get('url'),
@@ -146,7 +217,9 @@ def record_download(conn: sqlite3.Connection, post: Dict, local_path: Optional[s
             post.get('username'),
             post.get('timestamp_ms'),
             post.get('dm_thread'),
-            local_path
+            local_path,
+            post.get('duration_ms'),
+            post.get('account')
         ))
         conn.commit()
         return "inserted"
@@ -155,7 +228,7 @@ def record_download(conn: sqlite3.Connection, post: Dict, local_path: Optional[s
         return "error"
 
 
-def record_failure(conn: sqlite3.Connection, post: Dict, error: str) -> str:
+def record_failure(conn: sqlite3.Connection, post: Dict, error: str, terminal: bool = False) -> str:
     """
     Record a failed download attempt in the database.
     
@@ -163,6 +236,7 @@ def record_failure(conn: sqlite3.Connection, post: Dict, error: str) -> str:
         conn: Database connection
         post: Dictionary containing post information
         error: Error message describing the failure
+        terminal: True when the post is gone for good (deleted/private/unavailable)
         
     Returns:
         str: "inserted", "duplicate", or "error"
@@ -172,12 +246,14 @@ def record_failure(conn: sqlite3.Connection, post: Dict, error: str) -> str:
             INSERT INTO posts (
                 shortcode, url, description, original_owner, caption,
                 source, username, timestamp_ms, status, error_message,
-                downloaded_at, dm_thread
+                downloaded_at, dm_thread, attempts, terminal
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'failed', ?, CURRENT_TIMESTAMP, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'failed', ?, CURRENT_TIMESTAMP, ?, 1, ?)
             ON CONFLICT(shortcode, source) DO UPDATE SET
                 status='failed',
                 error_message=excluded.error_message,
+                attempts=COALESCE(posts.attempts, 0) + 1,
+                terminal=excluded.terminal,
                 downloaded_at=CURRENT_TIMESTAMP,
                 url=excluded.url,
                 description=excluded.description,
@@ -197,6 +273,7 @@ def record_failure(conn: sqlite3.Connection, post: Dict, error: str) -> str:
             post.get('timestamp_ms'),
             error,
             post.get('dm_thread'),
+            1 if terminal else 0,
         ))
         
         conn.commit()
@@ -250,16 +327,362 @@ def close_db(conn: sqlite3.Connection):
         conn.close()
 
 
-def get_recent_download_timestamps(conn: sqlite3.Connection, since_epoch_seconds: float) -> list:
+def get_recent_download_timestamps(conn: sqlite3.Connection, since_epoch_seconds: float, account: Optional[str] = None,
+                                   include_unassigned: bool = False) -> list:
+    """
+    Epoch seconds of successful downloads since a point in time, optionally for one
+    rotation account (include_unassigned also counts rows without an account).
+    """
     try:
-        cursor = conn.execute('''
+        account_filter = ''
+        if account:
+            account_filter = 'AND (account = ? OR account IS NULL)' if include_unassigned else 'AND account = ?'
+        params = (int(since_epoch_seconds), account) if account else (int(since_epoch_seconds),)
+        cursor = conn.execute(f'''
             SELECT strftime('%s', downloaded_at)
             FROM posts
             WHERE status = 'success'
               AND strftime('%s', downloaded_at) >= ?
+              {account_filter}
             ORDER BY downloaded_at
-        ''', (int(since_epoch_seconds),))
+        ''', params)
         return [float(row[0]) for row in cursor.fetchall() if row and row[0] is not None]
     except Exception as e:
         print(f"Error fetching recent download timestamps: {e}")
-        return [] 
\ No newline at end of file
+        return [] 
+
+def get_recent_durations(conn: sqlite3.Connection, limit: int = 500) -> list:
+    """
+    Get the wall times of the most recent successful downloads.
+    
+    Args:
+        conn: Database connection
+        limit: Maximum number of samples
+        
+    Returns:
+        list: Durations in seconds (empty if none were recorded yet)
+    """
+    try:
+        cursor = conn.execute('''
+            SELECT duration_ms FROM posts
+            WHERE status = 'success' AND duration_ms IS NOT NULL AND duration_ms > 0
+            ORDER BY downloaded_at DESC
+            LIMIT ?
+        ''', (int(limit),))
+        return [row[0] / 1000.0 for row in cursor.fetchall()]
+    except Exception as e:
+        print(f"Error fetching download durations: {e}")
+        return []
+
+def get_watermark(conn: sqlite3.Connection, account: str, source: str, scope: str = '') -> int:
+    """
+    Get the high-water mark (max processed timestamp_ms) for an account/source/scope.
+    
+    Args:
+        conn: Database connection
+        account: Account key of the dump
+        source: Source identifier ('dm', 'saved', 'liked')
+        scope: Optional sub-scope (DM thread name)
+        
+    Returns:
+        int: Stored timestamp in ms, or 0 if nothing was processed yet
+    """
+    try:
+        cursor = conn.execute('''
+            SELECT max_timestamp_ms FROM watermarks
+            WHERE account = ? AND source = ? AND scope = ?
+        ''', (account, source, scope or ''))
+        row = cursor.fetchone()
+        return int(row[0]) if row and row[0] is not None else 0
+    except Exception as e:
+        print(f"Error reading watermark: {e}")
+        return 0
+
+
+def update_watermark(conn: sqlite3.Connection, account: str, source: str, max_timestamp_ms: int, scope: str = '') -> bool:
+    """
+    Raise the high-water mark for an account/source/scope. Never moves it backwards.
+    
+    Args:
+        conn: Database connection
+        account: Account key of the dump
+        source: Source identifier ('dm', 'saved', 'liked')
+        max_timestamp_ms: Newest timestamp that has been fully processed
+        scope: Optional sub-scope (DM thread name)
+        
+    Returns:
+        bool: True if stored successfully
+    """
+    if not max_timestamp_ms:
+        return False
+    try:
+        conn.execute('''
+            INSERT INTO watermarks (account, source, scope, max_timestamp_ms, updated_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(account, source, scope) DO UPDATE SET
+                max_timestamp_ms=MAX(max_timestamp_ms, excluded.max_timestamp_ms),
+                updated_at=CURRENT_TIMESTAMP
+        ''', (account, source, scope or '', int(max_timestamp_ms)))
+        conn.commit()
+        return True
+    except Exception as e:
+        print(f"Database error updating watermark: {e}")
+        return False
+
+
+def get_downloaded_paths(conn: sqlite3.Connection, shortcodes) -> Dict[str, Optional[str]]:
+    """
+    Resolve which of many shortcodes are already downloaded, in one set join.
+    
+    Args:
+        conn: Database connection
+        shortcodes: Iterable of Instagram post shortcodes
+        
+    Returns:
+        Dict mapping each successfully downloaded shortcode to a local_path (or None)
+    """
+    try:
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS plan_shortcodes (shortcode TEXT PRIMARY KEY)')
+        conn.execute('DELETE FROM plan_shortcodes')
+        conn.executemany('INSERT OR IGNORE INTO plan_shortcodes (shortcode) VALUES (?)',
+                         ((sc,) for sc in shortcodes if sc))
+        cursor = conn.execute('''
+            SELECT p.shortcode, MAX(p.local_path)
+            FROM posts p
+            JOIN plan_shortcodes t ON t.shortcode = p.shortcode
+            WHERE p.status = 'success'
+            GROUP BY p.shortcode
+        ''')
+        result = {row[0]: row[1] for row in cursor.fetchall()}
+        conn.execute('DELETE FROM plan_shortcodes')
+        conn.commit()
+        return result
+    except Exception as e:
+        print(f"Error resolving downloaded shortcodes: {e}")
+        return {}
+
+
+def get_failure_holds(conn: sqlite3.Connection, shortcodes, retry_hours: float) -> Dict[str, Optional[str]]:
+    """
+    Find failed shortcodes that should not be attempted again yet, in one set join.
+    The wait after a failure starts at retry_hours and doubles per failed attempt (max 7 days).
+    
+    Args:
+        conn: Database connection
+        shortcodes: Iterable of Instagram post shortcodes (not yet downloaded)
+        retry_hours: Wait after the first failure; 0 holds only unavailable posts
+        
+    Returns:
+        Dict mapping each held shortcode to its retry time (UTC, 'YYYY-MM-DD HH:MM:SS'),
+        or None when the post is unavailable and never retried
+    """
+    try:
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS plan_shortcodes (shortcode TEXT PRIMARY KEY)')
+        conn.execute('DELETE FROM plan_shortcodes')
+        conn.executemany('INSERT OR IGNORE INTO plan_shortcodes (shortcode) VALUES (?)',
+                         ((sc,) for sc in shortcodes if sc))
+        cursor = conn.execute('''
+            SELECT p.shortcode, MAX(p.terminal),
+                   MAX(datetime(p.downloaded_at, '+' || MIN(? * (1 << (MAX(COALESCE(p.attempts, 1), 1) - 1)), 168) || ' hours'))
+            FROM posts p
+            JOIN plan_shortcodes t ON t.shortcode = p.shortcode
+            WHERE p.status = 'failed'
+            GROUP BY p.shortcode
+        ''', (float(retry_hours),))
+        rows = cursor.fetchall()
+        now = conn.execute("SELECT datetime('now')").fetchone()[0]
+        result = {}
+        for shortcode, terminal, retry_after in rows:
+            if terminal:
+                result[shortcode] = None
+            elif retry_after and retry_after > now:
+                result[shortcode] = retry_after
+        conn.execute('DELETE FROM plan_shortcodes')
+        conn.commit()
+        return result
+    except Exception as e:
+        print(f"Error resolving failed shortcodes: {e}")
+        return {}
+
+
+def record_link(conn: sqlite3.Connection, post: Dict, local_path: str) -> bool:
+    """
+    Record an extra copy of a downloaded post in another folder, leaving its posts row alone.
+    
+    Args:
+        conn: Database connection
+        post: Post dictionary (shortcode, source, dm_thread)
+        local_path: Path of the linked or copied file
+        
+    Returns:
+        bool: True if stored successfully
+    """
+    try:
+        conn.execute('''
+            INSERT INTO links (shortcode, target_dir, local_path, source, dm_thread, linked_at)
+            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(shortcode, target_dir) DO UPDATE SET
+                local_path=excluded.local_path,
+                source=excluded.source,
+                dm_thread=excluded.dm_thread,
+                linked_at=CURRENT_TIMESTAMP
+        ''', (post.get('shortcode'), os.path.abspath(os.path.dirname(local_path)), local_path,
+              post.get('source'), post.get('dm_thread')))
+        conn.commit()
+        return True
+    except Exception as e:
+        print(f"Database error recording link: {e}")
+        return False
+
+
+def get_linked_dirs(conn: sqlite3.Connection, shortcodes) -> Dict[str, set]:
+    """
+    Resolve the folders many shortcodes have already been linked or copied into, in one set join.
+    
+    Args:
+        conn: Database connection
+        shortcodes: Iterable of Instagram post shortcodes
+        
+    Returns:
+        Dict mapping each linked shortcode to a set of absolute target dirs
+    """
+    try:
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS plan_shortcodes (shortcode TEXT PRIMARY KEY)')
+        conn.execute('DELETE FROM plan_shortcodes')
+        conn.executemany('INSERT OR IGNORE INTO plan_shortcodes (shortcode) VALUES (?)',
+                         ((sc,) for sc in shortcodes if sc))
+        result = {}
+        for shortcode, target_dir in conn.execute('''
+            SELECT l.shortcode, l.target_dir
+            FROM links l
+            JOIN plan_shortcodes t ON t.shortcode = l.shortcode
+        ''').fetchall():
+            result.setdefault(shortcode, set()).add(target_dir)
+        conn.execute('DELETE FROM plan_shortcodes')
+        conn.commit()
+        return result
+    except Exception as e:
+        print(f"Error resolving linked folders: {e}")
+        return {}
+
+
+def get_owner_downloaded_shortcodes(conn: sqlite3.Connection, owner: str) -> set:
+    """
+    Get every successfully downloaded shortcode owned by a user (any source).
+    
+    Args:
+        conn: Database connection
+        owner: Instagram username of the post owner
+        
+    Returns:
+        set: Shortcodes already archived for this owner
+    """
+    try:
+        cursor = conn.execute('''
+            SELECT DISTINCT shortcode FROM posts
+            WHERE original_owner = ? COLLATE NOCASE AND status = 'success'
+        ''', (owner,))
+        return {row[0] for row in cursor.fetchall()}
+    except Exception as e:
+        print(f"Error reading downloaded shortcodes: {e}")
+        return set()
+
+
+def get_profile_crawl(conn: sqlite3.Connection, username: str) -> Optional[Dict]:
+    """
+    Get the crawl watermark stored for a profile.
+    
+    Args:
+        conn: Database connection
+        username: Instagram username
+        
+    Returns:
+        Optional[Dict]: Row as dictionary or None if the profile was never crawled
+    """
+    try:
+        cursor = conn.execute('SELECT * FROM profile_crawls WHERE username = ? COLLATE NOCASE', (username,))
+        row = cursor.fetchone()
+        if row:
+            colnames = [desc[0] for desc in cursor.description]
+            return dict(zip(colnames, row))
+    except Exception as e:
+        print(f"Error reading profile crawl: {e}")
+    return None
+
+
+def record_profile_crawl(conn: sqlite3.Connection, username: str, newest_shortcode: Optional[str],
+                         newest_timestamp_ms: Optional[int] = None, complete: bool = False) -> bool:
+    """
+    Store the crawl watermark for a profile. The newest timestamp never moves backwards.
+    complete reflects the latest crawl: an incomplete crawl (stopped early, or with
+    failed posts) clears it, since the known-posts short-cut would skip what it missed.
+    
+    Args:
+        conn: Database connection
+        username: Instagram username
+        newest_shortcode: First (newest) post seen on this crawl
+        newest_timestamp_ms: Newest post time seen, if known
+        complete: Whether this crawl covered its whole range and archived every post
+        
+    Returns:
+        bool: True if stored successfully
+    """
+    try:
+        conn.execute('''
+            INSERT INTO profile_crawls (username, newest_shortcode, newest_timestamp_ms, complete, last_crawled_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(username) DO UPDATE SET
+                newest_shortcode=COALESCE(excluded.newest_shortcode, newest_shortcode),
+                newest_timestamp_ms=MAX(COALESCE(newest_timestamp_ms, 0), COALESCE(excluded.newest_timestamp_ms, 0)),
+                complete=excluded.complete,
+                last_crawled_at=CURRENT_TIMESTAMP
+        ''', (username.lower(), newest_shortcode, newest_timestamp_ms, 1 if complete else 0))
+        conn.commit()
+        return True
+    except Exception as e:
+        print(f"Database error recording profile crawl: {e}")
+        return False
+
+
+def get_state(conn: sqlite3.Connection, key: str, default=None):
+    """
+    Read a persisted state value.
+    
+    Args:
+        conn: Database connection
+        key: State key
+        default: Returned when the key is missing or unreadable
+        
+    Returns:
+        The JSON-decoded value, or default
+    """
+    try:
+        row = conn.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row and row[0] is not None else default
+    except Exception as e:
+        print(f"Error reading state {key}: {e}")
+        return default
+
+
+def set_state(conn: sqlite3.Connection, key: str, value) -> bool:
+    """
+    Persist a JSON-serializable state value.
+    
+    Args:
+        conn: Database connection
+        key: State key
+        value: Value to store
+        
+    Returns:
+        bool: True if stored successfully
+    """
+    try:
+        conn.execute('''
+            INSERT INTO state (key, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(key) DO UPDATE SET value=excluded.value, updated_at=CURRENT_TIMESTAMP
+        ''', (key, json.dumps(value)))
+        conn.commit()
+        return True
+    except Exception as e:
+        print(f"Database error storing state {key}: {e}")
+        return False
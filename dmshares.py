@@ -0,0 +1,164 @@
+import os
+from glob import glob
+from typing import Optional
+from urllib.parse import urlparse
+
+from textnorm import load_export_json
+
+SEND_TEXT_WINDOW_MS = 1000  # send text must follow its share in under 1s
+
+
+# --- Share links ---
+def _shortcode_from_share_link(url: str) -> Optional[str]:
+    if not url:
+        return None
+    try:
+        u = urlparse(url)
+        host = (u.netloc or "").lower()
+        if "instagram.com" not in host:
+            return None
+        parts = [p for p in (u.path or "").split("/") if p]
+        if not parts:
+            return None
+        # Accept only structured share types; no raw-link fallback
+        if parts[0] in ("reel", "p", "tv") and len(parts) > 1:
+            return parts[1]
+        return None
+    except Exception:
+        return None
+
+def _username_from_profile_share_link(url: str) -> Optional[str]:
+    if not url:
+        return None
+    try:
+        u = urlparse(url)
+        if "instagram.com" not in (u.netloc or "").lower():
+            return None
+        parts = [p for p in (u.path or "").split("/") if p]
+        # Profile shares look like https://instagram.com/_u/<username>
+        if len(parts) > 1 and parts[0] == "_u":
+            return parts[1]
+        return None
+    except Exception:
+        return None
+
+def _is_plain_text_message(msg: dict) -> bool:
+    content = msg.get("content")
+    if not isinstance(content, str) or not content.strip():
+        return False
+    return not any(k in msg for k in ("share", "photos", "videos", "audio_files", "files"))
+
+
+# --- Thread parsing ---
+def load_dm_thread_messages(thread_root: str) -> tuple[list, int]:
+    """
+    Load every message_*.json part of a DM thread and merge them oldest-first.
+    Returns (messages, part_count).
+    """
+    part_files = sorted(glob(os.path.join(thread_root, "message_*.json")))
+    all_msgs = []
+    for pf in part_files:
+        try:
+            data = load_export_json(pf) or {}
+            all_msgs.extend(data.get("messages", []))
+        except Exception as e:
+            print(f"[DM] Skipping {pf}: {e}")
+    # Exports are newest-first per part; sort for reliable <1s pairing across parts
+    all_msgs.sort(key=lambda m: m.get("timestamp_ms") or 0)
+    return all_msgs, len(part_files)
+
+def iter_dm_shares(messages, thread_name=None, since_ms: int = 0):
+    """
+    Single pass over a thread's messages (oldest first) yielding shares:
+      ('post', post_dict)       - unified post dict for download_post(...)
+      ('profile', profile_dict) - {'username', 'profile_name', 'timestamp'}
+    A post's send text is its sender's next message when that is plain text sent
+    under 1s later. Each post waits in a per-sender slot until that message (or the
+    end of the thread) decides it, so a thread costs O(messages).
+    Shares at or before since_ms (incremental watermark) are not yielded.
+    """
+    pending = {}  # sender -> post waiting for its send-text decision
+    seen_posts = set()
+    seen_profiles = set()
+
+    for m in messages:
+        sender = (m.get("sender_name") or "").strip()
+        ts = m.get("timestamp_ms") or 0
+
+        held = pending.pop(sender, None)
+        if held is not None:
+            if _is_plain_text_message(m) and 0 <= ts - (held["timestamp_ms"] or 0) < SEND_TEXT_WINDOW_MS:
+                held["send_text"] = m["content"].strip()
+            yield 'post', held
+
+        share = m.get("share") or {}
+        link = (share.get("link") or "").strip()
+        if not link:
+            continue  # no raw-link fallback; only structured shares
+        if since_ms and ts <= since_ms:
+            continue
+
+        username = _username_from_profile_share_link(link)
+        if username:
+            if username not in seen_profiles:
+                seen_profiles.add(username)
+                yield 'profile', {
+                    'username': username,
+                    'profile_name': share.get("share_text", ""),
+                    'timestamp': ts,
+                    'dm_thread': thread_name,
+                }
+            continue
+
+        shortcode = _shortcode_from_share_link(link)
+        if not shortcode or shortcode in seen_posts:
+            continue
+        seen_posts.add(shortcode)
+
+        # Exports use original_content_owner; older dumps used original_owner
+        owner = (share.get("original_content_owner") or share.get("original_owner") or "").strip() or None
+        pending[sender] = {
+            'shortcode': shortcode,
+            'url': link,
+            'description': None,
+            'original_owner': owner,
+            # do not set caption here; sidecar will populate it
+            'source': 'dm',
+            'username': owner,
+            'timestamp_ms': ts,
+            'dm_thread': thread_name,
+            'send_text': None,
+        }
+
+    for held in pending.values():
+        yield 'post', held
+
+
+if __name__ == "__main__":
+    # Microbenchmark: python dmshares.py [thread_dir]
+    import sys
+    import timeit
+
+    if len(sys.argv) > 1:
+        messages, parts = load_dm_thread_messages(sys.argv[1])
+        label = f"{os.path.basename(os.path.normpath(sys.argv[1]))} ({parts} part(s))"
+    else:
+        # Synthetic thread: two senders interleaving shares, send texts and chatter
+        messages = []
+        for i in range(20000):
+            ts = 1_700_000_000_000 + i * 700
+            sender = ("alice", "bob")[i % 2]
+            if i % 5 == 0:
+                messages.append({"sender_name": sender, "timestamp_ms": ts,
+                                 "share": {"link": f"https://www.instagram.com/p/C{i:08d}/",
+                                           "original_content_owner": "someone"}})
+            else:
+                messages.append({"sender_name": sender, "timestamp_ms": ts, "content": f"message {i}"})
+        label = "synthetic"
+
+    runs = 20
+    posts = sum(1 for kind, _ in iter_dm_shares(messages) if kind == 'post')
+    elapsed = timeit.timeit(lambda: list(iter_dm_shares(messages)), number=runs)
+    per_run = elapsed / runs
+    print(f"{label}: {len(messages)} messages, {posts} posts   "
+          f"{per_run * 1e3:8.2f} ms/thread   {per_run / max(len(messages), 1) * 1e9:6.0f} ns/message")
@@ -0,0 +1,130 @@
+import json
+import re
+from typing import Optional
+from urllib.parse import urlparse
+
+DEFAULT_INSTAGRAM_BASE_URL = "https://www.instagram.com"
+# Feed payloads the profile page fetches while scrolling (any host, so a local
+# stand-in server replaying recorded payloads matches too)
+FEED_URL_RE = re.compile(r'/(?:graphql/query|api/graphql|api/v1/feed/user/|api/v1/users/web_profile_info)')
+_SHORTCODE_RE = re.compile(r'^[A-Za-z0-9_-]{5,}$')
+# Grid links come as /p/<sc>/, /reel/<sc>/, /tv/<sc>/ or /<user>/p/<sc>/, on any host
+_GRID_LINK_RE = re.compile(r'/(p|reel|tv)/([A-Za-z0-9_-]{5,})')
+
+
+# --- Feed payloads (network crawl mode) ---
+def _feed_post_from_node(node: dict) -> Optional[dict]:
+    """Map one media node (GraphQL or v1 API shape) to {shortcode, caption, timestamp_ms, original_owner}."""
+    shortcode = node.get("shortcode") or node.get("code")
+    if not isinstance(shortcode, str) or not _SHORTCODE_RE.match(shortcode):
+        return None
+    if "shortcode" in node:
+        # GraphQL: edge_media_to_caption.edges[0].node.text, taken_at_timestamp, owner.username
+        edges = ((node.get("edge_media_to_caption") or {}).get("edges") or [])
+        caption = ((edges[0] or {}).get("node") or {}).get("text") if edges else None
+        ts = node.get("taken_at_timestamp")
+        owner = (node.get("owner") or {}).get("username")
+    else:
+        # v1/xdt API: caption.text, taken_at, user.username
+        if "taken_at" not in node and "media_type" not in node:
+            return None
+        caption = (node.get("caption") or {}).get("text")
+        ts = node.get("taken_at")
+        owner = (node.get("user") or node.get("owner") or {}).get("username")
+    return {
+        "shortcode": shortcode,
+        "caption": caption or "",
+        "timestamp_ms": int(ts) * 1000 if isinstance(ts, (int, float)) else None,
+        "original_owner": owner,
+    }
+
+def parse_feed_payload(payload) -> list[dict]:
+    """Walk a decoded feed payload and return every media node found (no descent into matched nodes)."""
+    found = []
+    stack = [payload]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            post = _feed_post_from_node(obj)
+            if post:
+                found.append(post)
+                continue  # carousel children are part of this post
+            stack.extend(reversed(list(obj.values())))
+        elif isinstance(obj, list):
+            stack.extend(reversed(obj))
+    return found
+
+def decode_feed_body(body: str):
+    body = (body or "").strip()
+    if body.startswith("for (;;);"):
+        body = body[len("for (;;);"):]
+    try:
+        return json.loads(body)
+    except Exception:
+        return None
+
+
+# --- Grid links ---
+def grid_post_url(href: str) -> Optional[tuple]:
+    """
+    Normalize a grid link to (shortcode, canonical URL), keeping its kind (/p/, /reel/, /tv/).
+    Returns None for anything that is not a post link.
+    """
+    try:
+        path = urlparse(href or "").path
+    except Exception:
+        return None
+    m = _GRID_LINK_RE.search(path)
+    if not m:
+        return None
+    kind, shortcode = m.groups()
+    return shortcode, f"{DEFAULT_INSTAGRAM_BASE_URL}/{kind}/{shortcode}/"
+
+class GridMerge:
+    """
+    One item per shortcode for a profile crawl, in grid order.
+
+    Feed payloads carry exact metadata (caption, post time, owner) but no link form;
+    grid links carry the form but at most a caption. A post is published once, when
+    its link renders, with the payload metadata merged in. Posts only seen in payloads
+    wait for their link; flush() publishes the ones that never rendered.
+    publish(url, meta) returns False to stop the crawl.
+    """
+    def __init__(self, publish):
+        self.publish = publish
+        self.seen = set()
+        self.feed = {}  # shortcode -> payload metadata waiting for its grid link
+        self.stopped = False
+
+    def _publish(self, shortcode: str, url: str, meta: dict):
+        self.seen.add(shortcode)
+        if self.publish(url, meta) is False:
+            self.stopped = True
+
+    def add_feed(self, posts):
+        for post in posts:
+            shortcode = post.get("shortcode")
+            if shortcode and shortcode not in self.seen:
+                self.feed.setdefault(shortcode, {}).update(
+                    {k: v for k, v in post.items() if k != "shortcode" and v})
+
+    def add_links(self, hrefs, captions=None):
+        captions = captions or {}
+        for href in hrefs:
+            if self.stopped:
+                return
+            parsed = grid_post_url(href)
+            if not parsed or parsed[0] in self.seen:
+                continue
+            shortcode, url = parsed
+            meta = {"caption": captions[href]} if captions.get(href) else {}
+            meta.update(self.feed.pop(shortcode, {}))  # payload captions are exact
+            self._publish(shortcode, url, meta)
+
+    def flush(self):
+        """Publish payload-only posts (their links never rendered) in payload order."""
+        pending, self.feed = list(self.feed.items()), {}
+        for shortcode, meta in pending:
+            if self.stopped:
+                return
+            self._publish(shortcode, f"{DEFAULT_INSTAGRAM_BASE_URL}/p/{shortcode}/", meta)
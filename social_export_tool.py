@@ -10,26 +10,38 @@ import shutil
 import sys
 import select
 import threading
+import queue
 import signal
+import tempfile
+import argparse
+import heapq
 from collections import deque
+from contextlib import contextmanager, nullcontext
+from http.cookiejar import MozillaCookieJar, LoadError
 from datetime import datetime
-from glob import glob
-from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 import requests
 import atexit
 
 # Import database functions
-from db import init_db, is_downloaded, get_post, record_download, record_failure, get_download_stats, close_db, get_recent_download_timestamps
+# Caption/filename normalization (precompiled tables + LRU cache)
+from textnorm import load_export_json, clean_text_for_filename, sanitize_filename
+# DM export parsing (shares + send-text pairing)
+from dmshares import load_dm_thread_messages, iter_dm_shares
+# Profile feed payloads and grid links (network crawl mode)
+from feedcapture import DEFAULT_INSTAGRAM_BASE_URL, FEED_URL_RE, parse_feed_payload, decode_feed_body, GridMerge
+from db import init_db, is_downloaded, get_post, record_download, record_failure, get_download_stats, close_db, get_recent_download_timestamps, get_watermark, update_watermark, get_downloaded_paths, get_failure_holds, record_link, get_linked_dirs, get_owner_downloaded_shortcodes, get_profile_crawl, record_profile_crawl, get_recent_durations, get_state, set_state
 
 # --- Shutdown + cancelable sleep helpers ---
 SHUTDOWN = threading.Event()
+UNATTENDED = threading.Event()  # daemon mode: block handling must never wait on input()
 _SIGINT_COUNT = 0
 
 def _signal_handler(signum, frame):
@@ -100,52 +112,6 @@ def posix_sleep_with_optional_enter(seconds: float, msg: str) -> bool:
 			break
 	return SHUTDOWN.is_set()
 
-# --- Caption normalization helpers ---
-def _mojibake_candidate(s: str) -> bool:
-	return any('\u0080' <= ch <= '\u00FF' for ch in s)
-
-def _looks_much_better(a: str, b: str) -> bool:
-	bad = "ÃÂØð¢¬¤§"
-	score = lambda s: (sum(ch.isalnum() for ch in s) - sum(ch in bad for ch in s))
-	return score(a) > score(b)
-
-def repair_mojibake(s: str) -> str:
-	if not s: return s
-	if _mojibake_candidate(s):
-		try:
-			cand = s.encode('latin-1','ignore').decode('utf-8','ignore')
-			if _looks_much_better(cand, s):
-				return cand
-		except Exception:
-			pass
-	return s
-
-def normalize_caption_text(s: str) -> str:
-    if not s:
-        return s
-    # Existing steps
-    s = repair_mojibake(s)
-    s = unicodedata.normalize("NFKC", s)
-    # strip zero-width/control chars, collapse spaces
-    s = ''.join(ch if (ch >= ' ' and ch not in '\u200b\u200c\u200d\u2060') else ' ' for ch in s)
-    s = re.sub(r'\s+', ' ', s).strip()
-    # NEW: force ASCII only (drop emojis and non-Latin)
-    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
-    return s
-
-def clean_text_for_filename(s: str, max_len: int | None = None) -> str:
-	"""
-	ASCII-only captions for filenames:
-	normalize -> ASCII-only -> collapse whitespace -> sanitize -> truncate.
-	"""
-	if not s:
-		return s
-	s = normalize_caption_text(s)
-	s = sanitize_filename(s)  # keep your existing sanitizer unchanged
-	if max_len and len(s) > max_len:
-		s = s[:max_len-1] + '…'
-	return s
-
 # ASCII-only pipeline exists; 1 char == 1 byte assumption holds.
 MAX_FILENAME_BYTES = 255          # typical per-component limit on ext4/NTFS
 RESERVE_YTDLP_SUFFIX = 40         # headroom for yt-dlp transient suffixes (.part, fdash-…)
@@ -160,10 +126,12 @@ def build_output_basename(post: dict, config: dict) -> str:
     """
     shortcode = (post.get("shortcode") or "unknown").strip()
     owner_raw = (post.get("original_owner") or post.get("username") or "").strip()
-    owner = clean_text_for_filename(owner_raw) or "unknown"
+    # budget=MAX_BASENAME: nothing longer survives the final cut, so long inputs are
+    # trimmed before the expensive passes; results are memoized across the two calls per post.
+    owner = clean_text_for_filename(owner_raw, budget=MAX_BASENAME) or "unknown"
     # Optional one-liner debug:
     # print(f"[DEBUG] Owner before/after sanitize: {owner_raw!r} -> {owner!r}")
-    caption = clean_text_for_filename(post.get("caption") or "")
+    caption = clean_text_for_filename(post.get("caption") or "", budget=MAX_BASENAME)
     
     # Compose prefix: optional date + shortcode + owner
     prefix_parts = []
@@ -283,6 +251,119 @@ def build_chrome_options(profile_dir: str, window_size: str = "1280,900") -> Opt
     opts.add_argument("--disable-blink-features=AutomationControlled")
     return opts
 
+# Crawls only need grid links: skip images, video and fonts (CDN URLs carry query strings)
+CRAWL_BLOCKED_URLS = [
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.heic*",
+    "*.mp4*", "*.m4v*", "*.webm*",
+    "*.woff*", "*.ttf*", "*.otf*",
+]
+
+def build_crawl_chrome_options(profile_dir: str, headless: bool = True) -> Options:
+    """
+    Chrome options for link-only profile crawling: headless (new mode), smaller
+    viewport and no image decoding. Login flows keep build_chrome_options.
+    
+    Args:
+        profile_dir: Directory for the Chrome profile
+        headless: Run without a window
+        
+    Returns:
+        Options: Configured Chrome options
+    """
+    opts = build_chrome_options(profile_dir, "1000,800")
+    if headless:
+        opts.add_argument("--headless=new")
+    opts.add_argument("--blink-settings=imagesEnabled=false")
+    opts.add_argument("--mute-audio")
+    opts.add_argument("--autoplay-policy=user-gesture-required")
+    return opts
+
+def block_crawl_resources(driver):
+    """Block media/font requests at the network layer (CDP) for a crawl session."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": CRAWL_BLOCKED_URLS})
+    except Exception as e:
+        print(f"[POOL] Could not block media requests ({e}); crawling with full page loads")
+
+# --- Chromedriver resolution (cached, works offline) ---
+CHROMEDRIVER_STATE_FILE = os.path.join(os.path.dirname(__file__), 'chromedriver_state.json')
+_CHROMEDRIVER_PATH = None
+_CHROMEDRIVER_LOCK = threading.Lock()
+
+def detect_chrome_version() -> str | None:
+    """Best-effort installed Chrome version (e.g. '126.0.6478.126'), or None."""
+    if os.name == 'nt':
+        cmds = [['reg', 'query', rf'{hive}\Software\Google\Chrome\BLBeacon', '/v', 'version']
+                for hive in ('HKEY_CURRENT_USER', 'HKEY_LOCAL_MACHINE')]
+    elif sys.platform == 'darwin':
+        cmds = [['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome', '--version']]
+    else:
+        cmds = [[name, '--version'] for name in ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser')]
+    for cmd in cmds:
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
+        except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
+            continue
+        m = re.search(r'(\d+\.\d+\.\d+\.\d+)', result.stdout or '')
+        if result.returncode == 0 and m:
+            return m.group(1)
+    return None
+
+def _major(version: str | None) -> str | None:
+    return version.split('.', 1)[0] if version else None
+
+def resolve_chromedriver_path(config=None) -> str:
+    """
+    Resolve chromedriver once per process:
+      1. CHROMEDRIVER_PATH (environment or config.txt) wins when it points to a file.
+      2. Reuse the path cached in chromedriver_state.json while Chrome's major version matches.
+      3. Otherwise ask webdriver-manager (network) and cache the result.
+    If the lookup fails (offline host) a cached driver is used even if versions differ.
+    """
+    global _CHROMEDRIVER_PATH
+    with _CHROMEDRIVER_LOCK:
+        if _CHROMEDRIVER_PATH:
+            return _CHROMEDRIVER_PATH
+        if config is None:
+            config = read_config()
+
+        override = os.environ.get('CHROMEDRIVER_PATH') or config.get('CHROMEDRIVER_PATH')
+        if override:
+            path = os.path.expandvars(os.path.expanduser(override.strip().strip('"').strip("'")))
+            if os.path.isfile(path):
+                _CHROMEDRIVER_PATH = path
+                return path
+            print(f"[DRIVER] CHROMEDRIVER_PATH not found: {path} (falling back to auto-resolve)")
+
+        version = detect_chrome_version()
+        state = _try_load_json(CHROMEDRIVER_STATE_FILE) or {}
+        cached = state.get('driver_path')
+        cached_ok = bool(cached) and os.path.isfile(cached)
+        if cached_ok and (version is None or _major(state.get('chrome_version')) == _major(version)):
+            _CHROMEDRIVER_PATH = cached
+            return cached
+
+        try:
+            path = ChromeDriverManager().install()
+        except Exception as e:
+            if cached_ok:
+                print(f"[DRIVER] Driver lookup failed ({e}); using cached {cached}")
+                _CHROMEDRIVER_PATH = cached
+                return cached
+            raise
+        try:
+            with open(CHROMEDRIVER_STATE_FILE, 'w', encoding='utf-8') as f:
+                json.dump({'chrome_version': version, 'driver_path': path,
+                           'resolved_at': datetime.now().isoformat(timespec='seconds')}, f, indent=2)
+        except Exception as e:
+            print(f"[DRIVER] Could not write {CHROMEDRIVER_STATE_FILE}: {e}")
+        _CHROMEDRIVER_PATH = path
+        return path
+
+def chrome_service() -> Service:
+    return Service(resolve_chromedriver_path())
+
 # --- Config parsing helpers for manual login ---
 def normalize_profile_dir(raw: str) -> str:
 	script_dir = os.path.dirname(__file__)
@@ -293,10 +374,37 @@ def normalize_profile_dir(raw: str) -> str:
 	p = os.path.expandvars(os.path.expanduser(p))
 	return p  # accept absolute or relative; user will typically provide absolute (e.g., C:\Users\you\ig_profile)
 
-def resolve_profile_and_cookie(config):
-	profile_dir = normalize_profile_dir(config.get("PROFILE_DIR"))
-	cookie_file = COOKIE_FILE
-	return profile_dir, cookie_file
+def get_account_names(config) -> list:
+	"""Rotation accounts from ACCOUNTS=alice,bob (empty list = single legacy account)."""
+	return [n.strip() for n in (config.get("ACCOUNTS") or "").split(",") if n.strip()]
+
+def resolve_profile_and_cookie(config, account=None):
+	"""
+	Chrome profile dir and cookie file for an account (default: the first of ACCOUNTS,
+	or PROFILE_DIR + COOKIE_FILE when no accounts are configured).
+	Per account: ACCOUNT_<NAME>_PROFILE_DIR / ACCOUNT_<NAME>_COOKIE_FILE. The first
+	account defaults to PROFILE_DIR + COOKIE_FILE (the existing single-account login),
+	the others to profiles/<name> and cookies/<name>_cookies.txt next to the script.
+	"""
+	names = get_account_names(config)
+	if account is None and names:
+		account = names[0]
+	if account is None:
+		return normalize_profile_dir(config.get("PROFILE_DIR")), COOKIE_FILE
+	first = bool(names) and account == names[0]
+	script_dir = os.path.dirname(__file__)
+	key = re.sub(r'\W', '_', account).upper()
+	profile_dir = config.get(f"ACCOUNT_{key}_PROFILE_DIR")
+	if profile_dir:
+		profile_dir = normalize_profile_dir(profile_dir)
+	elif first:
+		profile_dir = normalize_profile_dir(config.get("PROFILE_DIR"))
+	else:
+		profile_dir = os.path.join(script_dir, "profiles", account)
+	cookie_file = config.get(f"ACCOUNT_{key}_COOKIE_FILE")
+	if not cookie_file:
+		cookie_file = COOKIE_FILE if first else os.path.join(script_dir, "cookies", f"{account}_cookies.txt")
+	return profile_dir, os.path.expandvars(os.path.expanduser(cookie_file.strip().strip('"')))
 
 # --- New: Profile dump scan logic ---
 PROFILE_POSTS_PATH = os.path.join('your_instagram_activity', 'media', 'posts_1.json')
@@ -380,8 +488,109 @@ SAFETY_PRESETS = {
     }
 }
 
+def skippable_sleep(seconds: float, msg: str) -> bool:
+    """
+    Sleep up to `seconds` with Enter-to-skip on interactive terminals.
+    Returns True if a shutdown was requested during the wait.
+    """
+    if seconds <= 0:
+        return SHUTDOWN.is_set()
+    if os.name == 'nt':
+        # Windows: non-blocking Enter via msvcrt, still honor shutdown
+        print(f"{msg} (Press Enter to skip)")
+        import msvcrt
+        end = time.time() + seconds
+        while not SHUTDOWN.is_set():
+            if end - time.time() <= 0:
+                break
+            if msvcrt.kbhit():
+                key = msvcrt.getch()
+                if key in (b'\r', b'\n'):
+                    print("[SAFE] Skip requested.")
+                    break
+            SHUTDOWN.wait(0.05)
+        return SHUTDOWN.is_set()
+    if sys.stdin.isatty():
+        # Interactive TTY: real non-blocking Enter-to-skip
+        return posix_sleep_with_optional_enter(seconds, msg)
+    # Non-interactive (e.g., piped/cron): no hint, cancellable sleep
+    print(msg)
+    return sleep_with_cancel(seconds)
+
+def default_pacer_sleeper(seconds: float, message: str, kind: str) -> bool:
+    """
+    Real-time sleeper for SafetyPacer. kind is 'cap', 'delay' or 'long_break'.
+    Delays and long breaks can be skipped with Enter. Returns False on shutdown.
+    """
+    if kind == 'cap':
+        print(message)
+        report_daemon_status('waiting_for_cap', message, resume_at=time.time() + seconds)
+        return not sleep_with_cancel(seconds)
+    return not skippable_sleep(seconds, message)
+
+class _CapBucket:
+    """
+    Token bucket for a rolling-window cap. Each spent token comes back exactly one
+    window after it was spent, so the cap holds over every rolling window (a plain
+    rate refill would allow up to twice the cap within one window).
+    """
+    def __init__(self, capacity: int, window: float):
+        self.capacity = capacity
+        self.window = window
+        self.spent = deque()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity < 0
+
+    def _refill(self, now: float):
+        while self.spent and self.spent[0] <= now - self.window:
+            self.spent.popleft()
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        if len(self.spent) < self.capacity:
+            return 0.0
+        if self.capacity == 0:
+            return self.window
+        return self.spent[len(self.spent) - self.capacity] + self.window - now
+
+    def take(self, now: float):
+        if not self.unlimited:
+            self.spent.append(now)
+
+    def refund(self, spent_at: float):
+        if self.unlimited:
+            return
+        try:
+            self.spent.remove(spent_at)
+        except ValueError:
+            pass  # already expired from the window
+
 class SafetyPacer:
-    def __init__(self, cfg, seed_ts):
+    """
+    Thread-safe admission controller for downloads.
+    
+    - Hourly/daily caps are token buckets; a token is reserved on acquire() and
+      refunded by release(False), so concurrent workers can never overshoot a cap.
+    - Jittered spacing (MIN/MAX_DELAY_SECONDS) and long breaks (every
+      LONG_BREAK_EVERY successes) are global across all workers.
+    - clock() and sleeper(seconds, message, kind) are injectable; a virtual clock
+      with a sleeper that advances it runs simulations instantly.
+    - adaptive=True replaces the fixed delay window with AIMD: the delay shrinks by
+      a fixed step per success and multiplies on block signals (record_block),
+      always within [MIN_DELAY_SECONDS, MAX_DELAY_SECONDS]. persist(delay) is
+      called when the learned delay should be saved.
+    """
+    # Multiplicative backoff per block signal
+    ADAPTIVE_BACKOFF = {'rate_limit': 2.0, 'checkpoint': 4.0, 'login_required': 2.0}
+    ADAPTIVE_PERSIST_EVERY = 10
+
+    def __init__(self, cfg, seed_ts, clock=None, sleeper=None, rng=None,
+                 adaptive=False, learned_delay=None, adaptive_step=None, persist=None):
         self.min_delay = int(cfg['MIN_DELAY_SECONDS'])
         self.max_delay = int(cfg['MAX_DELAY_SECONDS'])
         self.every = int(cfg['LONG_BREAK_EVERY'])
@@ -389,117 +598,188 @@ class SafetyPacer:
         self.long_max = int(cfg['LONG_BREAK_MAX_SECONDS'])
         self.hour_cap = int(cfg['HOURLY_POST_CAP'])
         self.day_cap = int(cfg['DAILY_POST_CAP'])
-        self.hour_q = deque()
-        self.day_q = deque()
-        now = time.time()
-        for t in (seed_ts or []):
+        self.clock = clock or time.time
+        self.sleeper = sleeper or default_pacer_sleeper
+        self.rng = rng or random.Random()
+        self.adaptive = adaptive and self.max_delay > 0
+        self.persist = persist
+        # Additive step: by default twenty clean downloads walk the delay from max to min
+        self.adaptive_step = adaptive_step if adaptive_step is not None else max(0.1, (self.max_delay - self.min_delay) / 20)
+        self.current_delay = self._clamp_delay(learned_delay if learned_delay is not None else self.max_delay)
+        self.hour_bucket = _CapBucket(self.hour_cap, 3600)
+        self.day_bucket = _CapBucket(self.day_cap, 86400)
+        now = self.clock()
+        for t in sorted(seed_ts or []):
             if t >= now - 86400:
-                self.hour_q.append(t)
-                self.day_q.append(t)
+                self.day_bucket.take(t)
+                if t >= now - 3600:
+                    self.hour_bucket.take(t)
         self.success_count = 0
-
-    def _unlimited(self, cap): 
-        return cap < 0
-
-    def _prune(self):
-        now = time.time()
-        while self.hour_q and self.hour_q[0] <= now - 3600: 
-            self.hour_q.popleft()
-        while self.day_q and self.day_q[0] <= now - 86400: 
-            self.day_q.popleft()
-
-    def wait_caps(self):
-        if self._unlimited(self.hour_cap) and self._unlimited(self.day_cap):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # The first download also waits one jittered delay, like every other one
+        self._next_slot = now + self._draw_delay()
+        self._break_until = 0.0
+
+    # Backwards-compatible names for the cap windows
+    @property
+    def hour_q(self):
+        return self.hour_bucket.spent
+
+    @property
+    def day_q(self):
+        return self.day_bucket.spent
+
+    def _clamp_delay(self, delay: float) -> float:
+        return float(min(self.max_delay, max(self.min_delay, float(delay))))
+
+    def _draw_delay(self) -> float:
+        if self.max_delay <= 0:
+            return 0.0
+        if self.adaptive:
+            # Keep some jitter around the learned delay
+            return self._clamp_delay(self.current_delay * self.rng.uniform(0.85, 1.15))
+        return self.rng.uniform(self.min_delay, self.max_delay)
+
+    def record_block(self, kind: str):
+        """
+        Report a block signal ('rate_limit', 'checkpoint', 'login_required').
+        In adaptive mode the delay backs off multiplicatively.
+        """
+        if not self.adaptive:
             return
+        with self._lock:
+            factor = self.ADAPTIVE_BACKOFF.get(kind, 2.0)
+            self.current_delay = self._clamp_delay(max(self.current_delay, self.adaptive_step) * factor)
+            delay = self.current_delay
+        print(f"[SAFE] Adaptive pacing: {kind} -> delay now ~{delay:.1f}s")
+        if self.persist:
+            self.persist(delay)
+
+    def _pending_wait(self, now: float):
+        """(seconds, kind, target) for the longest thing blocking admission, or (0, None, None)."""
+        cap_wait = max(self.hour_bucket.wait_time(now), self.day_bucket.wait_time(now))
+        if cap_wait > 0:
+            return cap_wait, 'cap', None
+        if self._break_until > now:
+            return self._break_until - now, 'long_break', self._break_until
+        if self._next_slot > now:
+            return self._next_slot - now, 'delay', self._next_slot
+        return 0, None, None
+
+    def acquire(self) -> bool:
+        """
+        Block until a download may start and reserve a cap token for it.
+        Returns False if a shutdown was requested while waiting.
+        """
         while True:
-            self._prune()
-            now = time.time()
-            ok_hour = self._unlimited(self.hour_cap) or len(self.hour_q) < self.hour_cap
-            ok_day = self._unlimited(self.day_cap) or len(self.day_q) < self.day_cap
-            if ok_hour and ok_day:
+            if SHUTDOWN.is_set():
+                return False
+            with self._lock:
+                now = self.clock()
+                wait, kind, target = self._pending_wait(now)
+                if wait <= 0:
+                    self.hour_bucket.take(now)
+                    self.day_bucket.take(now)
+                    self._local.reserved_at = now
+                    # Space the next admission even if this download is still running
+                    self._next_slot = now + self._draw_delay()
+                    return True
+            if kind == 'cap':
+                message = f"[SAFE] Post cap reached; waiting {int(wait)}s for the window to free up"
+            elif kind == 'long_break':
+                message = f"[SAFE] Long break: {int(wait)}s"
+            else:
+                message = f"[SAFE] Sleeping {int(wait)}s before download..."
+            if not self.sleeper(wait, message, kind):
+                return False
+            if target is not None:
+                # Served (or skipped with Enter): clear it unless another worker moved it meanwhile
+                with self._lock:
+                    now = self.clock()
+                    if kind == 'long_break' and self._break_until == target:
+                        self._break_until = min(target, now)
+                    elif kind == 'delay' and self._next_slot == target:
+                        self._next_slot = min(target, now)
+
+    def release(self, success: bool):
+        """
+        Finish the download admitted by this thread's last acquire().
+        Failures refund the cap token; successes count towards long breaks.
+        """
+        reserved_at = getattr(self._local, 'reserved_at', None)
+        self._local.reserved_at = None
+        with self._lock:
+            now = self.clock()
+            if not success:
+                if reserved_at is not None:
+                    self.hour_bucket.refund(reserved_at)
+                    self.day_bucket.refund(reserved_at)
+                return
+            if reserved_at is None:
+                # Success recorded without acquire(): still count it against the caps
+                self.hour_bucket.take(now)
+                self.day_bucket.take(now)
+            self.success_count += 1
+            save_delay = None
+            if self.adaptive:
+                self.current_delay = self._clamp_delay(self.current_delay - self.adaptive_step)
+                if self.success_count % self.ADAPTIVE_PERSIST_EVERY == 0:
+                    save_delay = self.current_delay
+            # Spacing runs from the end of the download, as before
+            self._next_slot = max(self._next_slot, now + self._draw_delay())
+            if self.every > 0 and self.long_max > 0 and self.success_count % self.every == 0:
+                self._break_until = max(self._break_until, now + self.rng.uniform(self.long_min, self.long_max))
+        if save_delay is not None and self.persist:
+            self.persist(save_delay)
+
+    def admission_wait(self) -> float:
+        """Seconds until acquire() would admit a download (0 = now)."""
+        with self._lock:
+            return self._pending_wait(self.clock())[0]
+
+    def wait_caps(self):
+        """Block until both caps have room (no reservation)."""
+        while not SHUTDOWN.is_set():
+            with self._lock:
+                now = self.clock()
+                wait = max(self.hour_bucket.wait_time(now), self.day_bucket.wait_time(now))
+            if wait <= 0:
                 return
-            sleeps = []
-            if not self._unlimited(self.hour_cap) and len(self.hour_q) >= self.hour_cap:
-                sleeps.append(self.hour_q[0] + 3600 - now)
-            if not self._unlimited(self.day_cap) and len(self.day_q) >= self.day_cap:
-                sleeps.append(self.day_q[0] + 86400 - now)
-            sleep_time = max(1, int(max(sleeps)))
-            if sleep_with_cancel(sleep_time):
+            if not self.sleeper(wait, f"[SAFE] Post cap reached; waiting {int(wait)}s for the window to free up", 'cap'):
                 return
 
     def before_download(self):
-        self.wait_caps()
-        delay = random.uniform(self.min_delay, self.max_delay)
-        if self.max_delay > 0:
-            if os.name == 'nt':
-                # Windows: non-blocking Enter via msvcrt, still honor shutdown
-                print(f"[SAFE] Sleeping {int(delay)}s before download... (Press Enter to skip)")
-                import msvcrt
-                start = time.time()
-                while True:
-                    remaining = delay - (time.time() - start)
-                    if remaining <= 0:
-                        break
-                    if SHUTDOWN.is_set():
-                        return False
-                    if msvcrt.kbhit():
-                        key = msvcrt.getch()
-                        if key in (b'\r', b'\n'):
-                            print("[SAFE] Break skipped by user")
-                            break
-                    SHUTDOWN.wait(0.05)
-            else:
-                # POSIX branch
-                if sys.stdin.isatty():
-                    # Interactive TTY: real non-blocking Enter-to-skip
-                    if posix_sleep_with_optional_enter(
-                        delay, f"[SAFE] Sleeping {int(delay)}s before download..."
-                    ):
-                        return False  # shutdown
-                else:
-                    # Non-interactive (e.g., piped/cron): no hint, cancellable sleep
-                    print(f"[SAFE] Sleeping {int(delay)}s before download...")
-                    if sleep_with_cancel(delay):
-                        return False
-        return True
+        return self.acquire()
 
     def after_success(self):
-        now = time.time()
-        if not self._unlimited(self.hour_cap): 
-            self.hour_q.append(now)
-        if not self._unlimited(self.day_cap):  
-            self.day_q.append(now)
-        self.success_count += 1
-        if self.every > 0 and (self.success_count % self.every == 0):
-            long_break = random.uniform(self.long_min, self.long_max)
-            if self.long_max > 0:
-                if os.name == 'nt':
-                    # Windows: non-blocking Enter via msvcrt, still honor shutdown
-                    print(f"[SAFE] Long break: {int(long_break)}s (Press Enter to skip)")
-                    import msvcrt
-                    start = time.time()
-                    while True:
-                        remaining = long_break - (time.time() - start)
-                        if remaining <= 0:
-                            break
-                        if SHUTDOWN.is_set():
-                            return
-                        if msvcrt.kbhit():
-                            key = msvcrt.getch()
-                            if key in (b'\r', b'\n'):
-                                print("[SAFE] Long break skipped by user")
-                                break
-                        SHUTDOWN.wait(0.05)
-                else:
-                    if sys.stdin.isatty():
-                        if posix_sleep_with_optional_enter(
-                            long_break, f"[SAFE] Long break: {int(long_break)}s"
-                        ):
-                            return  # shutdown requested; caller will notice via SHUTDOWN
-                    else:
-                        print(f"[SAFE] Long break: {int(long_break)}s")
-                        if sleep_with_cancel(long_break):
-                            return
+        self.release(True)
+
+ADAPTIVE_DELAY_STATE_KEY = "adaptive_pacing_delay"
+
+def build_pacer(conn, safety_config: dict, config: dict = None, account: str = None, primary: bool = False) -> SafetyPacer:
+    """
+    Create a SafetyPacer seeded with the last 24h of downloads (of one rotation
+    account when given; the primary account also owns downloads made before
+    rotation). With ADAPTIVE_PACING=true the learned delay is loaded from and saved to the DB.
+    """
+    config = config or read_config()
+    recent_timestamps = get_recent_download_timestamps(conn, time.time() - 86400, account, include_unassigned=primary)
+    if not parse_bool(config.get("ADAPTIVE_PACING"), False):
+        return SafetyPacer(safety_config, recent_timestamps)
+    step = config.get("ADAPTIVE_STEP_SECONDS")
+    state_key = f"{ADAPTIVE_DELAY_STATE_KEY}:{account}" if account else ADAPTIVE_DELAY_STATE_KEY
+    pacer = SafetyPacer(
+        safety_config, recent_timestamps,
+        adaptive=True,
+        learned_delay=get_state(conn, state_key),
+        adaptive_step=float(step) if step else None,
+        persist=lambda delay: set_state(conn, state_key, round(delay, 2)),
+    )
+    if pacer.adaptive:
+        print(f"[SAFE] Adaptive pacing on: starting delay ~{pacer.current_delay:.1f}s "
+              f"(range {pacer.min_delay}-{pacer.max_delay}s)")
+    return pacer
 
 # Helper to check if a file exists and is non-empty
 def file_exists_nonempty(path):
@@ -527,10 +807,57 @@ def scan_profile_dump(dump_path):
                     break
     return result
 
+# --- Incremental re-export helpers ---
+def dump_account_key(dump_path: str) -> str:
+    """
+    Stable per-account key for a dump folder so monthly re-exports share watermarks,
+    e.g. 'instagram-alice-2024-05-01-AbCd' -> 'alice'. Falls back to the folder name.
+    """
+    name = os.path.basename(os.path.normpath(dump_path))
+    m = re.match(r'^(?:instagram[-_])?(.+?)[-_]\d{4}-\d{2}-\d{2}', name, re.IGNORECASE)
+    return (m.group(1) if m else name).lower()
+
+def is_incremental(config) -> bool:
+    return parse_bool((config or {}).get("INCREMENTAL_MODE"), False)
+
+def completed_watermark(items, done) -> int:
+    """
+    Mark an incremental run may store after walking items.
+
+    Args:
+        items: (shortcode, timestamp_ms) pairs the run queued from the export
+        done: shortcodes that finished (downloaded now or earlier; see settled_shortcodes)
+
+    Returns:
+        The newest timestamp_ms older than every unfinished item (failed, skipped,
+        out of retries or never reached), so the next export queues those again.
+        0 leaves the stored mark as it is.
+    """
+    pending = [ts or 0 for shortcode, ts in items if shortcode not in done]
+    if not pending:
+        return max((ts or 0 for _, ts in items), default=0)
+    oldest = min(pending)
+    return max((ts for _, ts in items if ts and ts < oldest), default=0)
+
+def unavailable_shortcodes(conn, shortcodes) -> set:
+    """Shortcodes recorded as deleted/private; they count as finished for watermarks."""
+    return {sc for sc, retry_after in get_failure_holds(conn, shortcodes, 0).items() if retry_after is None}
+
+def settled_shortcodes(conn, shortcodes) -> set:
+    """
+    Shortcodes that count as finished for watermarks: recorded as downloaded, or as
+    deleted/private. Waits for pipelined post-processing first; download_post returns
+    True once a post is queued there, and a failed finalize leaves no DB row.
+    """
+    shortcodes = list(shortcodes)
+    drain_postprocessing()
+    return set(get_downloaded_paths(conn, shortcodes)) | unavailable_shortcodes(conn, shortcodes)
+
 # --- Cookie handling logic ---
 def save_cookies_netscape(driver, cookie_file):
     cookies = driver.get_cookies()
-    with open(cookie_file, "w") as f:
+    tmp = cookie_file + ".tmp"
+    with open(tmp, "w") as f:
         f.write("# Netscape HTTP Cookie File\n")
         f.write("# Generated by social_export_tool\n\n")
         for cookie in cookies:
@@ -542,6 +869,7 @@ def save_cookies_netscape(driver, cookie_file):
             name = cookie.get('name', '')
             value = cookie.get('value', '')
             f.write(f"{domain}\t{domain_specified}\t{path}\t{secure}\t{expiry}\t{name}\t{value}\n")
+    os.replace(tmp, cookie_file)  # running downloads never see a half-written file
 
 def load_cookies_from_netscape(cookie_file):
     cookies = []
@@ -567,26 +895,264 @@ def load_cookies_from_netscape(cookie_file):
     except Exception:
         return []
 
-def are_cookies_valid(cookie_file=COOKIE_FILE):
+# --- Cookie validation cache ---
+# A live check costs a request to /accounts/edit/; a recent success is trusted for
+# COOKIE_VALIDATION_TTL_HOURS as long as the cookie file is unchanged and its
+# sessionid has not expired.
+COOKIE_VALIDATION_FILE = os.path.join(os.path.dirname(__file__), 'cookie_validation.json')
+_COOKIE_VALIDATION_LOCK = threading.Lock()
+
+def _cookie_file_signature(cookie_file):
+    st = os.stat(cookie_file)
+    return [int(st.st_mtime), st.st_size]
+
+def _cookie_signature_or_none(cookie_file):
+    return _cookie_file_signature(cookie_file) if os.path.exists(cookie_file) else None
+
+def session_expiry(cookies):
+    """Earliest sessionid expiry (epoch seconds), or None for session-only/missing expiry."""
+    expiries = [c['expiry'] for c in cookies if c['name'] == 'sessionid' and c.get('expiry')]
+    return min(expiries) if expiries else None
+
+def _update_cookie_validation(cookie_file, entry):
+    """Store (or with entry=None drop) the cached validation for one cookie file."""
+    key = os.path.abspath(cookie_file)
+    with _COOKIE_VALIDATION_LOCK:
+        state = _try_load_json(COOKIE_VALIDATION_FILE) or {}
+        if entry is None and key not in state:
+            return
+        if entry is None:
+            state.pop(key, None)
+        else:
+            state[key] = entry
+        try:
+            tmp = COOKIE_VALIDATION_FILE + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp, COOKIE_VALIDATION_FILE)
+        except OSError as e:
+            print(f"[COOKIES] Could not write {COOKIE_VALIDATION_FILE}: {e}")
+
+def forget_cookie_validation(cookie_file):
+    """Drop the cached validation (a download just hit a login prompt or checkpoint)."""
+    _update_cookie_validation(cookie_file, None)
+
+def carry_cookie_validation(cookie_file, old_signature):
+    """Keep a cached validation across our own rewrite of the cookie file (refreshed cookies)."""
+    key = os.path.abspath(cookie_file)
+    with _COOKIE_VALIDATION_LOCK:
+        state = _try_load_json(COOKIE_VALIDATION_FILE) or {}
+        entry = state.get(key)
+        if not entry or entry.get('signature') != old_signature:
+            return
+    entry['signature'] = _cookie_file_signature(cookie_file)
+    _update_cookie_validation(cookie_file, entry)
+
+def cached_cookie_validation(cookie_file, ttl_hours: float = None):
+    """
+    The cached validation for cookie_file if it is still trustworthy, else None.
+    Returns the entry: {'validated_at', 'signature', 'session_expires'}.
+    """
+    if ttl_hours is None:
+        ttl_hours = float(get_cfg_str(read_config(), "COOKIE_VALIDATION_TTL_HOURS", "12"))
+    if ttl_hours <= 0 or not os.path.exists(cookie_file):
+        return None
+    entry = (_try_load_json(COOKIE_VALIDATION_FILE) or {}).get(os.path.abspath(cookie_file))
+    if not entry:
+        return None
+    now = time.time()
+    if entry.get('signature') != _cookie_file_signature(cookie_file):
+        return None  # re-exported or edited since the last check
+    if now - entry.get('validated_at', 0) > ttl_hours * 3600:
+        return None
+    if entry.get('session_expires') and now >= entry['session_expires']:
+        return None
+    return entry
+
+def check_cookies_live(cookie_file=COOKIE_FILE) -> str:
+    """
+    Check the cookies against Instagram (a logged-out session is redirected).
+    Returns 'valid', 'invalid', or 'unreachable' when the request failed or Instagram
+    answered with a server error / rate limit, which says nothing about the session
+    (the cached validation is kept then).
+    Files without a sessionid, or with an expired one, are 'invalid' without a request.
+    """
     if not os.path.exists(cookie_file):
-        return False
+        return 'invalid'
     try:
         cookies = load_cookies_from_netscape(cookie_file)
-        if not cookies:
-            return False
+    except Exception:
+        return 'invalid'
+    if not cookies:
+        return 'invalid'
+    expires = session_expiry(cookies)
+    if not any(c['name'] == 'sessionid' for c in cookies) or (expires and expires <= time.time()):
+        forget_cookie_validation(cookie_file)
+        return 'invalid'
+    try:
         session = requests.Session()
         for cookie in cookies:
             session.cookies.set(cookie['name'], cookie['value'])
         resp = session.get("https://www.instagram.com/accounts/edit/", allow_redirects=False, timeout=10)
-        return resp.status_code == 200
-    except Exception:
-        return False
+    except requests.RequestException:
+        return 'unreachable'
+    if resp.status_code == 429 or resp.status_code >= 500:
+        return 'unreachable'
+    if resp.status_code != 200:
+        forget_cookie_validation(cookie_file)
+        return 'invalid'
+    _update_cookie_validation(cookie_file, {
+        'validated_at': time.time(),
+        'signature': _cookie_file_signature(cookie_file),
+        'session_expires': expires,
+    })
+    return 'valid'
+
+def are_cookies_valid(cookie_file=COOKIE_FILE, use_cache=False):
+    """
+    True if the live check passes (see check_cookies_live; unreachable counts as not valid).
+    use_cache=True accepts a fresh cached validation instead of the live check.
+    """
+    if use_cache and os.path.exists(cookie_file) and cached_cookie_validation(cookie_file):
+        return True
+    return check_cookies_live(cookie_file) == 'valid'
+
+def check_cookies_in_background(cookie_file, on_invalid=None, on_done=None):
+    """
+    Re-run the live cookie check on a daemon thread (startup trusted the cache).
+    on_invalid() is called if the cookies turn out to be invalid; on_done(result)
+    gets every outcome ('valid' | 'invalid' | 'unreachable').
+    """
+    def run():
+        result = check_cookies_live(cookie_file)
+        if result == 'unreachable':
+            print("\n[COOKIES] Background check could not reach Instagram; keeping the cached validation.")
+        elif result == 'invalid':
+            print(f"\n[COOKIES] Background check: {cookie_file} is no longer valid; "
+                  "the next download will ask for a login.")
+            if on_invalid:
+                on_invalid()
+        if on_done:
+            on_done(result)
+    thread = threading.Thread(target=run, name="cookie-check", daemon=True)
+    thread.start()
+    return thread
+
+# --- Shared cookie jar ---
+def _cookie_key(cookie):
+    return (cookie.domain, cookie.path, cookie.name)
+
+def _jar_state(jar) -> dict:
+    return {_cookie_key(c): (c.value, c.expires) for c in jar}
+
+class SharedCookieJar:
+    """
+    One in-memory http.cookiejar per cookie file, shared by every downloader.
+    yt-dlp and gallery-dl run as subprocesses, so each run gets a private snapshot
+    file (concurrent runs never overwrite each other). Afterwards the cookies the
+    tool changed (refreshed via Set-Cookie, or expired) are merged back, and the
+    cookie file is rewritten atomically only when something changed. A file
+    rewritten from outside (new login/export) replaces the in-memory jar.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.jar = MozillaCookieJar()
+        self._signature = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        self.jar.clear()
+        self.jar.load(self.path, ignore_discard=True, ignore_expires=True)
+        self._signature = _cookie_file_signature(self.path)
+
+    def _reload_if_replaced(self):
+        if os.path.exists(self.path) and _cookie_file_signature(self.path) != self._signature:
+            self._load()
+
+    @contextmanager
+    def snapshot(self):
+        """Yield a private cookie file for one downloader run; merge it back afterwards."""
+        with self._lock:
+            self._reload_if_replaced()
+            fd, tmp = tempfile.mkstemp(prefix=".cookies-", suffix=".txt",
+                                       dir=os.path.dirname(os.path.abspath(self.path)))
+            os.close(fd)
+            self.jar.save(tmp, ignore_discard=True, ignore_expires=True)
+            before = _jar_state(self.jar)
+        try:
+            yield tmp
+        finally:
+            try:
+                self._merge(tmp, before)
+            finally:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    def _merge(self, snapshot_path: str, before: dict):
+        after_jar = MozillaCookieJar()
+        try:
+            after_jar.load(snapshot_path, ignore_discard=True, ignore_expires=True)
+        except (LoadError, OSError):
+            return  # the tool left nothing usable; keep the shared jar as is
+        after = {_cookie_key(c): c for c in after_jar}
+        with self._lock:
+            self._reload_if_replaced()
+            changed = 0
+            for key, cookie in after.items():
+                if before.get(key) != (cookie.value, cookie.expires):
+                    self.jar.set_cookie(cookie)
+                    changed += 1
+            for key in before.keys() - after.keys():
+                try:
+                    self.jar.clear(*key)
+                    changed += 1
+                except KeyError:
+                    pass
+            if changed:
+                self._save()
+
+    def _save(self):
+        """Write the jar next to the cookie file and swap it in atomically."""
+        old_signature = self._signature
+        tmp = self.path + ".tmp"
+        try:
+            self.jar.save(tmp, ignore_discard=True, ignore_expires=True)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[COOKIES] Could not update {self.path}: {e}")
+            return
+        self._signature = _cookie_file_signature(self.path)
+        carry_cookie_validation(self.path, old_signature)
+
+_COOKIE_JARS = {}
+_COOKIE_JARS_LOCK = threading.Lock()
+
+def get_cookie_jar(cookie_file):
+    """The process-wide SharedCookieJar for a cookie file, or None if it cannot be parsed."""
+    key = os.path.abspath(cookie_file)
+    with _COOKIE_JARS_LOCK:
+        if key not in _COOKIE_JARS:
+            try:
+                _COOKIE_JARS[key] = SharedCookieJar(cookie_file)
+            except (LoadError, OSError) as e:
+                print(f"[COOKIES] {cookie_file} is not a loadable Netscape file ({e}); passing it to downloaders as is")
+                _COOKIE_JARS[key] = None
+        return _COOKIE_JARS[key]
+
+def cookie_snapshot(cookie_file):
+    """Context manager yielding the cookie file path to hand to one downloader run."""
+    jar = get_cookie_jar(cookie_file) if os.path.exists(cookie_file) else None
+    return jar.snapshot() if jar else nullcontext(cookie_file)
 
 # --- End cookie logic ---
 
 # --- Manual login with persistent Chrome profile ---
 def manual_login_and_export_cookies(profile_dir: str, cookie_file: str) -> bool:
 	os.makedirs(profile_dir, exist_ok=True)
+	shutdown_driver_pool()  # pooled scraper may hold the same user-data-dir
 	
 	print(f"[Manual Login] Using profile directory: {os.path.abspath(profile_dir)}")
 	
@@ -594,7 +1160,7 @@ def manual_login_and_export_cookies(profile_dir: str, cookie_file: str) -> bool:
 
 	driver = None
 	try:
-		service = Service(ChromeDriverManager().install())
+		service = chrome_service()
 		driver = webdriver.Chrome(service=service, options=options)
 
 		driver.get("https://www.instagram.com/accounts/login/")
@@ -628,11 +1194,12 @@ def manual_login_and_export_cookies(profile_dir: str, cookie_file: str) -> bool:
 			pass
 
 def automated_login_and_export_cookies(config, profile_dir: str, cookie_file: str) -> bool:
+	shutdown_driver_pool()  # pooled scraper may hold the same user-data-dir
 	options = build_chrome_options(profile_dir, "1280,900")
 	
 	driver = None
 	try:
-		service = Service(ChromeDriverManager().install())
+		service = chrome_service()
 		driver = webdriver.Chrome(service=service, options=options)
 		
 		driver.get('https://www.instagram.com/accounts/login/')
@@ -685,11 +1252,21 @@ def automated_login_and_export_cookies(config, profile_dir: str, cookie_file: st
 		except:
 			pass
 
-def ensure_valid_cookies(config) -> bool:
+def ensure_valid_cookies(config, checked=False) -> bool:
+	"""
+	Make sure the account's cookies work, logging in if needed.
+	checked=True: the caller already found them invalid, go straight to login.
+	"""
 	profile_dir, cookie_file = resolve_profile_and_cookie(config)
 	SAFER_MANUAL_LOGIN = parse_bool(config.get("SAFER_MANUAL_LOGIN"), True)
 	
-	if are_cookies_valid(cookie_file):
+	cached = None if checked else cached_cookie_validation(cookie_file)
+	if cached:
+		age_h = (time.time() - cached['validated_at']) / 3600
+		print(f"Cookies validated {age_h:.1f}h ago (cached). Skipping login; rechecking in the background.")
+		check_cookies_in_background(cookie_file)
+		return True
+	if not checked and are_cookies_valid(cookie_file):
 		print("Valid cookies found. Skipping login.")
 		return True
 
@@ -1013,23 +1590,6 @@ def validate_safety_config(config):
 
 
 
-def sanitize_filename(filename):
-    """
-    Sanitize filename by removing/replacing invalid characters.
-    
-    Args:
-        filename: Raw filename string
-        
-    Returns:
-        str: Sanitized filename safe for filesystem
-    """
-    # Remove or replace invalid characters
-    filename = unicodedata.normalize('NFKD', filename)
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-    filename = re.sub(r'\s+', ' ', filename)  # Replace multiple spaces with single
-    filename = filename.strip()
-    return filename
-
 def slug_from_send_text(s: str, max_len: int = 40) -> str:
 	if not s: return ""
 	s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
@@ -1129,18 +1689,18 @@ def extract_shortcode_from_url(url):
     
     return None
 
-def parse_liked_posts_json(liked_json_path: str) -> list[dict]:
+def parse_liked_posts_json(liked_json_path: str, since_ms: int = 0) -> list[dict]:
 	"""
 	Parse Instagram 'liked_posts.json' (your_instagram_activity/likes/liked_posts.json).
 	Returns a list of unified post dicts expected by download_post(...).
+	since_ms: incremental watermark; likes at or before it are dropped.
 	"""
 	posts: list[dict] = []
 	if not file_exists_nonempty(liked_json_path):
 		return posts
 
 	try:
-		with open(liked_json_path, 'r', encoding='utf-8') as f:
-			data = json.load(f) or {}
+		data = load_export_json(liked_json_path) or {}
 
 		items = (data.get('likes_media_likes') or [])
 		seen = set()
@@ -1154,6 +1714,9 @@ def parse_liked_posts_json(liked_json_path: str) -> list[dict]:
 			href = (entry.get('href') or '').strip()
 			ts = entry.get('timestamp') or 0
 
+			if since_ms and int(ts) * 1000 <= since_ms:
+				continue
+
 			shortcode = extract_shortcode_from_url(href)
 			if not shortcode:
 				continue
@@ -1176,10 +1739,11 @@ def parse_liked_posts_json(liked_json_path: str) -> list[dict]:
 
 	return posts
 
-def parse_saved_posts_json(saved_json_path: str) -> list[dict]:
+def parse_saved_posts_json(saved_json_path: str, since_ms: int = 0) -> list[dict]:
 	"""
 	Parse 'your_instagram_activity/saved/saved_posts.json'.
 	Returns a list of unified post dicts (no collection, goes to _unsorted).
+	since_ms: incremental watermark; saves at or before it are dropped.
 	Shape example (per export):
 	  saved_saved_media[*].string_map_data["Saved on"].{href, timestamp}
 	  title == username (may be absent sometimes)
@@ -1188,8 +1752,7 @@ def parse_saved_posts_json(saved_json_path: str) -> list[dict]:
 	if not file_exists_nonempty(saved_json_path):
 		return posts
 	try:
-		with open(saved_json_path, "r", encoding="utf-8") as f:
-			data = json.load(f) or {}
+		data = load_export_json(saved_json_path) or {}
 		items = data.get("saved_saved_media") or []
 		seen = set()
 		for it in items:
@@ -1197,6 +1760,8 @@ def parse_saved_posts_json(saved_json_path: str) -> list[dict]:
 			saved = (smd.get("Saved on") or {})
 			href = (saved.get("href") or "").strip()
 			ts = saved.get("timestamp") or 0
+			if since_ms and int(ts) * 1000 <= since_ms:
+				continue
 			shortcode = extract_shortcode_from_url(href)
 			if not shortcode or shortcode in seen:
 				continue
@@ -1218,7 +1783,7 @@ def parse_saved_posts_json(saved_json_path: str) -> list[dict]:
 	return posts
 
 
-def parse_saved_collections_json(saved_collections_json_path: str) -> list[dict]:
+def parse_saved_collections_json(saved_collections_json_path: str, since_ms: int = 0) -> list[dict]:
 	"""
 	Parse 'your_instagram_activity/saved/saved_collections.json'.
 	The file is run-length encoded by collection:
@@ -1227,13 +1792,13 @@ def parse_saved_collections_json(saved_collections_json_path: str) -> list[dict]
 		string_map_data["Name"].href = post link
 		string_map_data["Added Time"].timestamp = when added
 	Returns a list of unified post dicts with an extra key "_collection".
+	since_ms: incremental watermark; rows added at or before it are dropped.
 	"""
 	posts: list[dict] = []
 	if not file_exists_nonempty(saved_collections_json_path):
 		return posts
 	try:
-		with open(saved_collections_json_path, "r", encoding="utf-8") as f:
-			data = json.load(f) or {}
+		data = load_export_json(saved_collections_json_path) or {}
 		items = data.get("saved_saved_collections") or []
 		current_collection = None
 		seen = set()
@@ -1254,6 +1819,8 @@ def parse_saved_collections_json(saved_collections_json_path: str) -> list[dict]
 				# Some exports might not set href on header rows or malformed rows
 				continue
 			ts = (smd.get("Added Time") or {}).get("timestamp") or 0
+			if since_ms and int(ts) * 1000 <= since_ms:
+				continue
 
 			shortcode = extract_shortcode_from_url(href)
 			if not shortcode or shortcode in seen:
@@ -1316,125 +1883,37 @@ def ensure_collection_dir(base_download_dir: str, collection_name: str) -> str:
     os.makedirs(path, exist_ok=True)
     return path
 
-def _shortcode_from_share_link(url: str) -> str | None:
-	if not url: return None
+def extract_dm_posts_and_profiles(dm_json_path, thread_name=None, since_ms: int = 0):
+	"""
+	Extract posts and profiles from a DM thread (all message_*.json parts next to dm_json_path).
+	
+	Args:
+		dm_json_path: Path to a message_*.json file of the thread
+		thread_name: Name of the DM thread/conversation
+		since_ms: Optional incremental watermark
+		
+	Returns:
+		tuple: (posts_list, profiles_list, send_text_hits)
+	"""
+	posts = []
+	profiles = []
 	try:
-		u = urlparse(url)
-		host = (u.netloc or "").lower()
-		if "instagram.com" not in host:
-			return None
-		parts = [p for p in (u.path or "").split("/") if p]
-		if not parts: 
-			return None
-		# Accept only structured share types; no raw-link fallback
-		if parts[0] in ("reel", "p", "tv") and len(parts) > 1:
-			return parts[1]
-		return None
-	except Exception:
-		return None
+		messages, _parts = load_dm_thread_messages(os.path.dirname(dm_json_path))
+		for kind, item in iter_dm_shares(messages, thread_name, since_ms):
+			if kind == 'post':
+				posts.append(item)
+			else:
+				profiles.append(item)
+	except Exception as e:
+		print(f"Error parsing DM JSON {dm_json_path}: {e}")
+	send_text_hits = sum(1 for p in posts if p.get('send_text'))
+	return posts, profiles, send_text_hits
 
-def extract_dm_posts_and_profiles(dm_json_path, thread_name=None):
-    """
-    Extract posts and profiles from DM JSON file.
-    
-    Args:
-        dm_json_path: Path to message_1.json file
-        thread_name: Name of the DM thread/conversation
-        
-    Returns:
-        tuple: (posts_list, profiles_list, send_text_hits)
-    """
-    posts = []
-    profiles = []
-    send_text_hits = 0
-    
-    try:
-        with open(dm_json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Navigate to messages array
-        messages = data.get('messages', [])
-        
-        # First pass: collect all shares and their timestamps/senders
-        shares = []
-        for i, message in enumerate(messages):
-            if 'share' in message:
-                share = message['share']
-                link = share.get('link', '')
-                
-                if not link:
-                    continue
-                
-                # Check if it's a profile share
-                if '/_u/' in link:
-                    # Profile share
-                    username_match = re.search(r'/_u/([^/]+)', link)
-                    if username_match:
-                        profile_data = {
-                            'username': username_match.group(1),
-                            'profile_name': share.get('share_text', ''),
-                            'timestamp': message.get('timestamp_ms', 0)
-                        }
-                        profiles.append(profile_data)
-                else:
-                    # Post share
-                    shortcode = extract_shortcode_from_url(link)
-                    if shortcode:
-                        share_data = {
-                            'index': i,
-                            'shortcode': shortcode,
-                            'url': link,
-                            'original_owner': share.get('original_owner', ''),
-                            'share_text': share.get('share_text', ''),
-                            'timestamp_ms': message.get('timestamp_ms', 0),
-                            'sender': message.get('sender_name', ''),
-                            'source': 'dm',
-                            'dm_thread': thread_name
-                        }
-                        shares.append(share_data)
-        
-        # Second pass: for each share, look for send messages
-        for share_data in shares:
-            share_ts = share_data['timestamp_ms']
-            share_sender = share_data['sender']
-            share_index = share_data['index']
-            
-            # Look for send message: next human text message by same sender within 1s
-            send_text = None
-            for j in range(share_index + 1, len(messages)):
-                msg = messages[j]
-                msg_ts = msg.get('timestamp_ms', 0)
-                msg_sender = msg.get('sender_name', '')
-                
-                # Check if this is a human text message (not a system/reaction line)
-                if 'content' in msg and msg_sender == share_sender:
-                    time_diff = msg_ts - share_ts
-                    if 0 < time_diff < 1000:  # Strictly under 1s
-                        send_text = msg['content']
-                        send_text_hits += 1
-                        break
-                    elif time_diff >= 1000:  # Too late, stop looking
-                        break
-            
-            # Create post data
-            post_data = {
-                'shortcode': share_data['shortcode'],
-                'url': share_data['url'],
-                'original_owner': share_data['original_owner'],
-                # do not set caption here; sidecar will populate it
-                'timestamp_ms': share_data['timestamp_ms'],
-                'source': 'dm',
-                'dm_thread': thread_name,
-                'send_text': send_text  # Add send_text field
-            }
-            posts.append(post_data)
-    
-    except Exception as e:
-        print(f"Error parsing DM JSON {dm_json_path}: {e}")
-    
-    return posts, profiles, send_text_hits
+def is_recorded(conn, shortcode) -> bool:
+	"""True if the post is downloaded, or downloaded and still being post-processed (no fetch needed)."""
+	return is_downloaded(conn, shortcode) or (_POSTPROCESSOR is not None and _POSTPROCESSOR.is_pending(shortcode))
 
-def download_post(conn, post_data, download_dir, pacer=None, config=None):
+def download_post(conn, post_data, download_dir, pacer=None, config=None, cookie_file=None):
 	"""
 	Download a single Instagram post using yt-dlp with fallback to gallery-dl.
 	
@@ -1444,6 +1923,7 @@ def download_post(conn, post_data, download_dir, pacer=None, config=None):
 		download_dir: Directory to save the download
 		pacer: SafetyPacer instance for rate limiting
 		config: Configuration dictionary
+		cookie_file: Cookie jar for yt-dlp/gallery-dl (default COOKIE_FILE)
 		
 	Returns:
 		bool: True if download successful, False otherwise
@@ -1455,8 +1935,8 @@ def download_post(conn, post_data, download_dir, pacer=None, config=None):
 		print(f"Missing shortcode or URL for post")
 		return False
 	
-	# Check if already downloaded
-	if is_downloaded(conn, shortcode):
+	# Check if already downloaded (or downloaded and still being post-processed)
+	if is_recorded(conn, shortcode):
 		print(f"[SKIPPED] {shortcode} already recorded")
 		SESSION_TRACKER.record_download_skip()
 		return True
@@ -1466,9 +1946,147 @@ def download_post(conn, post_data, download_dir, pacer=None, config=None):
 	
 	# Safety pacing before download; honor cancel
 	if pacer:
-		if not pacer.before_download() or SHUTDOWN.is_set():
+		if not pacer.acquire():
 			return False
-    
+		if SHUTDOWN.is_set():
+			pacer.release(False)
+			return False
+	
+	ok = False
+	try:
+		ok = _fetch_post(conn, post_data, download_dir, config, cookie_file or COOKIE_FILE)
+		return ok
+	except RateLimitError:
+		if pacer: pacer.record_block('rate_limit')
+		raise
+	except CheckpointError:
+		if pacer: pacer.record_block('checkpoint')
+		raise
+	except LoginRequiredError:
+		if pacer: pacer.record_block('login_required')
+		raise
+	finally:
+		# Failures and block errors refund the reserved cap token
+		if pacer:
+			pacer.release(ok)
+
+def _finish_download(conn, post_data, saved_path, tool, basename, download_dir, config=None):
+	"""
+	Post-process a finished download: sidecar enrichment, one rename, DB record.
+	Runs inline, or on the background PostProcessor when PIPELINED_POSTPROCESS=true.
+	"""
+	if parse_bool((config or {}).get("PIPELINED_POSTPROCESS"), False):
+		get_postprocessor(conn).submit(post_data['shortcode'], _finalize_download,
+		                               post_data, saved_path, tool, basename, download_dir, config)
+	else:
+		_finalize_download(conn, post_data, saved_path, tool, basename, download_dir, config)
+
+def _finalize_download(conn, post_data, saved_path, tool, basename, download_dir, config=None):
+	shortcode = post_data.get('shortcode')
+	
+	# Enrich post data from metadata sidecar
+	enrich_post_from_sidecar(post_data, saved_path, tool=tool, basename=basename, download_dir=download_dir)
+	
+	# Recompute basename now that caption/timestamp may be set; rename once.
+	if saved_path:
+		new_basename = build_output_basename(post_data, config)
+		if new_basename and new_basename != basename:
+			_root, ext = os.path.splitext(saved_path)
+			dst = os.path.join(download_dir, new_basename + ext)
+			try:
+				if not os.path.exists(dst):
+					os.rename(saved_path, dst)
+					saved_path = dst
+			except Exception:
+				pass
+	
+	status = record_download(conn, post_data, saved_path)   # pass path
+	if status == "inserted":
+		fname = os.path.basename(saved_path) if saved_path else f"{shortcode}"
+		print(f"Successfully downloaded and recorded {fname}")
+		if saved_path:
+			print(f"[LINK]  {to_file_uri(saved_path)}")
+		SESSION_TRACKER.record_download_success()
+	elif status == "duplicate":
+		print(f"[DUPLICATE] {shortcode} already in database")
+		SESSION_TRACKER.record_download_skip()
+	else:
+		print(f"[ERROR] {shortcode} → database error")
+		SESSION_TRACKER.record_error(f"Database error for {shortcode}")
+
+# --- Pipelined post-processing ---
+class PostProcessor:
+	"""
+	Single background worker that finalizes downloads (sidecar, rename, DB record)
+	while the pacer waits before the next item. Uses its own DB connection;
+	submission order is preserved.
+	"""
+	def __init__(self, db_path):
+		self.db_path = db_path
+		self._queue = queue.Queue()
+		self._pending = set()
+		self._lock = threading.Lock()
+		self._thread = threading.Thread(target=self._run, name="postprocess", daemon=True)
+		self._thread.start()
+
+	def submit(self, shortcode, fn, *args):
+		with self._lock:
+			self._pending.add(shortcode)
+		self._queue.put((shortcode, fn, args))
+
+	def is_pending(self, shortcode) -> bool:
+		with self._lock:
+			return shortcode in self._pending
+
+	def drain(self):
+		"""Block until every submitted item has been finalized."""
+		if self._queue.unfinished_tasks:
+			print("[POST] Finishing post-processing of downloaded items...")
+		self._queue.join()
+
+	def _run(self):
+		conn = init_db(self.db_path)
+		while True:
+			shortcode, fn, args = self._queue.get()
+			try:
+				fn(conn, *args)
+			except Exception as e:
+				print(f"[ERROR] Post-processing failed for {shortcode}: {e}")
+				SESSION_TRACKER.record_error(f"Post-processing failed: {shortcode} - {e}")
+			finally:
+				with self._lock:
+					self._pending.discard(shortcode)
+				self._queue.task_done()
+
+_POSTPROCESSOR = None
+_POSTPROCESSOR_LOCK = threading.Lock()
+
+def get_postprocessor(conn) -> PostProcessor:
+	global _POSTPROCESSOR
+	with _POSTPROCESSOR_LOCK:
+		if _POSTPROCESSOR is None:
+			# Same database file as the caller's connection
+			db_path = conn.execute('PRAGMA database_list').fetchone()[2]
+			_POSTPROCESSOR = PostProcessor(db_path)
+			atexit.register(drain_postprocessing)
+		return _POSTPROCESSOR
+
+def drain_postprocessing():
+	"""Wait for pipelined post-processing to finish (no-op when it is not in use)."""
+	if _POSTPROCESSOR is not None:
+		_POSTPROCESSOR.drain()
+
+def _fetch_post(conn, post_data, download_dir, config=None, cookie_file=COOKIE_FILE):
+	"""
+	Run yt-dlp with gallery-dl as fallback and record the outcome (no pacing).
+	
+	Returns:
+		bool: True if download successful, False otherwise
+	"""
+	shortcode = post_data.get('shortcode')
+	url = post_data.get('url')
+	started = time.monotonic()
+	
 	# Generate filename using the canonical basename builder
 	basename = build_output_basename(post_data, config)
 	filename_template = basename + ".%(ext)s"
@@ -1478,20 +2096,21 @@ def download_post(conn, post_data, download_dir, pacer=None, config=None):
 	
 	# Try yt-dlp first
 	try:
-		cmd = [
-			'yt-dlp',
-			'--cookies', COOKIE_FILE,
-			'--output', output_path,
-			'--no-check-certificate',
-			'--ignore-errors',
-			'--write-info-json',
-			'--no-simulate',
-			'--no-write-playlist-metafiles',
-			'--print', 'after_move:filepath',   # NEW: print final saved file path
-			url
-		]
-		
-		result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+		with cookie_snapshot(cookie_file) as cookies_path:
+			cmd = [
+				'yt-dlp',
+				'--cookies', cookies_path,
+				'--output', output_path,
+				'--no-check-certificate',
+				'--ignore-errors',
+				'--write-info-json',
+				'--no-simulate',
+				'--no-write-playlist-metafiles',
+				'--print', 'after_move:filepath',   # NEW: print final saved file path
+				url
+			]
+			
+			result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
 		
 		# Check for rate limit errors
 		if result.returncode != 0:
@@ -1512,41 +2131,14 @@ def download_post(conn, post_data, download_dir, pacer=None, config=None):
 			if saved_path and not os.path.isabs(saved_path):
 				saved_path = os.path.abspath(os.path.join(download_dir, saved_path))
 			
-			# Enrich post data from metadata sidecar
-			enrich_post_from_sidecar(post_data, saved_path, tool='yt-dlp', basename=basename, download_dir=download_dir)
-			
-			# NEW: Recompute basename now that caption/timestamp may be set; rename once.
-			if saved_path:
-				new_basename = build_output_basename(post_data, config)
-				if new_basename and new_basename != basename:
-					_root, ext = os.path.splitext(saved_path)
-					dst = os.path.join(download_dir, new_basename + ext)
-					try:
-						if not os.path.exists(dst):
-							os.rename(saved_path, dst)
-							saved_path = dst
-					except Exception:
-						pass
-			
-			status = record_download(conn, post_data, saved_path)   # pass path
-			if status == "inserted":
-				fname = os.path.basename(saved_path) if saved_path else f"{shortcode}"
-				print(f"Successfully downloaded and recorded {fname}")
-				if saved_path:
-					print(f"[LINK]  {to_file_uri(saved_path)}")
-				if pacer:
-					pacer.after_success()
-				SESSION_TRACKER.record_download_success()
-			elif status == "duplicate":
-				print(f"[DUPLICATE] {shortcode} already in database")
-				SESSION_TRACKER.record_download_skip()
-			else:
-				print(f"[ERROR] {shortcode} → database error")
-				SESSION_TRACKER.record_error(f"Database error for {shortcode}")
+			post_data['duration_ms'] = int((time.monotonic() - started) * 1000)
+			_finish_download(conn, post_data, saved_path, 'yt-dlp', basename, download_dir, config)
 			return True
 		else:
 			print(f"yt-dlp failed for {shortcode}: {result.stderr}")
 			
+	except (RateLimitError, CheckpointError, LoginRequiredError, NotFoundError):
+		raise  # block signals go to the caller's handling, not the fallback
 	except subprocess.TimeoutExpired:
 		print(f"yt-dlp timeout for {shortcode}")
 	except Exception as e:
@@ -1559,18 +2151,19 @@ def download_post(conn, post_data, download_dir, pacer=None, config=None):
 		# Use the same basename builder for consistency
 		gallery_filename = f"{basename}_{{num}}.{{extension}}"
 
-		cmd = [
-			'gallery-dl',
-			'--cookies', COOKIE_FILE,
-			'--directory', download_dir,
-			'--filename', gallery_filename,
-			'-o', 'write-metadata=true',
-			'-o', f'metadata-filename={basename}.json',
-			'--exec', 'echo {filepath}',
-			url
-		]
-		
-		result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+		with cookie_snapshot(cookie_file) as cookies_path:
+			cmd = [
+				'gallery-dl',
+				'--cookies', cookies_path,
+				'--directory', download_dir,
+				'--filename', gallery_filename,
+				'-o', 'write-metadata=true',
+				'-o', f'metadata-filename={basename}.json',
+				'--exec', 'echo {filepath}',
+				url
+			]
+			
+			result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
 		
 		# Check for rate limit errors
 		if result.returncode != 0:
@@ -1608,38 +2201,14 @@ def download_post(conn, post_data, download_dir, pacer=None, config=None):
 			if saved_path and not os.path.isabs(saved_path):
 				saved_path = os.path.abspath(os.path.join(download_dir, saved_path))
 			
-			# Enrich post data from metadata sidecar
-			enrich_post_from_sidecar(post_data, saved_path, tool='gallery-dl', basename=basename, download_dir=download_dir)
-			
-			# NEW: Recompute basename using sidecar-enriched caption/timestamp; rename once.
-			if saved_path:
-				new_basename = build_output_basename(post_data, config)
-				if new_basename and new_basename != basename:
-					_root, ext = os.path.splitext(saved_path)
-					dst = os.path.join(download_dir, new_basename + ext)
-					try:
-						if not os.path.exists(dst):
-							os.rename(saved_path, dst)
-							saved_path = dst
-					except Exception:
-						pass
-			
-			status = record_download(conn, post_data, saved_path)   # pass path
-			if status == "inserted":
-				fname = os.path.basename(saved_path) if saved_path else f"{shortcode}"
-				print(f"Successfully downloaded and recorded {fname}")
-				if saved_path:
-					print(f"[LINK]  {to_file_uri(saved_path)}")
-				if pacer:
-					pacer.after_success()
-			elif status == "duplicate":
-				print(f"[DUPLICATE] {shortcode} already in database")
-			else:
-				print(f"[ERROR] {shortcode} → database error")
+			post_data['duration_ms'] = int((time.monotonic() - started) * 1000)
+			_finish_download(conn, post_data, saved_path, 'gallery-dl', basename, download_dir, config)
 			return True
 		else:
 			print(f"gallery-dl failed for {shortcode}: {result.stderr}")
 			
+	except (RateLimitError, CheckpointError, LoginRequiredError, NotFoundError):
+		raise  # block signals go to the caller's handling, not the fallback
 	except subprocess.TimeoutExpired:
 		print(f"gallery-dl timeout for {shortcode}")
 	except Exception as e:
@@ -1674,176 +2243,449 @@ def download_post(conn, post_data, download_dir, pacer=None, config=None):
 
 
 
-def extract_urls_from_current_page(driver, username):
-    """Extract URLs and captions from the current page state"""
-    urls = set()
-    post_data = {}
-    
-    # Try multiple selectors for post links
-    selectors = [
-        "a[href*='/p/']",
-        "a[href*='/reel/']",
-        "article a[href*='/p/']",
-        "article a[href*='/reel/']",
-        "div[role='button'] a[href*='/p/']",
-        "div[role='button'] a[href*='/reel/']"
-    ]
-    
-    for selector in selectors:
-        try:
-            post_links = driver.find_elements(By.CSS_SELECTOR, selector)
-            
-            for link in post_links:
-                href = link.get_attribute('href')
-                if href and ('/p/' in href or '/reel/' in href):
-                    urls.add(href)
-                    
-                    # Try to get caption from the post
-                    try:
-                        # Look for caption in nearby elements
-                        caption_element = link.find_element(By.XPATH, ".//ancestor::article//div[contains(@class, 'caption') or contains(@class, 'text')]")
-                        caption = caption_element.text.strip()
-                        if caption:
-                            post_data[href] = caption
-                    except:
-                        # No caption found, that's okay
-                        pass
-        except Exception as e:
-            # Silently continue if selector fails
-            pass
-    
-    return urls, post_data
+# --- WebDriver pool for profile scraping ---
+class _DriverSlot:
+    def __init__(self, user_data_dir: str, seeded: bool):
+        self.user_data_dir = user_data_dir
+        self.seeded = seeded   # throwaway user-data-dir that needs cookies copied in
+        self.driver = None
+        self.pages = 0
+        self.busy = False
 
-def get_profile_post_urls(username):
-    """Get all post URLs from a profile using Selenium"""
-    print(f"[PROFILE] Getting post URLs for @{username} using Selenium")
-    
-    try:
-        # Dictionary to store URLs and their captions
-        post_data = {}
-        
-        # Get profile directory from config
-        config = read_config()
-        profile_dir, _ = resolve_profile_and_cookie(config)
-        
-        # Set up Chrome options
-        options = build_chrome_options(profile_dir, "1280,900")
-        
-        # Create driver
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        
+class DriverPool:
+    """
+    Lazily created Chrome sessions reused across usernames.
+    Slot 0 uses the account's persistent profile dir. Chrome cannot share one user-data-dir
+    between processes, so extra slots (DRIVER_POOL_SIZE > 1) get throwaway dirs
+    seeded with the exported cookies. Sessions are health-checked on every lease
+    and recycled after `recycle_after` pages. Sessions use the crawl-only options
+    (headless, media blocked) unless disabled.
+    """
+    def __init__(self, profile_dir: str, size: int = 1, recycle_after: int = 50, cookie_file: str = COOKIE_FILE, capture_network: bool = False, headless: bool = True, block_media: bool = True):
+        self.profile_dir = profile_dir
+        self.size = max(1, int(size))
+        self.recycle_after = int(recycle_after)
+        self.cookie_file = cookie_file
+        self.capture_network = capture_network  # performance log for network crawl mode
+        self.headless = headless
+        self.block_media = block_media
+        self._slots = []
+        self._cond = threading.Condition()
+
+    def _new_slot(self) -> _DriverSlot:
+        if not self._slots:
+            return _DriverSlot(self.profile_dir, seeded=False)
+        return _DriverSlot(tempfile.mkdtemp(prefix="social_export_chrome_"), seeded=True)
+
+    def _start(self, slot: _DriverSlot):
+        os.makedirs(slot.user_data_dir, exist_ok=True)
+        options = build_crawl_chrome_options(slot.user_data_dir, headless=self.headless)
+        if self.capture_network:
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        slot.driver = webdriver.Chrome(service=chrome_service(), options=options)
+        slot.pages = 0
+        if self.block_media:
+            block_crawl_resources(slot.driver)
+        if slot.seeded:
+            slot.driver.get("https://www.instagram.com/")
+            for c in load_cookies_from_netscape(self.cookie_file):
+                cookie = {k: v for k, v in c.items() if v is not None}
+                try:
+                    slot.driver.add_cookie(cookie)
+                except Exception:
+                    pass
+
+    @staticmethod
+    def _healthy(slot: _DriverSlot) -> bool:
+        try:
+            slot.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _stop(slot: _DriverSlot):
+        try:
+            if slot.driver: slot.driver.quit()
+        except Exception:
+            pass
+        slot.driver = None
+
+    @contextmanager
+    def lease(self):
+        """Borrow a live driver; blocks while all slots are busy."""
+        with self._cond:
+            while True:
+                if SHUTDOWN.is_set():
+                    raise RuntimeError("shutdown requested")
+                slot = next((sl for sl in self._slots if not sl.busy), None)
+                if slot is None and len(self._slots) < self.size:
+                    slot = self._new_slot()
+                    self._slots.append(slot)
+                if slot is not None:
+                    slot.busy = True
+                    break
+                self._cond.wait(0.5)
+        try:
+            if slot.driver is not None:
+                if self.recycle_after > 0 and slot.pages >= self.recycle_after:
+                    print(f"[POOL] Recycling browser after {slot.pages} pages")
+                    self._stop(slot)
+                elif not self._healthy(slot):
+                    print("[POOL] Browser session is unresponsive; restarting it")
+                    self._stop(slot)
+            if slot.driver is None:
+                self._start(slot)
+            slot.pages += 1
+            yield slot.driver
+        finally:
+            with self._cond:
+                slot.busy = False
+                self._cond.notify()
+            if SHUTDOWN.is_set():
+                self.shutdown()
+
+    def shutdown(self):
+        """Quit every browser and drop throwaway profiles. The pool stays usable (lazy restart)."""
+        with self._cond:
+            for slot in self._slots:
+                self._stop(slot)
+                if slot.seeded:
+                    shutil.rmtree(slot.user_data_dir, ignore_errors=True)
+            self._slots = [sl for sl in self._slots if not sl.seeded]
+
+_DRIVER_POOLS = {}  # account name (None without ACCOUNTS) -> DriverPool
+_DRIVER_POOL_LOCK = threading.Lock()
+
+def get_driver_pool(account=None) -> DriverPool:
+    """Browser pool over an account's own Chrome profile and cookies (default: the first account)."""
+    with _DRIVER_POOL_LOCK:
+        config = read_config()
+        names = get_account_names(config)
+        if account is None and names:
+            account = names[0]  # same profile dir, so the same pool
+        pool = _DRIVER_POOLS.get(account)
+        if pool is None:
+            profile_dir, cookie_file = resolve_profile_and_cookie(config, account)
+            pool = DriverPool(
+                profile_dir,
+                size=int(get_cfg_str(config, "DRIVER_POOL_SIZE", "1")),
+                recycle_after=int(get_cfg_str(config, "DRIVER_RECYCLE_PAGES", "50")),
+                cookie_file=cookie_file,
+                capture_network=get_crawl_mode(config) == "network",
+                headless=parse_bool(config.get("CRAWL_HEADLESS"), True),
+                block_media=parse_bool(config.get("CRAWL_BLOCK_MEDIA"), True),
+            )
+            if not _DRIVER_POOLS:
+                atexit.register(shutdown_driver_pool)
+            _DRIVER_POOLS[account] = pool
+        return pool
+
+def shutdown_driver_pool():
+    """Close pooled browsers, e.g. before a login flow needs the persistent profile dir."""
+    for pool in list(_DRIVER_POOLS.values()):
+        pool.shutdown()
+
+# One round-trip: collect deduped post/reel links (+ caption when the grid shows one)
+# in the page and return them as a JSON array of [href, caption] pairs.
+EXTRACT_LINKS_JS = """
+const out = [];
+const seen = new Set();
+for (const a of document.querySelectorAll("a[href*='/p/'], a[href*='/reel/']")) {
+    const href = a.href;
+    if (!href || seen.has(href)) continue;
+    seen.add(href);
+    let caption = "";
+    const article = a.closest("article");
+    if (article) {
+        const el = article.querySelector("div[class*='caption'], div[class*='text']");
+        if (el) caption = (el.innerText || "").trim();
+    }
+    out.push([href, caption]);
+}
+return JSON.stringify(out);
+"""
+
+def extract_urls_from_current_page(driver, username):
+    """Extract URLs (in grid order, newest first) and captions from the current page state (single execute_script call)"""
+    urls = []
+    post_data = {}
+    try:
+        pairs = json.loads(driver.execute_script(EXTRACT_LINKS_JS) or "[]")
+    except Exception:
+        # Page navigated or script blocked; caller will retry after the next scroll
+        return urls, post_data
+    for href, caption in pairs:
+        if href and ('/p/' in href or '/reel/' in href):
+            urls.append(href)
+            if caption:
+                post_data[href] = caption
+    return urls, post_data
+
+# --- Network-level feed capture (CDP) ---
+def get_crawl_mode(config: dict) -> str:
+    mode = get_cfg_str(config, "PROFILE_CRAWL_MODE", "dom").lower()
+    return mode if mode in ("dom", "network") else "dom"
+
+def get_instagram_base_url(config: dict) -> str:
+    return get_cfg_str(config, "INSTAGRAM_BASE_URL", DEFAULT_INSTAGRAM_BASE_URL).rstrip("/")
+
+def drain_feed_posts(driver, pending_requests: dict) -> list[dict]:
+    """
+    Read the performance log since the last call and return posts from finished
+    feed responses. pending_requests carries matched-but-unfinished request ids between calls.
+    """
+    posts = []
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return posts
+    for entry in entries:
         try:
+            msg = json.loads(entry["message"])["message"]
+        except Exception:
+            continue
+        method = msg.get("method")
+        params = msg.get("params") or {}
+        if method == "Network.responseReceived":
+            url = ((params.get("response") or {}).get("url")) or ""
+            if FEED_URL_RE.search(url):
+                pending_requests[params.get("requestId")] = url
+        elif method == "Network.loadingFinished" and params.get("requestId") in pending_requests:
+            request_id = params["requestId"]
+            pending_requests.pop(request_id, None)
+            try:
+                body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            except Exception:
+                continue
+            payload = decode_feed_body(body.get("body"))
+            if payload is not None:
+                posts.extend(parse_feed_payload(payload))
+    return posts
+
+# Grid size + link count; either growing after a scroll means new posts were rendered
+GRID_STATE_JS = "return [document.body.scrollHeight, document.querySelectorAll(\"a[href*='/p/'], a[href*='/reel/']\").length];"
+
+def _wait_for_grid_growth(driver, previous_state, timeout: float):
+    """
+    Wait until the page grows past previous_state (scroll height or link count).
+    Returns the new state, or None on timeout (bottom reached) or shutdown.
+    """
+    result = {}
+    def grown(d):
+        if SHUTDOWN.is_set():
+            return True
+        state = d.execute_script(GRID_STATE_JS)
+        if state[0] > previous_state[0] or state[1] > previous_state[1]:
+            result['state'] = state
+            return True
+        return False
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.25).until(grown)
+    except TimeoutException:
+        return None
+    return result.get('state')
+
+def crawl_profile_posts(username, emit, config=None, outcome=None) -> bool:
+    """
+    Scroll a profile grid and call emit(url, meta) for every newly discovered post as
+    soon as it renders, so downloads can start while scrolling continues.
+    meta is {caption, timestamp_ms, original_owner} (whatever was captured).
+    emit returns False to stop the crawl early.
+    
+    Scrolling waits on grid growth instead of fixed sleeps, bounded by
+    PROFILE_MAX_SCROLLS (0 = until the bottom) and PROFILE_SCROLL_WAIT seconds per scroll.
+    
+    outcome (optional dict) gets 'ended': 'bottom' (whole grid walked), 'stopped'
+    (emit asked to stop), 'budget', 'shutdown', 'fallback' (page-source parsing),
+    'empty' or 'error'. Only 'bottom' and 'stopped' mean the crawl saw its full range.
+    
+    Returns:
+        bool: True if any posts were emitted
+    """
+    print(f"[PROFILE] Getting post URLs for @{username} using Selenium")
+    outcome = outcome if outcome is not None else {}
+    outcome['ended'] = 'error'
+    
+    try:
+        config = config or read_config()
+        network_mode = get_crawl_mode(config) == "network"
+        base_url = get_instagram_base_url(config)
+        max_scrolls = int(get_cfg_str(config, "PROFILE_MAX_SCROLLS", "20"))
+        scroll_wait = float(get_cfg_str(config, "PROFILE_SCROLL_WAIT", "8"))
+        
+        # Reuse a pooled browser session instead of starting Chrome per username; with
+        # ACCOUNTS, the page load goes to the account that can start soonest
+        rotation = get_account_rotation()
+        account = rotation.pick() if rotation is not None else None
+        with get_driver_pool(account.name if account else None).lease() as driver:
+            pending_requests = {}
+            # One item per shortcode: /p/, /reel/ and /<user>/p/ links and feed payloads merge
+            merge = GridMerge(emit)
+            seen = merge.seen
+            
+            def collect():
+                # Network payloads first: they carry exact metadata for the same posts
+                if network_mode:
+                    merge.add_feed(drain_feed_posts(driver, pending_requests))
+                current_urls, captions = extract_urls_from_current_page(driver, username)
+                merge.add_links(current_urls, captions)
+            
+            if network_mode:
+                try:
+                    driver.execute_cdp_cmd("Network.enable", {})
+                    driver.get_log("performance")  # drop entries from earlier pages
+                except Exception as e:
+                    print(f"[PROFILE] Network capture unavailable ({e}); using DOM only")
+                    network_mode = False
+            
             # Navigate to profile
-            profile_url = f"https://www.instagram.com/{username}/"
+            profile_url = f"{base_url}/{username}/"
             print(f"[PROFILE] Loading profile page: {profile_url}")
             
             driver.get(profile_url)
             
-            # Wait for page to load
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            # Wait for posts to load - look for the post grid
+            # Wait for the first grid links to render
             try:
                 WebDriverWait(driver, 15).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "article"))
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "a[href*='/p/'], a[href*='/reel/']"))
                 )
                 print(f"[PROFILE] Found post grid for @{username}")
-            except:
+            except TimeoutException:
                 print(f"[PROFILE] Post grid not found, trying to scroll for @{username}")
             
-            # Scroll down to load more posts
-            if sleep_with_cancel(3):
-                return [], {}
-            
-            # Scroll down to load all posts and collect URLs during scrolling
-            previous_height = driver.execute_script("return document.body.scrollHeight")
+            state = driver.execute_script(GRID_STATE_JS)
             scroll_attempts = 0
-            max_scrolls = 20  # Limit to prevent infinite scrolling
-            all_urls = set()  # Use set to avoid duplicates
-            all_post_data = {}
             
-            while scroll_attempts < max_scrolls:
-                # Collect URLs before scrolling
-                current_urls, current_post_data = extract_urls_from_current_page(driver, username)
-                all_urls.update(current_urls)
-                all_post_data.update(current_post_data)
+            while not SHUTDOWN.is_set() and not merge.stopped:
+                collect()
+                if merge.stopped:
+                    break
+                print(f"[PROFILE] After scroll {scroll_attempts}: Found {len(seen)} total URLs for @{username}")
                 
-                print(f"[PROFILE] After scroll {scroll_attempts}: Found {len(all_urls)} total URLs for @{username}")
+                if max_scrolls and scroll_attempts >= max_scrolls:
+                    print(f"[PROFILE] Scroll budget ({max_scrolls}) reached for @{username}")
+                    outcome['ended'] = 'budget'
+                    break
                 
-                # Scroll down
+                # Scroll down and wait for new posts to render
                 driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                if sleep_with_cancel(2):
-                    return [], {}
-                
-                # Check if new content loaded
-                new_height = driver.execute_script("return document.body.scrollHeight")
-                if new_height == previous_height:
+                new_state = _wait_for_grid_growth(driver, state, scroll_wait)
+                if new_state is None:
                     # No new content loaded, we've reached the bottom
                     print(f"[PROFILE] Reached bottom after {scroll_attempts} scrolls for @{username}")
+                    outcome['ended'] = 'bottom'
                     break
                 
-                previous_height = new_height
+                state = new_state
                 scroll_attempts += 1
-                print(f"[PROFILE] Scrolled {scroll_attempts}/{max_scrolls} for @{username}")
+                print(f"[PROFILE] Scrolled {scroll_attempts}/{max_scrolls or '∞'} for @{username}")
             
-            # Final collection after scrolling is done
-            final_urls, final_post_data = extract_urls_from_current_page(driver, username)
-            all_urls.update(final_urls)
-            all_post_data.update(final_post_data)
-            
-            # Wait a bit more for posts to load
-            if sleep_with_cancel(3):
-                return [], {}
-            
-            # Get page source
-            content = driver.page_source
-            
-            # Convert sets back to lists for return
-            urls = list(all_urls)
-            print(f"[PROFILE] Total unique URLs found: {len(urls)} for @{username}")
+            if SHUTDOWN.is_set():
+                outcome['ended'] = 'shutdown'
+                return bool(seen)
+            if not merge.stopped:
+                collect()  # posts rendered during the last wait
+                merge.flush()  # payload posts whose links never rendered
+            if merge.stopped:
+                outcome['ended'] = 'stopped'
             
-            if urls:
-                print(f"[PROFILE] Found {len(urls)} posts via Selenium for @{username}")
-                return urls, all_post_data
+            print(f"[PROFILE] Total unique URLs found: {len(seen)} for @{username}")
+            if seen:
+                return True
             
             # Fallback: try to find shortcodes in the page source
             print(f"[PROFILE] Trying fallback method for @{username}")
+            content = driver.page_source
             
-            # Look for shortcodes in the HTML
-            shortcode_pattern = r'"shortcode":"([A-Za-z0-9_-]{11})"'
-            shortcodes = re.findall(shortcode_pattern, content)
-            
-            if shortcodes:
-                urls = []
-                for shortcode in shortcodes:
-                    urls.append(f"https://www.instagram.com/p/{shortcode}/")
-                
-                print(f"[PROFILE] Found {len(urls)} posts via HTML parsing for @{username}")
-                return urls, post_data
+            # Look for shortcodes in the HTML, then for post URLs directly
+            shortcodes = re.findall(r'"shortcode":"([A-Za-z0-9_-]{11})"', content)
+            if not shortcodes:
+                shortcodes = re.findall(r'https://www\.instagram\.com/p/([A-Za-z0-9_-]{11})/', content)
             
-            # Another fallback: look for post URLs directly
-            post_url_pattern = r'https://www\.instagram\.com/p/([A-Za-z0-9_-]{11})/'
-            post_urls = re.findall(post_url_pattern, content)
+            merge.add_links(f"{DEFAULT_INSTAGRAM_BASE_URL}/p/{shortcode}/" for shortcode in shortcodes)
             
-            if post_urls:
-                urls = []
-                for shortcode in post_urls:
-                    urls.append(f"https://www.instagram.com/p/{shortcode}/")
-                
-                print(f"[PROFILE] Found {len(urls)} posts via URL pattern for @{username}")
-                return urls, post_data
+            outcome['ended'] = 'fallback' if seen else 'empty'
+            if seen:
+                print(f"[PROFILE] Found {len(seen)} posts via HTML parsing for @{username}")
+                return True
             
             print(f"[FAILED] No posts found for @{username}")
-            return [], {}
-            
-        finally:
-            driver.quit()
+            return False
         
     except Exception as e:
         print(f"[ERROR] Error using Selenium for @{username}: {e}")
-        return [], {}
+        return False
+
+def start_profile_crawl(username, config=None, known=None, stop_after_known=0, known_before_ms=0):
+    """
+    Run crawl_profile_posts on a producer thread.
+    
+    The grid is newest-first, so with stop_after_known > 0 the crawl stops once that
+    many consecutive posts are already archived (in `known`, or not newer than
+    known_before_ms when the post time is captured). Pinned posts are why this is a
+    run length and not the first known post.
+    
+    Returns:
+        (queue.Queue, threading.Event, dict): the queue yields (url, meta) items and a
+        final None sentinel; setting the event stops the crawl after the current batch;
+        the dict gets 'newest_shortcode', 'newest_timestamp_ms', 'caught_up' and, once
+        the crawl has ended, 'ended' and 'complete' (the grid's bottom or the run of
+        known posts was reached; never after a scroll budget stop or an error).
+    """
+    out = queue.Queue()
+    stop = threading.Event()
+    known = known or set()
+    status = {'newest_shortcode': None, 'newest_timestamp_ms': None, 'caught_up': False,
+              'ended': None, 'complete': False}
+    run = 0
+    
+    def emit(url, meta):
+        nonlocal run
+        shortcode = extract_shortcode_from_url(url)
+        ts = (meta or {}).get('timestamp_ms')
+        if status['newest_shortcode'] is None:
+            status['newest_shortcode'] = shortcode
+        if ts and ts > (status['newest_timestamp_ms'] or 0):
+            status['newest_timestamp_ms'] = ts
+        if shortcode in known or (ts and known_before_ms and ts <= known_before_ms):
+            run += 1
+            if stop_after_known and run >= stop_after_known:
+                print(f"[PROFILE] {run} already-archived posts in a row; @{username} is up to date")
+                status['caught_up'] = True
+                return False
+            if stop_after_known:
+                return not stop.is_set()  # nothing to download, keep scrolling
+        else:
+            run = 0
+        out.put((url, meta))
+        return not stop.is_set()
+    
+    def producer():
+        outcome = {}
+        try:
+            crawl_profile_posts(username, emit, config, outcome)
+        finally:
+            status['ended'] = outcome.get('ended', 'error')
+            status['complete'] = status['ended'] == 'bottom' or (status['ended'] == 'stopped' and status['caught_up'])
+            out.put(None)
+    
+    threading.Thread(target=producer, name=f"crawl-{username}", daemon=True).start()
+    return out, stop, status
+
+def get_profile_post_urls(username):
+    """
+    Get all post URLs from a profile using Selenium.
+    Returns (urls, post_data) where post_data maps url -> {caption, timestamp_ms, original_owner}.
+    """
+    urls = []
+    post_data = {}
+    def collect(url, meta):
+        urls.append(url)
+        if meta:
+            post_data[url] = meta
+    crawl_profile_posts(username, collect)
+    return urls, post_data
 
 def download_profile_posts(conn, username, download_dir, source='dm_profile', pacer=None, thread_name=None, safety_config=None, append_send_for_this_run=False, config=None):
     """
@@ -1864,154 +2706,104 @@ def download_profile_posts(conn, username, download_dir, source='dm_profile', pa
     """
     print(f"[PROFILE] Downloading all posts from @{username}")
     
+    # Re-crawls of a fully archived profile stop at the first run of known posts
+    crawl_cfg = config or read_config()
+    stop_after_known = int(get_cfg_str(crawl_cfg, "PROFILE_STOP_AFTER_KNOWN", "12"))
+    previous = get_profile_crawl(conn, username)
+    known, known_before_ms = set(), 0
+    if stop_after_known and previous and previous.get('complete'):
+        known = get_owner_downloaded_shortcodes(conn, username)
+        known_before_ms = previous.get('newest_timestamp_ms') or 0
+        print(f"[PROFILE] @{username} was crawled before ({len(known)} posts archived); stopping at known posts")
+    
+    # Crawl on a producer thread; posts are downloaded as soon as they are discovered
+    crawl_queue, crawl_stop, crawl_status = start_profile_crawl(
+        username, crawl_cfg, known=known,
+        stop_after_known=stop_after_known if known else 0,
+        known_before_ms=known_before_ms)
     try:
-        # First, get all post URLs from the profile using Selenium
-        result = get_profile_post_urls(username)
-        
-        if not result or len(result) != 2:
-            print(f"[FAILED] No post URLs found for @{username}")
-            return False
-        
-        post_urls, post_data = result
-        
-        if not post_urls:
-            print(f"[FAILED] No post URLs found for @{username}")
-            return False
-        
-        # Only create profile-specific folder if we actually have posts to download
         profile_dir = os.path.join(download_dir, sanitize_filename(username))
-        os.makedirs(profile_dir, exist_ok=True)
-        
-        print(f"[PROFILE] Found {len(post_urls)} posts to download for @{username}")
         
         # Download each post individually using our existing download_post method
         successful_downloads = 0
         skipped_count = 0
+        i = 0
         
-        for i, post_url in enumerate(post_urls, 1):
-            if SHUTDOWN.is_set():
-                break
-            print(f"[PROFILE] Downloading post {i}/{len(post_urls)}: {post_url}")
-            
-            # Extract shortcode from URL
-            shortcode = extract_shortcode_from_url(post_url)
-            if not shortcode:
-                print(f"[FAILED] Could not extract shortcode from {post_url}")
-                continue
-            
-            # Check if already downloaded
-            if is_downloaded(conn, shortcode):
-                print(f"[SKIP] {shortcode} already downloaded for @{username}")
-                skipped_count += 1
-                continue
-            
-            # Get caption for this post if available
-            post_caption = post_data.get(post_url, "")
-            
-            # Create post data structure
-            post_data_dict = {
-                'shortcode': shortcode,
-                'url': post_url,
-                'original_owner': username,
-                'timestamp_ms': int(time.time() * 1000),
-                'source': source,
-                'dm_thread': thread_name,
-                'append_send_for_this_run': append_send_for_this_run
-            }
-            
-            # Use our existing download method with exception handling
-            retry_count = 0
-            while True:
+        def crawled_items():
+            nonlocal i, skipped_count
+            while not SHUTDOWN.is_set():
                 try:
-                    ok = download_post(conn, post_data_dict, profile_dir, pacer, config)
-                    # success or non-block failure -> break to next item
-                    if ok:
-                        successful_downloads += 1
-                        print(f"[SUCCESS] Downloaded post {i}/{len(post_urls)} for @{username}")
-                    else:
-                        print(f"[FAILED] Post {i}/{len(post_urls)} for @{username}")
-                    break
-                except RateLimitError as e:
-                    SESSION_TRACKER.record_rate_limit()
-                    print(f"\n[BLOCK] Rate limited.")
-                    print("[Advice] Waiting ~30–60 minutes is safest before retrying to avoid repeated blocks.")
-                    auto_retry = parse_bool(safety_config.get('AUTO_RETRY_ON_RATE_LIMIT'), True) if safety_config else True
-                    if auto_retry:
-                        base_delay = RATE_LIMIT_SCHEDULE[min(retry_count, len(RATE_LIMIT_SCHEDULE)-1)]
-                        delay = get_jittered_delay(base_delay)
-                        print(f"[BLOCK] Auto-retrying this item in {delay}s (base: {base_delay}s + jitter)...")
-                        if sleep_with_cancel(delay):
-                            return False  # Shutdown requested
-                        retry_count += 1
-                        continue
-                    # interactive mode
-                    if retry_count > 0:  # delayed retry mode
-                        base_delay = RATE_LIMIT_SCHEDULE[min(retry_count, len(RATE_LIMIT_SCHEDULE)-1)]
-                        delay = get_jittered_delay(base_delay)
-                        print(f"[BLOCK] Delayed retry mode: sleeping {delay}s (base: {base_delay}s + jitter) before retry...")
-                        if sleep_with_cancel(delay):
-                            return False  # Shutdown requested
-                        retry_count += 1
-                        continue
-                    resp = input("[Enter]=retry now  |  D=delayed exponential retry  |  S=skip this item  |  Q=quit run > ").strip().lower()
-                    if resp == "q":
-                        return False
-                    if resp == "s":
-                        record_failure(conn, post_data_dict, "Skipped after rate limit")
-                        SESSION_TRACKER.record_download_skip()
-                        break
-                    if resp == "d":
-                        retry_count = 0  # start delayed retry mode at first step
-                        continue  # loop will sleep next time
-                    # default: immediate retry
+                    item = crawl_queue.get(timeout=0.5)
+                except queue.Empty:
                     continue
-                except CheckpointError as e:
-                    print(f"\n[BLOCK] Checkpoint/challenge.")
-                    print("[Advice] Complete MANUAL LOGIN with the same persistent profile (or wait/switch), then retry.")
-                    print("[Advice] After clearing the challenge, waiting ~30–60 minutes before resuming is safest.")
-                    resp = input("[Enter]=retry  |  M=manual login now  |  S=skip  |  Q=quit > ").strip().lower()
-                    if resp == "q":
-                        return False
-                    if resp == "s":
-                        record_failure(conn, post_data_dict, "Skipped during checkpoint")
-                        break
-                    if resp == "m":
-                        # Get current profile and cookie file
-                        config = read_config()
-                        profile_dir, cookie_file = resolve_profile_and_cookie(config)
-                        if manual_login_and_export_cookies(profile_dir, cookie_file):
-                            print("[BLOCK] Manual login completed, retrying...")
-                        else:
-                            print("[BLOCK] Manual login failed, retrying anyway...")
-                        # else retry immediately
-                except LoginRequiredError as e:
-                    print(f"\n[BLOCK] Login required (cookies/session invalid).")
-                    print("[Advice] Revalidate cookies via MANUAL LOGIN, then retry.")
-                    resp = input("[M]=manual login now  |  R=retry with current cookies  |  S=skip  |  Q=quit > ").strip().lower()
-                    if resp == "q":
-                        return False
-                    if resp == "s":
-                        record_failure(conn, post_data_dict, "Skipped after login-required")
-                        break
-                    if resp == "m":
-                        # Get current profile and cookie file
-                        config = read_config()
-                        profile_dir, cookie_file = resolve_profile_and_cookie(config)
-                        if manual_login_and_export_cookies(profile_dir, cookie_file):
-                            print("[BLOCK] Manual login completed, retrying...")
-                        else:
-                            print("[BLOCK] Manual login failed, retrying anyway...")
-                    # else retry immediately
-                except NotFoundError as e:
-                    print(f"[SKIP] Post unavailable/deleted/private: {shortcode}")
-                    record_failure(conn, post_data_dict, "Deleted/private/unavailable")
-                    SESSION_TRACKER.record_download_skip()
-                    break
-            
-
+                if item is None:
+                    return  # crawl finished
+                post_url, meta = item
+                i += 1
+                print(f"[PROFILE] Downloading post {i}: {post_url}")
+                
+                # Extract shortcode from URL
+                shortcode = extract_shortcode_from_url(post_url)
+                if not shortcode:
+                    print(f"[FAILED] Could not extract shortcode from {post_url}")
+                    continue
+                
+                # Check if already downloaded
+                if is_downloaded(conn, shortcode):
+                    print(f"[SKIP] {shortcode} already downloaded for @{username}")
+                    skipped_count += 1
+                    continue
+                
+                # Only create profile-specific folder if we actually have posts to download
+                os.makedirs(profile_dir, exist_ok=True)
+                
+                # Metadata captured while crawling (caption from the grid, or feed payloads in network mode)
+                meta = meta or {}
+                
+                # Create post data structure
+                yield {
+                    'shortcode': shortcode,
+                    'url': post_url,
+                    'original_owner': meta.get('original_owner') or username,
+                    'caption': meta.get('caption') or None,
+                    'timestamp_ms': meta.get('timestamp_ms') or int(time.time() * 1000),
+                    'source': source,
+                    'dm_thread': thread_name,
+                    'append_send_for_this_run': append_send_for_this_run
+                }, profile_dir
+        
+        failed_downloads = 0
+        
+        def post_done(post, target_dir, ok):
+            nonlocal successful_downloads, failed_downloads
+            if ok:
+                successful_downloads += 1
+                print(f"[SUCCESS] Downloaded {post['shortcode']} for @{username}")
+            else:
+                failed_downloads += 1
+                print(f"[FAILED] {post['shortcode']} for @{username}")
+        
+        if RetryEngine(conn, pacer, safety_config, config).run(crawled_items(), post_done) is None:
+            return False  # Quit or shutdown requested
         
+        # Only a crawl that saw its whole range (grid bottom or the run of known posts) with
+        # every download done may short-cut the next one; anything else (scroll budget,
+        # crawl error, failed posts) clears the flag so the next crawl walks the grid again.
+        if not SHUTDOWN.is_set() and crawl_status['newest_shortcode']:
+            complete = crawl_status['complete'] and failed_downloads == 0
+            if not crawl_status['complete']:
+                print(f"[PROFILE] Crawl of @{username} ended early ({crawl_status['ended']}); not marking it complete")
+            record_profile_crawl(conn, username, crawl_status['newest_shortcode'],
+                                 crawl_status['newest_timestamp_ms'], complete=complete)
+        
+        if crawl_status['caught_up'] and i == 0:
+            print(f"[PROFILE] No new posts for @{username}")
+            return True
+        if i == 0:
+            print(f"[FAILED] No post URLs found for @{username}")
+            return False
         if successful_downloads > 0:
-            print(f"[SUCCESS] Downloaded {successful_downloads}/{len(post_urls)} posts from @{username} (skipped {skipped_count})")
+            print(f"[SUCCESS] Downloaded {successful_downloads}/{i} posts from @{username} (skipped {skipped_count})")
             return True
         else:
             print(f"[FAILED] No posts downloaded from @{username}")
@@ -2020,6 +2812,638 @@ def download_profile_posts(conn, username, download_dir, source='dm_profile', pa
     except Exception as e:
         print(f"[ERROR] Profile @{username} - {e}")
         return False
+    finally:
+        # Stop the producer if we returned early (quit/shutdown/error)
+        crawl_stop.set()
+
+# --- Global block circuit breaker ---
+class BlockCircuitBreaker:
+    """
+    One breaker shared by every flow and worker.
+    - closed: downloads run normally.
+    - open: a rate limit/checkpoint was seen; every caller waits out a jittered
+      cooldown that steps up RATE_LIMIT_SCHEDULE on consecutive blocks.
+    - half_open: cooldown over; a single probe download goes through. Success
+      closes the breaker, another block re-opens it one step further.
+    The state is persisted (via persist(dict)) so a relaunch respects an active cooldown.
+    """
+    STATE_KEY = "block_circuit_breaker"
+
+    def __init__(self, saved=None, persist=None, schedule=None, clock=None):
+        saved = saved or {}
+        self.schedule = schedule or RATE_LIMIT_SCHEDULE
+        self.clock = clock or time.time
+        self.persist = persist
+        self.state = saved.get('state', 'closed')
+        self.level = int(saved.get('level', 0))
+        self.open_until = float(saved.get('open_until', 0))
+        self.reason = saved.get('reason')
+        self._probe_in_flight = False
+        self._cond = threading.Condition()
+        if self.state == 'half_open':
+            self.state = 'open'  # the probe from the previous run never reported back
+
+    def _save(self):
+        if self.persist:
+            self.persist({'state': self.state, 'level': self.level,
+                          'open_until': self.open_until, 'reason': self.reason})
+
+    def trip(self, reason: str) -> float:
+        """Open the breaker after a block. Returns the cooldown in seconds."""
+        with self._cond:
+            base = self.schedule[min(self.level, len(self.schedule) - 1)]
+            cooldown = get_jittered_delay(base)
+            self.level += 1
+            self.state = 'open'
+            self.open_until = max(self.open_until, self.clock() + cooldown)
+            self.reason = reason
+            self._probe_in_flight = False
+            self._save()
+            self._cond.notify_all()
+        print(f"[BLOCK] Circuit open ({reason}): pausing all downloads for {cooldown:.0f}s (base: {base}s + jitter)")
+        report_daemon_status('cooldown', f"Blocked ({reason}); cooling down", resume_at=self.open_until)
+        return cooldown
+
+    def allow_probe(self):
+        """Skip the remaining cooldown (explicit user retry/skip): the next download is the probe."""
+        with self._cond:
+            if self.state == 'open':
+                self.open_until = self.clock()
+                self._save()
+            self._cond.notify_all()
+
+    def ready_in(self) -> float:
+        """Seconds until wait_ready() would let a download through (0 = now)."""
+        with self._cond:
+            if self.state == 'closed':
+                return 0.0
+            if self.state == 'half_open':
+                return 5.0 if self._probe_in_flight else 0.0
+            return max(0.0, self.open_until - self.clock())
+
+    def wait_ready(self) -> bool:
+        """
+        Block while the breaker is open or another worker's probe is running.
+        Returns False if a shutdown was requested.
+        """
+        announced = False
+        while not SHUTDOWN.is_set():
+            with self._cond:
+                if self.state == 'closed':
+                    return True
+                remaining = self.open_until - self.clock()
+                if self.state == 'open' and remaining <= 0:
+                    self.state = 'half_open'
+                    self._probe_in_flight = False
+                    self._save()
+                if self.state == 'half_open' and not self._probe_in_flight:
+                    self._probe_in_flight = True
+                    print("[BLOCK] Cooldown over; probing with one download")
+                    return True
+                if self.state == 'half_open':
+                    self._cond.wait(0.5)  # another worker is probing
+                    continue
+            if not announced:
+                print(f"[BLOCK] Cooldown active ({self.reason}): waiting {remaining:.0f}s before downloading")
+                announced = True
+            if sleep_with_cancel(min(remaining, 5)):
+                return False
+        return False
+
+    def record_success(self):
+        """A download finished without a block signal: close the breaker."""
+        with self._cond:
+            if self.state == 'closed' and self.level == 0:
+                return
+            if self.state == 'half_open':
+                print("[BLOCK] Probe succeeded; resuming normal pacing")
+            self.state = 'closed'
+            self.level = 0
+            self.open_until = 0
+            self.reason = None
+            self._probe_in_flight = False
+            self._save()
+            self._cond.notify_all()
+
+_BLOCK_BREAKERS = {}
+_BLOCK_BREAKER_LOCK = threading.Lock()
+
+def get_block_breaker(conn, account: str = None) -> BlockCircuitBreaker:
+    """
+    The process-wide breaker (one per rotation account), loaded from (and saved to)
+    the database. The first/only account uses the plain key.
+    """
+    names = get_account_names(read_config()) if account else []
+    if account and names and account == names[0]:
+        account = None
+    key = f"{BlockCircuitBreaker.STATE_KEY}:{account}" if account else BlockCircuitBreaker.STATE_KEY
+    with _BLOCK_BREAKER_LOCK:
+        if key not in _BLOCK_BREAKERS:
+            _BLOCK_BREAKERS[key] = BlockCircuitBreaker(
+                saved=get_state(conn, key),
+                persist=lambda st: set_state(conn, key, st),
+            )
+        return _BLOCK_BREAKERS[key]
+
+# --- Multi-account rotation ---
+class Account:
+    """One Instagram login: its cookie jar, Chrome profile, pacer and circuit breaker."""
+    def __init__(self, name, cookie_file, profile_dir, pacer, breaker):
+        self.name = name
+        self.cookie_file = cookie_file
+        self.profile_dir = profile_dir
+        self.pacer = pacer
+        self.breaker = breaker
+        self.suspended = None  # None while in rotation, else 'checkpoint' | 'login_required' | 'invalid_cookies'
+
+class AccountRotation:
+    """
+    Spreads downloads over the accounts that are in rotation: each item goes to the
+    account that can start soonest (its own caps, delays and cooldown). Accounts hit
+    by a checkpoint or login prompt drop out instead of stalling the run.
+    """
+    def __init__(self, accounts):
+        self.accounts = accounts
+        self._lock = threading.Lock()
+
+    def active(self):
+        return [a for a in self.accounts if a.suspended is None]
+
+    def pick(self):
+        """The active account that can start a download soonest, or None if none is left."""
+        with self._lock:
+            candidates = self.active()
+            if not candidates:
+                return None
+            return min(candidates, key=lambda a: max(a.breaker.ready_in(), a.pacer.admission_wait()))
+
+    def suspend(self, account, reason: str):
+        with self._lock:
+            account.suspended = reason
+        left = len(self.active())
+        print(f"[ACCOUNTS] {account.name}: {reason}; taken out of rotation ({left} account(s) left)")
+
+    def reinstate(self, account):
+        with self._lock:
+            account.suspended = None
+        print(f"[ACCOUNTS] {account.name}: back in rotation")
+
+_ACCOUNT_ROTATION = None
+
+def get_account_rotation():
+    """The rotation built at startup, or None when a single account is configured."""
+    return _ACCOUNT_ROTATION
+
+def build_account_rotation(conn, safety_config: dict, config: dict):
+    """
+    Build the rotation from ACCOUNTS (comma-separated names). Every account gets its
+    own pacer (seeded with its own downloads) and breaker; accounts whose cookies
+    do not validate start out of rotation. Returns None for single-account setups.
+    """
+    global _ACCOUNT_ROTATION
+    names = get_account_names(config)
+    if len(names) < 2:
+        _ACCOUNT_ROTATION = None
+        return None
+    accounts = []
+    for i, name in enumerate(names):
+        profile_dir, cookie_file = resolve_profile_and_cookie(config, name)
+        # The first account is the one the menus and the startup cookie gate use
+        pacer = build_pacer(conn, safety_config, config, account=name, primary=(i == 0))
+        account = Account(name, cookie_file, profile_dir, pacer, get_block_breaker(conn, name))
+        if i > 0 and not are_cookies_valid(cookie_file, use_cache=True):
+            account.suspended = 'invalid_cookies'
+            print(f"[ACCOUNTS] {name}: cookies in {cookie_file} are missing/invalid; out of rotation")
+        accounts.append(account)
+    _ACCOUNT_ROTATION = AccountRotation(accounts)
+    print(f"[ACCOUNTS] Rotating over {len(_ACCOUNT_ROTATION.active())}/{len(accounts)} account(s): "
+          + ", ".join(a.name for a in _ACCOUNT_ROTATION.active()))
+    return _ACCOUNT_ROTATION
+
+def _download_with_rotation(conn, post, target_dir, rotation, config=None):
+    """
+    One download over the rotation: blocks move the item to another account.
+    Raises LoginRequiredError once no account is left in rotation.
+    """
+    while True:
+        account = rotation.pick()
+        if account is None:
+            raise LoginRequiredError("no account left in rotation")
+        if not account.breaker.wait_ready():
+            return None  # Shutdown requested
+        post['account'] = account.name
+        try:
+            ok = download_post(conn, post, target_dir, account.pacer, config, cookie_file=account.cookie_file)
+            if not SHUTDOWN.is_set():
+                account.breaker.record_success()
+            return ok
+        except RateLimitError:
+            SESSION_TRACKER.record_rate_limit()
+            print(f"\n[BLOCK] {account.name}: rate limited.")
+            account.breaker.trip('rate_limit')  # other accounts keep going meanwhile
+        except CheckpointError:
+            SESSION_TRACKER.record_checkpoint()
+            print(f"\n[BLOCK] {account.name}: checkpoint/challenge.")
+            account.breaker.trip('checkpoint')
+            forget_cookie_validation(account.cookie_file)
+            rotation.suspend(account, 'checkpoint')
+        except LoginRequiredError:
+            SESSION_TRACKER.record_login_required()
+            print(f"\n[BLOCK] {account.name}: login required.")
+            forget_cookie_validation(account.cookie_file)
+            rotation.suspend(account, 'login_required')
+        except NotFoundError:
+            account.breaker.record_success()  # a clean answer from Instagram
+            raise
+
+def attempt_download(conn, post, target_dir, pacer=None, config=None):
+    """
+    One attempt at a post through the global block circuit breaker (or the account
+    rotation). Block signals trip the breaker and are re-raised for the retry engine.
+    
+    Returns:
+        True/False like download_post, or None if a shutdown was requested.
+    """
+    if not post.get('shortcode') or not post.get('url') or is_recorded(conn, post['shortcode']):
+        # Nothing to fetch: no cooldown wait, and no "clean answer" for the breaker
+        return download_post(conn, post, target_dir, pacer, config)
+    rotation = get_account_rotation()
+    if rotation is not None:
+        return _download_with_rotation(conn, post, target_dir, rotation, config)
+    breaker = get_block_breaker(conn)
+    if not breaker.wait_ready():
+        return None  # Shutdown requested
+    try:
+        ok = download_post(conn, post, target_dir, pacer, config)
+    except RateLimitError:
+        SESSION_TRACKER.record_rate_limit()
+        print(f"\n[BLOCK] Rate limited.")
+        print("[Advice] Waiting ~30–60 minutes is safest before retrying to avoid repeated blocks.")
+        breaker.trip('rate_limit')
+        raise
+    except CheckpointError:
+        SESSION_TRACKER.record_checkpoint()
+        print(f"\n[BLOCK] Checkpoint/challenge.")
+        print("[Advice] Complete MANUAL LOGIN with the same persistent profile (or wait/switch), then retry.")
+        print("[Advice] After clearing the challenge, waiting ~30–60 minutes before resuming is safest.")
+        breaker.trip('checkpoint')
+        forget_cookie_validation(resolve_profile_and_cookie(config or read_config())[1])
+        raise
+    except LoginRequiredError:
+        SESSION_TRACKER.record_login_required()
+        print(f"\n[BLOCK] Login required (cookies/session invalid).")
+        print("[Advice] Revalidate cookies via MANUAL LOGIN, then retry.")
+        forget_cookie_validation(resolve_profile_and_cookie(config or read_config())[1])
+        raise
+    except NotFoundError:
+        breaker.record_success()  # a clean answer from Instagram
+        raise
+    if not SHUTDOWN.is_set():
+        breaker.record_success()
+    return ok
+
+# --- Defer-and-continue retry engine ---
+class RetryPolicy:
+    """
+    How the retry engine treats one block class.
+    - backoff: seconds an item is deferred after its 1st, 2nd, ... block (last value repeats)
+    - attempts: tries per item before it is recorded as failed
+    - human: action a person has to take ('checkpoint' | 'login_required') before retrying
+    - terminal: fail the item immediately
+    """
+    def __init__(self, failure: str, backoff=(0,), attempts: int = 1, human: str = None, terminal: bool = False):
+        self.failure = failure
+        self.backoff = backoff
+        self.attempts = attempts
+        self.human = human
+        self.terminal = terminal
+
+    def delay(self, attempt: int) -> float:
+        return get_jittered_delay(self.backoff[min(attempt, len(self.backoff)) - 1]) if self.backoff[0] else 0.0
+
+RETRY_POLICIES = {
+    RateLimitError: RetryPolicy("Rate limited (retries exhausted)", backoff=(120, 600, 1800, 3600), attempts=5),
+    CheckpointError: RetryPolicy("Checkpoint (retries exhausted)", attempts=3, human='checkpoint'),
+    LoginRequiredError: RetryPolicy("Login required (retries exhausted)", attempts=3, human='login_required'),
+    NotFoundError: RetryPolicy("Deleted/private/unavailable", terminal=True),
+}
+
+class RetryEngine:
+    """
+    Runs a download queue for any flow without blocking on one item.
+    A blocked item moves to a deferred heap (per RETRY_POLICIES: backoff, attempt
+    budget, terminal classes) and the queue moves on; deferred items come back once
+    their backoff has passed. The block circuit breaker still holds every download
+    during a cooldown. When nothing can proceed without a person (checkpoint or
+    login on the only/last account, or rate limits with AUTO_RETRY_ON_RATE_LIMIT=false)
+    a single prompt covers every deferred item; in daemon mode the engine waits for
+    valid cookies instead. Choosing to wait at a checkpoint/login prompt parks those
+    items (attempts untouched) until a blocked account's cookie file is rewritten or,
+    for a login, validates again.
+    """
+    park_poll = 300.0  # seconds between live checks of parked login cookies
+
+    def __init__(self, conn, pacer=None, safety_config=None, config=None, policies=None):
+        self.conn = conn
+        self.pacer = pacer
+        self.config = config
+        self.policies = policies or RETRY_POLICIES
+        auto_retry = parse_bool(safety_config.get('AUTO_RETRY_ON_RATE_LIMIT'), True) if safety_config else True
+        self.ask_on_rate_limit = not auto_retry
+        self.needs_human = None
+        self._deferred = []  # heap of (ready_at, seq, entry)
+        self._parked = {}  # reason -> {'entries', 'accounts', 'signatures', 'check_at'}
+        self._seq = 0
+        self._on_result = None
+
+    def run(self, items, on_result=None):
+        """
+        Download every (post, target_dir) from `items` (any iterable, consumed lazily).
+        on_result(post, target_dir, ok) is called once per finished item.
+        Returns True when the queue is done, None if the user quit or a shutdown was requested.
+        """
+        self._on_result = on_result
+        fresh = iter(items)
+        exhausted = False
+        announced = None
+        while not SHUTDOWN.is_set():
+            if self.needs_human:
+                if self._resolve_human() is None:
+                    return None
+                continue
+            for reason in list(self._parked):
+                self._check_parked(reason)
+            if self._deferred and self._deferred[0][0] <= time.time():
+                entry = heapq.heappop(self._deferred)[2]
+            elif not exhausted:
+                try:
+                    post, target_dir = next(fresh)
+                except StopIteration:
+                    exhausted = True
+                    continue
+                entry = {'post': post, 'target_dir': target_dir, 'attempts': 0, 'blocked_by': None, 'human': None}
+            elif self._deferred:
+                wait = self._deferred[0][0] - time.time()
+                if announced != self._deferred[0][1]:
+                    print(f"[RETRY] {len(self._deferred)} deferred item(s); next retry in {wait:.0f}s")
+                    announced = self._deferred[0][1]
+                if sleep_with_cancel(min(wait, 5)):
+                    return None
+                continue
+            elif self._parked:
+                if announced != 'parked':
+                    print(f"[RETRY] {sum(len(p['entries']) for p in self._parked.values())} item(s) "
+                          "waiting for refreshed cookies")
+                    announced = 'parked'
+                if sleep_with_cancel(5):
+                    return None
+                continue
+            else:
+                return True
+            ok = self._attempt(entry)
+            if ok is None:
+                return None
+            if ok == 'deferred':
+                continue
+            if on_result:
+                on_result(entry['post'], entry['target_dir'], ok)
+        return None
+
+    def _attempt(self, entry):
+        """True/False when the item is finished, 'deferred', or None on shutdown."""
+        post = entry['post']
+        try:
+            return attempt_download(self.conn, post, entry['target_dir'], self.pacer, self.config)
+        except tuple(self.policies) as e:
+            policy = self.policies[type(e)]
+            entry['attempts'] += 1
+            if policy.terminal or entry['attempts'] >= policy.attempts:
+                if policy.terminal:
+                    print(f"[SKIP] Post unavailable/deleted/private: {post.get('shortcode')}")
+                else:
+                    print(f"[RETRY] {post.get('shortcode')}: giving up after {entry['attempts']} attempt(s)")
+                record_failure(self.conn, post, policy.failure, terminal=policy.terminal)
+                SESSION_TRACKER.record_download_skip()
+                return False
+            human = policy.human
+            if human is None and isinstance(e, RateLimitError) and self.ask_on_rate_limit and not UNATTENDED.is_set():
+                human = 'rate_limit'
+            entry['blocked_by'] = type(e).__name__
+            entry['human'] = human
+            if human in self._parked:
+                self._parked[human]['entries'].append(entry)  # the user already chose to wait
+                print(f"[RETRY] Parked {post.get('shortcode')} ({entry['blocked_by']}, attempt {entry['attempts']})")
+                return 'deferred'
+            self._defer(entry, policy.delay(entry['attempts']))
+            self.needs_human = self.needs_human or human
+            return 'deferred'
+
+    def _defer(self, entry, delay: float):
+        self._seq += 1
+        heapq.heappush(self._deferred, (time.time() + delay, self._seq, entry))
+        print(f"[RETRY] Deferred {entry['post'].get('shortcode')} ({entry['blocked_by']}, attempt {entry['attempts']})"
+              + (f"; back in {delay:.0f}s" if delay else ""))
+
+    def _retry_deferred_now(self, reason: str):
+        """Make the items waiting on `reason` eligible again (other backoffs keep running)."""
+        now = time.time()
+        self._deferred = [(min(ready_at, now) if entry['human'] == reason else ready_at, seq, entry)
+                          for ready_at, seq, entry in self._deferred]
+        heapq.heapify(self._deferred)
+
+    def _skip_deferred(self, reason: str):
+        skipped = [entry for _, _, entry in self._deferred if entry['human'] == reason]
+        for entry in skipped:
+            record_failure(self.conn, entry['post'], f"Skipped after {entry['blocked_by']}")
+            SESSION_TRACKER.record_download_skip()
+        print(f"[RETRY] Skipped {len(skipped)} deferred item(s)")
+        self._deferred = [d for d in self._deferred if d[2]['human'] != reason]
+        heapq.heapify(self._deferred)
+        if self._on_result:
+            for entry in skipped:
+                self._on_result(entry['post'], entry['target_dir'], False)
+
+    def _park_deferred(self, reason: str, accounts):
+        """Hold the items waiting on `reason` until a blocked account's cookies are refreshed."""
+        park = self._parked.setdefault(reason, {'entries': [], 'accounts': [], 'signatures': {}, 'check_at': 0.0})
+        park['entries'].extend(entry for _, _, entry in self._deferred if entry['human'] == reason)
+        self._deferred = [d for d in self._deferred if d[2]['human'] != reason]
+        heapq.heapify(self._deferred)
+        for account in accounts:
+            if account.cookie_file not in park['signatures']:
+                park['accounts'].append(account)
+                park['signatures'][account.cookie_file] = _cookie_signature_or_none(account.cookie_file)
+        park['check_at'] = time.time() + self.park_poll
+        print(f"[RETRY] Holding {len(park['entries'])} item(s) until the cookies are refreshed "
+              f"({', '.join(park['signatures'])})")
+
+    def _check_parked(self, reason: str):
+        """
+        Release parked items once a blocked cookie file was rewritten, or (login only)
+        once the live check passes; checked every park_poll seconds.
+        """
+        park = self._parked[reason]
+        refreshed = [a for a in park['accounts']
+                     if _cookie_signature_or_none(a.cookie_file) != park['signatures'][a.cookie_file]]
+        if not refreshed and reason == 'login_required' and time.time() >= park['check_at']:
+            park['check_at'] = time.time() + self.park_poll
+            refreshed = [a for a in park['accounts'] if are_cookies_valid(a.cookie_file)]
+        if not refreshed:
+            return
+        del self._parked[reason]
+        print(f"[RETRY] Cookies refreshed; retrying {len(park['entries'])} parked item(s)")
+        for entry in park['entries']:
+            self._defer(entry, 0)
+        rotation = get_account_rotation()
+        for account in refreshed:
+            if rotation is not None and account.suspended:
+                rotation.reinstate(account)  # the breaker cooldown still applies
+
+    def _blocked_accounts(self):
+        """Accounts a login would bring back: the suspended rotation accounts, or the only account."""
+        rotation = get_account_rotation()
+        if rotation is not None:
+            return [a for a in rotation.accounts if a.suspended]
+        profile_dir, cookie_file = resolve_profile_and_cookie(read_config())
+        return [Account(None, cookie_file, profile_dir, self.pacer, get_block_breaker(self.conn))]
+
+    def _restore(self, account, reason: str):
+        account.breaker.allow_probe()
+        rotation = get_account_rotation()
+        if rotation is not None and account.suspended:
+            rotation.reinstate(account)
+        self._retry_deferred_now(reason)
+
+    def _resolve_human(self):
+        """One prompt (or one unattended wait) for everything deferred. None = quit."""
+        reason, self.needs_human = self.needs_human, None
+        accounts = self._blocked_accounts() if reason != 'rate_limit' else []
+        if UNATTENDED.is_set():
+            cookie_file = wait_for_valid_cookies([a.cookie_file for a in accounts], reason,
+                                                 require_change=(reason == 'checkpoint'))
+            if cookie_file is None:
+                return None
+            for account in accounts:
+                if account.cookie_file == cookie_file:
+                    self._restore(account, reason)
+            return True
+        waiting = sum(1 for _, _, entry in self._deferred if entry['human'] == reason)
+        print(f"\n[RETRY] {waiting} item(s) deferred; downloads need attention ({reason}).")
+        if reason == 'rate_limit':
+            resp = input("[Enter]=retry now  |  W=wait out the cooldowns (automatic from now on)  |  S=skip deferred  |  Q=quit run > ").strip().lower()
+        else:
+            resp = input("[M]=manual login now  |  R=retry now  |  W=wait out the cooldown  |  S=skip deferred  |  Q=quit > ").strip().lower()
+        if resp == "q":
+            return None  # the open breaker is persisted; a relaunch waits it out
+        if resp == "s":
+            self._skip_deferred(reason)
+            for account in accounts:
+                account.breaker.allow_probe()
+            return True
+        if resp == "w":
+            if reason == 'rate_limit':
+                self.ask_on_rate_limit = False
+            else:
+                self._park_deferred(reason, accounts)
+            return True
+        if reason == 'rate_limit' or resp == "r":
+            get_block_breaker(self.conn).allow_probe()
+            for account in accounts:
+                self._restore(account, reason)
+            self._retry_deferred_now(reason)
+            return True
+        # default: manual login for every blocked account
+        for account in accounts:
+            label = f" for {account.name}" if account.name else ""
+            if manual_login_and_export_cookies(account.profile_dir, account.cookie_file) and are_cookies_valid(account.cookie_file):
+                print(f"[BLOCK] Manual login{label} completed, retrying...")
+                self._restore(account, reason)
+            else:
+                print(f"[BLOCK] Manual login{label} failed; items stay deferred")
+                if get_account_rotation() is None:
+                    self._restore(account, reason)  # retry anyway, as before
+        return True
+
+def download_with_block_handling(conn, post, target_dir, pacer=None, safety_config=None, config=None):
+    """
+    Download one post through the retry engine (block handling for a single item).
+    
+    Args:
+        conn: Database connection
+        post: Unified post dict
+        target_dir: Directory to save the download
+        pacer: SafetyPacer instance for rate limiting
+        safety_config: Safety configuration (AUTO_RETRY_ON_RATE_LIMIT)
+        config: Configuration dictionary
+        
+    Returns:
+        True if downloaded (or already recorded), False if failed/skipped,
+        None if the user quit or a shutdown was requested.
+    """
+    results = []
+    if RetryEngine(conn, pacer, safety_config, config).run([(post, target_dir)], lambda p, d, ok: results.append(ok)) is None:
+        return None
+    return results[0] if results else False
+
+def profile_crawled_recently(conn, username: str, days: float) -> bool:
+    """True if the profile had a complete crawl within the last `days` days."""
+    if days <= 0:
+        return False
+    row = get_profile_crawl(conn, username)
+    if not row or not row.get('complete') or not row.get('last_crawled_at'):
+        return False
+    try:
+        # SQLite CURRENT_TIMESTAMP is UTC
+        crawled = datetime.strptime(row['last_crawled_at'], "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return False
+    return (datetime.utcnow() - crawled).total_seconds() < days * 86400
+
+def grab_shared_profiles(conn, profiles, pacer=None, safety_config=None, config=None):
+    """
+    Download the posts of profiles shared in DMs, as one batch.
+    
+    Args:
+        conn: Database connection
+        profiles: Deduped profile shares (username, dm_thread, thread_dir)
+        pacer: SafetyPacer instance for rate limiting
+        
+    Returns:
+        int: Number of profiles processed, or None if the run was quit
+    """
+    config = config or read_config()
+    mode = get_cfg_str(config, "DM_PROFILE_GRAB", "ask").lower()
+    if mode in ("no", "false", "off"):
+        print(f"\n[PROFILE] {len(profiles)} shared profiles found; profile grabbing is disabled (DM_PROFILE_GRAB).")
+        return 0
+    
+    recrawl_days = float(get_cfg_str(config, "PROFILE_RECRAWL_DAYS", "7"))
+    pending = [p for p in profiles if not profile_crawled_recently(conn, p['username'], recrawl_days)]
+    recent = len(profiles) - len(pending)
+    print(f"\n[PROFILE] {len(profiles)} unique profiles shared across the selected conversations"
+          + (f" ({recent} crawled within {recrawl_days:g} days, skipped)" if recent else ""))
+    if not pending:
+        return 0
+    
+    if mode == "ask":
+        for p in pending[:20]:
+            print(f"  @{p['username']}  (from {p['dm_thread']})")
+        if len(pending) > 20:
+            print(f"  ... and {len(pending) - 20} more")
+        choice = input(f"Download all posts from these {len(pending)} profiles now? [y/N]: ").strip().lower()
+        if choice != 'y':
+            return 0
+    
+    processed = 0
+    for i, p in enumerate(pending, 1):
+        if SHUTDOWN.is_set():
+            return None
+        print(f"\n[PROFILE] Profile {i}/{len(pending)}: @{p['username']}")
+        # Posts land in <thread>/<username>/ of the first conversation that shared the profile
+        download_profile_posts(conn, p['username'], p['thread_dir'], source='dm_profile', pacer=pacer,
+                               thread_name=p['dm_thread'], safety_config=safety_config, config=config)
+        processed += 1
+    return processed
 
 def process_dm_download(conn, selected_path, pacer=None, safety_config=None, config=None):
     """
@@ -2097,8 +3521,18 @@ def process_dm_download(conn, selected_path, pacer=None, safety_config=None, con
     
     print(f"Downloads will be saved to: {dm_download_dir}")
     
+    # Incremental mode: per-thread watermarks keyed by the dump's account
+    account = dump_account_key(selected_path)
+    incremental = is_incremental(config)
+    
     total_posts = 0
     total_profiles = 0
+    # Profile shares from every selected thread, deduped globally (lowercased username -> share)
+    shared_profiles = {}
+    # Queued (post, thread_dir) from every thread; the scheduler interleaves threads fairly
+    queued = []
+    thread_remaining = {}  # thread_name -> posts not yet attempted
+    thread_items = {}      # thread_name -> (shortcode, timestamp_ms) of queued shares
     
     for msg_file in selected_files:
         thread_name = os.path.basename(os.path.dirname(msg_file))
@@ -2107,69 +3541,21 @@ def process_dm_download(conn, selected_path, pacer=None, safety_config=None, con
         thread_dir = ensure_thread_dir(dm_download_dir, thread_name)
         print(f"[DM] Saving this conversation to: {thread_dir}")
         
-        # Gather all message parts for this DM thread
-        thread_root = os.path.dirname(msg_file)  # msg_file is the selected message_*.json
-        part_files = sorted(glob(os.path.join(thread_root, "message_*.json")))
+        since_ms = get_watermark(conn, account, 'dm', thread_name) if incremental else 0
+        if since_ms:
+            print(f"[INCREMENTAL] Only shares newer than {datetime.fromtimestamp(since_ms / 1000):%Y-%m-%d %H:%M}")
 
-        all_msgs = []
-        for pf in part_files:
-            try:
-                with open(pf, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    all_msgs.extend(data.get("messages", []))
-            except Exception as e:
-                print(f"[DM] Skipping {pf}: {e}")
-
-        # Sort by ascending timestamp for reliable <1s pairing across parts
-        all_msgs.sort(key=lambda m: m.get("timestamp_ms", 0))
-
-        seen_shortcodes = set()
+        # Gather all message parts for this DM thread and walk them once
+        all_msgs, part_count = load_dm_thread_messages(os.path.dirname(msg_file))
         posts = []
-        send_text_hits = 0
-
-        for i, m in enumerate(all_msgs):
-            share = m.get("share") or {}
-            link = share.get("link")
-            if not link:
-                continue  # no raw-link fallback; only structured shares
-
-            shortcode = _shortcode_from_share_link(link)
-            if not shortcode or shortcode in seen_shortcodes:
-                continue
-            seen_shortcodes.add(shortcode)
-
-            ts = m.get("timestamp_ms")
-            sender = (m.get("sender_name") or "").strip()
-            orig_owner = (share.get("original_content_owner") or "").strip() or None
-
-            # Pair a send message if next is same sender and within <1s
-            send_text = None
-            if i + 1 < len(all_msgs):
-                nxt = all_msgs[i + 1]
-                if (nxt.get("sender_name") or "").strip() == sender:
-                    nts = nxt.get("timestamp_ms")
-                    if isinstance(ts, int) and isinstance(nts, int) and 0 <= (nts - ts) <= 1000:
-                        if isinstance(nxt.get("content"), str) and nxt["content"].strip():
-                            send_text = nxt["content"].strip()
-                            send_text_hits += 1
-
-            post = {
-                'shortcode': shortcode,
-                'url': link,
-                'description': None,
-                'original_owner': orig_owner,
-                # do not set caption here; sidecar will populate it
-                'source': 'dm',
-                'username': orig_owner,
-                'timestamp_ms': ts,
-                'dm_thread': thread_name,
-            }
-            if send_text:
-                post['send_text'] = send_text
-
-            posts.append(post)
+        for kind, item in iter_dm_shares(all_msgs, thread_name, since_ms):
+            if kind == 'post':
+                posts.append(item)
+            else:
+                shared_profiles.setdefault(item['username'].lower(), {**item, 'thread_dir': thread_dir})
+        send_text_hits = sum(1 for p in posts if p.get('send_text'))
 
-        print(f"Found {len(posts)} shared posts from {len(part_files)} message parts")
+        print(f"Found {len(posts)} shared posts from {part_count} message parts")
         
         # Check for send message append option
         append_send_for_this_run = False
@@ -2178,96 +3564,41 @@ def process_dm_download(conn, selected_path, pacer=None, safety_config=None, con
             choice = input("Append them to filenames for this run? [y/N]: ").strip().lower()
             append_send_for_this_run = (choice == 'y')
         
-        # Download the collected posts for this thread into the per-thread folder
-        for i, post in enumerate(posts, 1):
-            if SHUTDOWN.is_set():
-                break
-            print(f"Downloading post {i}/{len(posts)}: {post['shortcode']}")
-            
+        # Queue the collected posts for this thread's folder
+        for post in posts:
             # Add send message flag to post data
             post['append_send_for_this_run'] = append_send_for_this_run
-            
-            # Use our existing download method with exception handling
-            retry_count = 0
-            while True:
-                try:
-                    ok = download_post(conn, post, thread_dir, pacer, config)
-                    # success or non-block failure -> break to next item
-                    if ok:
-                        total_posts += 1
-                    break
-                except RateLimitError as e:
-                    print(f"\n[BLOCK] Rate limited.")
-                    print("[Advice] Waiting ~30–60 minutes is safest before retrying to avoid repeated blocks.")
-                    auto_retry = parse_bool(safety_config.get('AUTO_RETRY_ON_RATE_LIMIT'), True) if safety_config else True
-                    if auto_retry:
-                        delay = RATE_LIMIT_SCHEDULE[min(retry_count, len(RATE_LIMIT_SCHEDULE)-1)]
-                        print(f"[BLOCK] Auto-retrying this item in {delay}s...")
-                        if sleep_with_cancel(delay):
-                            return False  # Shutdown requested
-                        retry_count += 1
-                        continue
-                    # interactive mode
-                    if retry_count > 0:  # delayed retry mode
-                        delay = RATE_LIMIT_SCHEDULE[min(retry_count, len(RATE_LIMIT_SCHEDULE)-1)]
-                        print(f"[BLOCK] Delayed retry mode: sleeping {delay}s before retry...")
-                        if sleep_with_cancel(delay):
-                            return False  # Shutdown requested
-                        retry_count += 1
-                        continue
-                    resp = input("[Enter]=retry now  |  D=delayed exponential retry  |  S=skip this item  |  Q=quit run > ").strip().lower()
-                    if resp == "q":
-                        return False
-                    if resp == "s":
-                        record_failure(conn, post, "Skipped after rate limit")
-                        break
-                    if resp == "d":
-                        retry_count = 0  # start delayed retry mode at first step
-                        continue  # loop will sleep next time
-                    # default: immediate retry
-                    continue
-                except CheckpointError as e:
-                    print(f"\n[BLOCK] Checkpoint/challenge.")
-                    print("[Advice] Complete MANUAL LOGIN with the same persistent profile (or wait/switch), then retry.")
-                    print("[Advice] After clearing the challenge, waiting ~30–60 minutes before resuming is safest.")
-                    resp = input("[Enter]=retry  |  M=manual login now  |  S=skip  |  Q=quit > ").strip().lower()
-                    if resp == "q":
-                        return False
-                    if resp == "s":
-                        record_failure(conn, post, "Skipped during checkpoint")
-                        break
-                    if resp == "m":
-                        # Get current profile and cookie file
-                        config = read_config()
-                        profile_dir, cookie_file = resolve_profile_and_cookie(config)
-                        if manual_login_and_export_cookies(profile_dir, cookie_file):
-                            print("[BLOCK] Manual login completed, retrying...")
-                        else:
-                            print("[BLOCK] Manual login failed, retrying anyway...")
-                        # else retry immediately
-                except LoginRequiredError as e:
-                    print(f"\n[BLOCK] Login required (cookies/session invalid).")
-                    print("[Advice] Revalidate cookies via MANUAL LOGIN, then retry.")
-                    resp = input("[M]=manual login now  |  R=retry with current cookies  |  S=skip  |  Q=quit > ").strip().lower()
-                    if resp == "q":
-                        return False
-                    if resp == "s":
-                        record_failure(conn, post, "Skipped after login-required")
-                        break
-                    if resp == "m":
-                        # Get current profile and cookie file
-                        config = read_config()
-                        profile_dir, cookie_file = resolve_profile_and_cookie(config)
-                        if manual_login_and_export_cookies(profile_dir, cookie_file):
-                            print("[BLOCK] Manual login completed, retrying...")
-                        else:
-                            print("[BLOCK] Manual login failed, retrying anyway...")
-                    # else retry immediately
-                except NotFoundError as e:
-                    print(f"[SKIP] Post unavailable/deleted/private: {post['shortcode']}")
-                    record_failure(conn, post, "Deleted/private/unavailable")
-                    SESSION_TRACKER.record_download_skip()
-                    break
+            queued.append((post, thread_dir))
+        if posts:
+            thread_remaining[thread_name] = len(posts)
+            thread_items[thread_name] = [(p['shortcode'], p.get('timestamp_ms') or 0) for p in posts]
+    
+    def dm_items():
+        for i, (post, thread_dir) in enumerate(schedule_posts(queued, config), 1):
+            print(f"Downloading post {i}/{len(queued)}: {post['shortcode']} ({post['dm_thread']})")
+            yield post, thread_dir
+    
+    def dm_done(post, thread_dir, ok):
+        nonlocal total_posts
+        thread_name = post['dm_thread']
+        if ok:
+            total_posts += 1
+        # Thread fully walked: advance its watermark up to the oldest post that did not finish
+        thread_remaining[thread_name] -= 1
+        if thread_remaining[thread_name] == 0 and not SHUTDOWN.is_set():
+            items = thread_items[thread_name]
+            mark = completed_watermark(items, settled_shortcodes(conn, [sc for sc, _ in items]))
+            update_watermark(conn, account, 'dm', mark, thread_name)
+    
+    if RetryEngine(conn, pacer, safety_config, config).run(dm_items(), dm_done) is None:
+        return False  # Quit or shutdown requested
+    
+    # Profile-grab stage: one batch over the shared browser session and the same pacer
+    if shared_profiles and not SHUTDOWN.is_set():
+        result = grab_shared_profiles(conn, list(shared_profiles.values()), pacer, safety_config, config)
+        if result is None:
+            return False  # Quit or shutdown requested
+        total_profiles = result
     
     if not SHUTDOWN.is_set():
         print(f"\nDM download complete!")
@@ -2290,10 +3621,17 @@ def process_liked_for_dump(conn, dump_path: str, pacer, safety_config: dict, con
 		print("No liked_posts.json found in this dump.")
 		return True  # nothing to do
 
-	posts = parse_liked_posts_json(liked_json)
+	account = dump_account_key(dump_path)
+	since_ms = get_watermark(conn, account, 'liked') if is_incremental(config) else 0
+	if since_ms:
+		print(f"[INCREMENTAL] Only likes newer than {datetime.fromtimestamp(since_ms / 1000):%Y-%m-%d %H:%M}")
+
+	posts = parse_liked_posts_json(liked_json, since_ms)
 	if not posts:
 		print("No liked posts to process.")
 		return True
+	# Capture now: the sidecar later replaces timestamp_ms with the publish time.
+	export_ts = [(p['shortcode'], p.get('timestamp_ms') or 0) for p in posts if p.get('shortcode')]
 
 	# Get download directory from config
 	download_base_dir = config.get('DOWNLOAD_DIRECTORY', os.path.join(os.path.dirname(__file__), 'downloads'))
@@ -2309,25 +3647,26 @@ def process_liked_for_dump(conn, dump_path: str, pacer, safety_config: dict, con
 
 	print(f"Found {len(filtered)} liked post(s). Starting downloads...")
 
-	for idx, post in enumerate(filtered, 1):
+	def liked_items():
+		for post in schedule_posts(filtered, config):
+			shortcode = post.get('shortcode')
+			if not shortcode:
+				continue
+			# If any source already downloaded this shortcode, skip silently (no DB write).
+			if is_downloaded(conn, shortcode):
+				print(f"[SKIP] {shortcode} already downloaded")
+				SESSION_TRACKER.record_download_skip()
+				continue
+			yield post, target_dir
+
+	if RetryEngine(conn, pacer, safety_config, config).run(liked_items()) is None:
 		if SHUTDOWN.is_set():
 			print("Shutdown requested. Exiting liked-posts loop.")
-			return False
-
-		shortcode = post.get('shortcode')
-		if not shortcode:
-			continue
-
-		# If any source already downloaded this shortcode, skip silently (no DB write).
-		if is_downloaded(conn, shortcode):
-			print(f"[SKIP] {shortcode} already downloaded")
-			SESSION_TRACKER.record_download_skip()
-			continue
-
-		ok = download_post(conn, post, target_dir, pacer=pacer, config=config)
-		if not ok and SHUTDOWN.is_set():
-			return False
+		return False  # Quit or shutdown requested
 
+	# Failed or skipped posts keep the mark below them so the next export queues them again
+	finished = settled_shortcodes(conn, [sc for sc, _ in export_ts])
+	update_watermark(conn, account, 'liked', completed_watermark(export_ts, finished))
 	print("Liked posts processing complete.")
 	return True
 
@@ -2343,8 +3682,13 @@ def process_saved_for_dump(conn, dump_path: str, pacer, safety_config: dict, con
 	saved_posts_json = os.path.join(dump_path, SAVED_POSTS_PATH)
 	saved_cols_json  = os.path.join(dump_path, SAVED_COLLECTIONS_PATH)
 
-	unsorted_posts = parse_saved_posts_json(saved_posts_json)
-	collected_posts = parse_saved_collections_json(saved_cols_json)
+	account = dump_account_key(dump_path)
+	since_ms = get_watermark(conn, account, 'saved') if is_incremental(config) else 0
+	if since_ms:
+		print(f"[INCREMENTAL] Only saves newer than {datetime.fromtimestamp(since_ms / 1000):%Y-%m-%d %H:%M}")
+
+	unsorted_posts = parse_saved_posts_json(saved_posts_json, since_ms)
+	collected_posts = parse_saved_collections_json(saved_cols_json, since_ms)
 
 	all_posts = []
 	seen = set()
@@ -2357,73 +3701,485 @@ def process_saved_for_dump(conn, dump_path: str, pacer, safety_config: dict, con
 	if not all_posts:
 		print("No saved posts found.")
 		return True
+	export_ts = [(p["shortcode"], p.get("timestamp_ms") or 0) for p in unsorted_posts + collected_posts if p.get("shortcode")]
 
 	download_base_dir = config.get("DOWNLOAD_DIRECTORY", os.path.join(os.path.dirname(__file__), "downloads"))
 
-	for i, post in enumerate(all_posts, 1):
+	def saved_items():
+		for post in schedule_posts(all_posts, config):
+			shortcode = post["shortcode"]
+			# Skip re-downloads if any source already succeeded for this shortcode
+			if is_downloaded(conn, shortcode):
+				print(f"[SKIP] Already downloaded {shortcode}")
+				continue
+			# Resolve target dir per collection
+			collection_name = post.get("_collection") or UNSORTED_COLLECTION_DIRNAME
+			yield post, ensure_collection_dir(download_base_dir, collection_name)
+
+	if RetryEngine(conn, pacer, safety_config, config).run(saved_items()) is None:
 		if SHUTDOWN.is_set():
 			print("[STOP] Cancelled by user.")
-			break
+		return False  # Quit or shutdown requested
 
-		shortcode = post["shortcode"]
-		# Skip re-downloads if any source already succeeded for this shortcode
-		if is_downloaded(conn, shortcode):
-			print(f"[SKIP] Already downloaded {shortcode}")
-			continue
+	if not SHUTDOWN.is_set():
+		finished = settled_shortcodes(conn, [sc for sc, _ in export_ts])
+		update_watermark(conn, account, "saved", completed_watermark(export_ts, finished))
+	return True
 
-		# Resolve target dir per collection
-		collection_name = post.get("_collection") or UNSORTED_COLLECTION_DIRNAME
-		target_dir = ensure_collection_dir(download_base_dir, collection_name)
+# --- Download scheduling (priorities + weighted fair sharing) ---
+SCHEDULE_ORDERS = ('export', 'newest', 'oldest')
 
-		retry_count = 0
-		while True:
-			try:
-				ok = download_post(conn, post, target_dir, pacer, config)
-				if ok and pacer:
-					pacer.after_success()
-				break
-
-			except RateLimitError:
-				SESSION_TRACKER.record_rate_limit()
-				base_delay = RATE_LIMIT_SCHEDULE[min(retry_count, len(RATE_LIMIT_SCHEDULE) - 1)]
-				delay = get_jittered_delay(base_delay)
-				print(f"[BLOCK] Rate limited. Retrying in {delay}s.")
-				if sleep_with_cancel(delay):
-					return False
-				retry_count += 1
-
-			except CheckpointError:
-				print("[BLOCK] Checkpoint/challenge. Use manual login then retry.")
-				resp = input("[Enter]=retry  |  M=manual login  |  S=skip  |  Q=quit > ").strip().lower()
-				if resp == "q": return False
-				if resp == "s":
-					record_failure(conn, post, "Skipped during checkpoint")
-					break
-				if resp == "m":
-					# Re-run your existing manual-login path
-					config = read_config()
-					profile_dir, cookie_file = resolve_profile_and_cookie(config)
-					manual_login_and_export_cookies(profile_dir, cookie_file)
-				# else retry
-
-			except LoginRequiredError:
-				print("[BLOCK] Login required. Revalidate cookies.")
-				resp = input("[M]=manual login  |  R=retry  |  S=skip  |  Q=quit > ").strip().lower()
-				if resp == "q": return False
-				if resp == "s":
-					record_failure(conn, post, "Skipped after login-required")
-					break
-				if resp == "m":
-					config = read_config()
-					profile_dir, cookie_file = resolve_profile_and_cookie(config)
-					manual_login_and_export_cookies(profile_dir, cookie_file)
-
-			except NotFoundError:
-				print(f"[SKIP] Unavailable/deleted/private: {shortcode}")
-				record_failure(conn, post, "Deleted/private/unavailable")
-				SESSION_TRACKER.record_download_skip()
-				break
-	return True
+class WorkScheduler:
+    """
+    Orders queued downloads when they are taken from the queue.
+    Items are grouped (DM thread, saved collection, source); groups share the
+    queue by weight (stride scheduling: a group of weight 2 gets two items for every
+    one of a weight-1 group), so one huge thread cannot starve the rest under
+    daily caps. Within a group items follow `order` ('export' keeps dump order,
+    'newest'/'oldest' sort by timestamp_ms), optionally with reels first.
+    """
+    def __init__(self, order: str = 'export', reels_first: bool = False, weights: dict = None):
+        self.order = order if order in SCHEDULE_ORDERS else 'export'
+        self.reels_first = reels_first
+        self.weights = weights or {}
+        self._groups = {}  # group -> list of (sort_key, seq, item)
+        self._seq = 0
+
+    def weight_for(self, group: str) -> float:
+        # Exact group ("dm:alice"), then its source ("dm"), then 1
+        w = self.weights.get(group, self.weights.get(group.split(':', 1)[0], 1.0))
+        return w if w > 0 else 1.0
+
+    def add(self, item, group: str, timestamp_ms: int = 0, is_reel: bool = False):
+        ts = timestamp_ms or 0
+        key = (0 if (self.reels_first and is_reel) else 1,
+               -ts if self.order == 'newest' else ts if self.order == 'oldest' else 0)
+        self._groups.setdefault(group, []).append((key, self._seq, item))
+        self._seq += 1
+
+    def __len__(self):
+        return sum(len(items) for items in self._groups.values())
+
+    def __iter__(self):
+        queues = {g: deque(item for _k, _s, item in sorted(items, key=lambda e: (e[0], e[1])))
+                  for g, items in self._groups.items()}
+        # Virtual pass per group; the lowest pass goes next (ties by first appearance)
+        passes = {g: 0.0 for g in queues}
+        rank = {g: i for i, g in enumerate(queues)}
+        while queues:
+            group = min(queues, key=lambda g: (passes[g], rank[g]))
+            yield queues[group].popleft()
+            passes[group] += 1.0 / self.weight_for(group)
+            if not queues[group]:
+                del queues[group]
+
+def parse_schedule_weights(raw: str) -> dict:
+    """SCHEDULE_WEIGHTS=dm=2,saved:Recipes=3,liked=0.5 -> {'dm': 2.0, 'saved:Recipes': 3.0, 'liked': 0.5}"""
+    weights = {}
+    for part in (raw or "").split(","):
+        if "=" not in part:
+            continue
+        name, value = part.rsplit("=", 1)
+        try:
+            weights[name.strip()] = float(value)
+        except ValueError:
+            print(f"[SCHEDULE] Ignoring invalid weight: {part.strip()}")
+    return weights
+
+def build_scheduler(config: dict) -> WorkScheduler:
+    return WorkScheduler(
+        order=get_cfg_str(config, "SCHEDULE_ORDER", "export").lower(),
+        reels_first=parse_bool(config.get("SCHEDULE_REELS_FIRST"), False),
+        weights=parse_schedule_weights(config.get("SCHEDULE_WEIGHTS")),
+    )
+
+def post_schedule_group(post: dict) -> str:
+    """Fair-share group of a post: its DM thread, saved collection, or source."""
+    source = post.get('source') or 'other'
+    if source == 'dm' and post.get('dm_thread'):
+        return f"dm:{post['dm_thread']}"
+    if source == 'saved':
+        return f"saved:{post.get('_collection') or UNSORTED_COLLECTION_DIRNAME}"
+    return source
+
+def schedule_posts(posts, config: dict, group_fn=None):
+    """Yield items in scheduler order. posts are post dicts, or (post, ...) tuples."""
+    scheduler = build_scheduler(config)
+    for entry in posts:
+        post = entry[0] if isinstance(entry, tuple) else entry
+        scheduler.add(entry, (group_fn or post_schedule_group)(post),
+                      post.get('timestamp_ms') or 0, '/reel/' in (post.get('url') or ''))
+    return iter(scheduler)
+
+# --- Cross-dump work planner ---
+PLAN_FILENAME = "work_plan.json"
+PLAN_SOURCES = ('dm', 'saved', 'liked')  # first occurrence of a shortcode wins in this order
+
+def get_download_base_dir(config: dict) -> str:
+    return config.get('DOWNLOAD_DIRECTORY', os.path.join(os.path.dirname(__file__), 'downloads'))
+
+def get_plan_path(config: dict) -> str:
+    return get_cfg_str(config, "PLAN_FILE", os.path.join(get_download_base_dir(config), PLAN_FILENAME))
+
+def plan_target_dir(post: dict, download_base_dir: str) -> str:
+    """Target folder for a post, matching what the per-source flows create."""
+    source = post.get('source')
+    if source == 'dm':
+        return os.path.join(download_base_dir, "dms", sanitize_filename(post.get('dm_thread') or '') or "thread")
+    if source == 'saved':
+        collection = post.get('_collection') or UNSORTED_COLLECTION_DIRNAME
+        return os.path.join(download_base_dir, SAVED_BASE_SUBDIR, sanitize_collection_name(collection))
+    return os.path.join(download_base_dir, sanitize_filename(source or '') or "thread")
+
+def collect_dump_posts(conn, dump_path: str, config: dict):
+    """
+    Parse every source of one dump.
+    Returns (posts_by_source, watermarks) where watermarks lists the marks to store
+    once the resulting plan has been executed.
+    """
+    account = dump_account_key(dump_path)
+    incremental = is_incremental(config)
+    since = lambda source, scope='': get_watermark(conn, account, source, scope) if incremental else 0
+    posts_by_source = {source: [] for source in PLAN_SOURCES}
+    watermarks = []
+
+    def add_watermark(source, posts, scope=''):
+        newest = max(((p.get('timestamp_ms') or 0) for p in posts), default=0)
+        if newest:
+            watermarks.append({'account': account, 'source': source, 'scope': scope, 'max_timestamp_ms': newest,
+                               'items': [[p['shortcode'], p.get('timestamp_ms') or 0] for p in posts]})
+
+    inbox_dir = os.path.join(dump_path, DM_INBOX_PATH)
+    if os.path.isdir(inbox_dir):
+        for root, dirs, files in os.walk(inbox_dir):
+            if 'message_1.json' not in files:
+                continue
+            thread_name = os.path.basename(root)
+            messages, _parts = load_dm_thread_messages(root)
+            thread_posts = [item for kind, item in iter_dm_shares(messages, thread_name, since('dm', thread_name)) if kind == 'post']
+            posts_by_source['dm'].extend(thread_posts)
+            add_watermark('dm', thread_posts, thread_name)
+
+    saved = (parse_saved_posts_json(os.path.join(dump_path, SAVED_POSTS_PATH), since('saved'))
+             + parse_saved_collections_json(os.path.join(dump_path, SAVED_COLLECTIONS_PATH), since('saved')))
+    posts_by_source['saved'] = saved
+    add_watermark('saved', saved)
+
+    liked = parse_liked_posts_json(os.path.join(dump_path, LIKED_PATH), since('liked'))
+    posts_by_source['liked'] = liked
+    add_watermark('liked', liked)
+
+    return posts_by_source, watermarks
+
+def build_work_plan(conn, dumps, config: dict) -> dict:
+    """
+    Walk all dumps and sources, dedupe by shortcode in memory and against the DB
+    (one set join), and decide per item:
+      download - first occurrence, not downloaded yet
+      link     - same post belongs in another folder; link/copy the primary file there
+      skip     - already downloaded or linked into this folder, a duplicate within it, unavailable,
+                 or failed recently (retried after FAILED_RETRY_HOURS, doubling per failure)
+    With ASK_FOR_SEND_MESSAGE_APPEND, one prompt decides for every planned DM post whether
+    its send text goes into the filename (never asked when unattended).
+    """
+    download_base_dir = get_download_base_dir(config)
+    entries = []
+    watermarks = []
+    for name, path in dumps:
+        if SHUTDOWN.is_set():
+            break
+        posts_by_source, dump_watermarks = collect_dump_posts(conn, path, config)
+        watermarks.extend(dump_watermarks)
+        for source in PLAN_SOURCES:
+            for post in posts_by_source[source]:
+                entries.append((name, post, plan_target_dir(post, download_base_dir)))
+
+    shortcodes = {post['shortcode'] for _, post, _ in entries}
+    downloaded = get_downloaded_paths(conn, shortcodes)
+    linked = get_linked_dirs(conn, shortcodes)
+    retry_hours = float(config.get("FAILED_RETRY_HOURS") or 6)
+    held = get_failure_holds(conn, shortcodes - set(downloaded), retry_hours)
+
+    send_posts = [post for _, post, _ in entries if post.get('source') == 'dm' and post.get('send_text')]
+    append_send = False
+    if send_posts and parse_bool(config.get("ASK_FOR_SEND_MESSAGE_APPEND"), False) and not UNATTENDED.is_set():
+        print(f"Detected {len(send_posts)} send messages (<1s after shares) in the planned DM posts.")
+        append_send = input("Append them to filenames when the plan runs? [y/N]: ").strip().lower() == 'y'
+    for post in send_posts:
+        post['append_send_for_this_run'] = append_send
+
+    items = []
+    placed = {}  # shortcode -> set of target dirs already covered by this plan
+    for dump_name, post, target_dir in entries:
+        shortcode = post['shortcode']
+        dirs = placed.setdefault(shortcode, set())
+        existing_path = downloaded.get(shortcode)
+        if target_dir in dirs:
+            decision, reason = 'skip', 'duplicate'
+        elif shortcode in held:
+            retry_after = held[shortcode]
+            decision, reason = 'skip', f'failed, retry after {retry_after} UTC' if retry_after else 'unavailable'
+        elif existing_path and os.path.dirname(os.path.abspath(existing_path)) == os.path.abspath(target_dir):
+            decision, reason = 'skip', 'already downloaded'
+        elif os.path.abspath(target_dir) in linked.get(shortcode, ()):
+            decision, reason = 'skip', 'already linked'
+        elif dirs or existing_path:
+            decision, reason = 'link', 'also in another folder'
+        elif shortcode in downloaded:
+            decision, reason = 'skip', 'already downloaded'
+        else:
+            decision, reason = 'download', ''
+        dirs.add(target_dir)
+        items.append({'decision': decision, 'reason': reason, 'dump': dump_name, 'target_dir': target_dir, 'post': post})
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'items': items,
+        'watermarks': watermarks,
+    }
+
+def write_work_plan(plan: dict, plan_path: str):
+    parent = os.path.dirname(plan_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    tmp = plan_path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, plan_path)
+
+def summarize_work_plan(plan: dict) -> dict:
+    counts = {'download': 0, 'link': 0, 'skip': 0}
+    for item in plan.get('items', []):
+        counts[item['decision']] = counts.get(item['decision'], 0) + 1
+    return counts
+
+def link_or_copy(src: str, dst: str) -> bool:
+    try:
+        os.link(src, dst)
+        return True
+    except Exception:
+        pass
+    try:
+        shutil.copy2(src, dst)
+        return True
+    except Exception as e:
+        print(f"[PLAN] Could not link {src} -> {dst}: {e}")
+        return False
+
+def execute_work_plan(conn, plan_path: str, pacer=None, safety_config=None, config=None, progress=None):
+    """
+    Execute a plan file without re-parsing any dump: downloads first, then links.
+    Re-running a partially executed plan is safe (downloaded items and existing links are skipped).
+    progress(done, total, post), when given, is called before each download.
+    Returns True when finished, False on quit/shutdown.
+    """
+    plan = _try_load_json(plan_path)
+    if not plan or 'items' not in plan:
+        print(f"[PLAN] No usable plan at {plan_path}")
+        return True
+
+    downloads = [it for it in plan['items'] if it['decision'] == 'download']
+    links = [it for it in plan['items'] if it['decision'] == 'link']
+    print(f"[PLAN] {len(downloads)} to download, {len(links)} to link (plan from {plan.get('created_at')})")
+
+    def plan_items():
+        for i, (post, item) in enumerate(schedule_posts([(it['post'], it) for it in downloads], config or {}), 1):
+            os.makedirs(item['target_dir'], exist_ok=True)
+            print(f"[PLAN] Downloading {i}/{len(downloads)}: {post['shortcode']} → {item['target_dir']}")
+            if progress:
+                progress(i, len(downloads), post)
+            yield post, item['target_dir']
+    
+    if RetryEngine(conn, pacer, safety_config, config).run(plan_items()) is None:
+        return False
+
+    # Links need the primary files' recorded paths
+    drain_postprocessing()
+    paths = get_downloaded_paths(conn, {it['post']['shortcode'] for it in links})
+    linked = 0
+    unlinked = set()
+    for item in links:
+        if SHUTDOWN.is_set():
+            return False
+        post = item['post']
+        src = paths.get(post['shortcode'])
+        if not src or not os.path.exists(src):
+            print(f"[PLAN] No local file yet for {post['shortcode']}; leaving link for a later run")
+            unlinked.add(post['shortcode'])
+            continue
+        os.makedirs(item['target_dir'], exist_ok=True)
+        dst = os.path.join(item['target_dir'], os.path.basename(src))
+        if os.path.exists(dst) or link_or_copy(src, dst):
+            record_link(conn, post, dst)  # the posts row keeps the primary file
+            linked += 1
+        else:
+            unlinked.add(post['shortcode'])
+    print(f"[PLAN] Linked {linked}/{len(links)} item(s)")
+
+    # Marks stop below the oldest item that failed or is still waiting on a link
+    marked = {sc for wm in plan.get('watermarks', []) for sc, _ in wm.get('items', [])}
+    done = settled_shortcodes(conn, marked) - unlinked
+    for wm in plan.get('watermarks', []):
+        mark = completed_watermark(wm['items'], done) if 'items' in wm else wm['max_timestamp_ms']
+        update_watermark(conn, wm['account'], wm['source'], mark, wm.get('scope', ''))
+    return True
+
+def work_planner_menu(conn, pacer, safety_config, config):
+    """Build a plan across all dumps, or execute the saved plan file."""
+    plan_path = get_plan_path(config)
+    while True:
+        print("\n=== Work Planner ===")
+        print("1. Build plan from all dumps")
+        print(f"2. Execute plan ({plan_path})")
+        print("b) Back to main menu")
+        choice = input("\nEnter your choice: ").strip().lower()
+        if choice == '1':
+            dumps = get_profile_dumps()
+            print(f"[PLAN] Scanning {len(dumps)} dump(s)...")
+            plan = build_work_plan(conn, dumps, config)
+            write_work_plan(plan, plan_path)
+            counts = summarize_work_plan(plan)
+            print(f"[PLAN] download={counts['download']}  link={counts['link']}  skip={counts['skip']}")
+            print(f"[PLAN] Written to {plan_path}")
+        elif choice == '2':
+            if not os.path.exists(plan_path):
+                print("[PLAN] No plan file yet. Build one first.")
+                continue
+            if execute_work_plan(conn, plan_path, pacer, safety_config, config) is False:
+                return False
+        elif choice == 'b':
+            return True
+        else:
+            print("Invalid choice. Please try again.")
+
+# --- Unattended daemon mode ---
+DAEMON_STATUS_FILENAME = "daemon_status.json"
+_DAEMON_STATUS = None
+
+class DaemonStatus:
+    """
+    The daemon's current state as a small JSON file, rewritten atomically on every
+    change, so a service manager, a cron check or a person can see what it is doing
+    (and why it is paused) without a terminal.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.state = 'starting'
+        self._lock = threading.Lock()
+
+    def update(self, state: str, message: str = '', **fields):
+        with self._lock:
+            self.state = state
+            status = {
+                'state': state,
+                'message': message,
+                'pid': os.getpid(),
+                'started_at': self.started_at,
+                'updated_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            if 'resume_at' in fields:
+                fields['resume_at'] = datetime.fromtimestamp(fields['resume_at']).isoformat(timespec='seconds')
+            status.update(fields)
+            try:
+                tmp = self.path + ".tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(status, f, ensure_ascii=False, indent=1)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(f"[DAEMON] Could not write status file {self.path}: {e}")
+
+def report_daemon_status(state: str, message: str = '', **fields):
+    """Update the daemon status file; a no-op outside daemon mode."""
+    if _DAEMON_STATUS is not None:
+        _DAEMON_STATUS.update(state, message, **fields)
+
+def get_daemon_status_path(config: dict) -> str:
+    return get_cfg_str(config, "DAEMON_STATUS_FILE", os.path.join(RUN_LOG_DIR or os.getcwd(), DAEMON_STATUS_FILENAME))
+
+def wait_for_valid_cookies(cookie_files, reason: str, require_change: bool = False):
+    """
+    Unattended replacement for the login prompts: mark the daemon paused and poll
+    until one of the cookie files validates again (refreshed from another machine,
+    or by a manual login run of the interactive tool).
+    
+    Args:
+        cookie_files: Cookie files to watch (one per suspended account)
+        reason: Pause reason for the status file ('checkpoint', 'login_required', ...)
+        require_change: Only accept a file rewritten after the pause began (a
+            checkpoint can leave cookies that still look valid)
+        
+    Returns:
+        The cookie file that validated, or None if a shutdown was requested.
+    """
+    config = read_config()
+    poll = float(config.get("DAEMON_COOKIE_POLL_SECONDS") or 300)
+    mtime = lambda path: os.path.getmtime(path) if os.path.exists(path) else 0
+    paused_mtimes = {path: mtime(path) for path in cookie_files}
+    print(f"[DAEMON] Paused ({reason}): refresh {', '.join(cookie_files)}; "
+          f"checking every {poll:.0f}s and resuming once the cookies validate")
+    report_daemon_status(f'paused_{reason}', "Refresh the cookies; the daemon resumes once they validate",
+                         cookie_files=list(cookie_files))
+    while not SHUTDOWN.is_set():
+        for path in cookie_files:
+            if require_change and mtime(path) == paused_mtimes[path]:
+                continue
+            if are_cookies_valid(path):
+                print(f"[DAEMON] Cookies in {path} validate again; resuming")
+                report_daemon_status('running', "Cookies valid again; resuming")
+                return path
+        if sleep_with_cancel(poll):
+            break
+    return None
+
+def run_daemon(conn, config: dict):
+    """
+    Run without a terminal: plan across all dumps, drain the plan within the caps
+    (the pacer sleeps until the cap window opens), then idle and rescan for new
+    dumps every DAEMON_IDLE_MINUTES. Checkpoints and login prompts pause the
+    daemon (see wait_for_valid_cookies) instead of blocking on stdin.
+    """
+    global _DAEMON_STATUS
+    UNATTENDED.set()
+    _DAEMON_STATUS = DaemonStatus(get_daemon_status_path(config))
+    print(f"[DAEMON] Unattended mode; status file: {_DAEMON_STATUS.path}")
+    report_daemon_status('starting', "Checking cookies")
+    try:
+        _, cookie_file = resolve_profile_and_cookie(config)
+        if not are_cookies_valid(cookie_file, use_cache=True) and wait_for_valid_cookies([cookie_file], 'login_required') is None:
+            return
+        safety_config = get_safety_config()
+        pacer = build_pacer(conn, safety_config, config)
+        build_account_rotation(conn, safety_config, config)
+        plan_path = get_plan_path(config)
+        idle_seconds = float(config.get("DAEMON_IDLE_MINUTES") or 30) * 60
+
+        def progress(done, total, post):
+            report_daemon_status('running', f"Downloading {done}/{total}",
+                                 done=done, total=total, shortcode=post.get('shortcode'))
+
+        cycle = 0
+        while not SHUTDOWN.is_set():
+            cycle += 1
+            dumps = get_profile_dumps()
+            report_daemon_status('planning', f"Scanning {len(dumps)} dump(s)", cycle=cycle)
+            plan = build_work_plan(conn, dumps, config)
+            write_work_plan(plan, plan_path)
+            counts = summarize_work_plan(plan)
+            print(f"[DAEMON] Cycle {cycle}: download={counts['download']}  link={counts['link']}  skip={counts['skip']}")
+            if counts['download'] or counts['link']:
+                if execute_work_plan(conn, plan_path, pacer, safety_config, config, progress=progress) is False:
+                    break
+                drain_postprocessing()
+            print(f"[DAEMON] Queue drained; next scan in {idle_seconds / 60:.0f} min")
+            report_daemon_status('idle', "Queue drained; waiting for new dumps",
+                                 cycle=cycle, resume_at=time.time() + idle_seconds)
+            if sleep_with_cancel(idle_seconds):
+                break
+    finally:
+        report_daemon_status('stopped', "Daemon stopped")
+        UNATTENDED.clear()
+        _DAEMON_STATUS = None
 
 def read_config():
     config = {}
@@ -2441,6 +4197,8 @@ def read_config():
     
     # Set defaults for optional config keys
     config.setdefault("APPEND_POST_DATE", "false")
+    config.setdefault("INCREMENTAL_MODE", "false")
+    config.setdefault("PROFILE_CRAWL_MODE", "dom")
     
     return config
 
@@ -2483,6 +4241,7 @@ def print_page(dumps, dump_availability, page):
             print("n) Next page")
         if page > 0:
             print("p) Previous page")
+    print("w) Work planner (all dumps)")
     print("c) Config Menu")
     print("q) Quit")
 
@@ -2615,6 +4374,120 @@ def edit_safety_values():
     else:
         print("No changes made.")
 
+# --- Offline pacing simulator ---
+# Per-download wall time (seconds) assumed when the DB has no recorded durations yet
+SIM_DEFAULT_DURATION_RANGE = (4.0, 15.0)
+
+def simulate_pacing(safety_cfg: dict, queue_size: int, durations_s=None, failure_rate: float = 0.0,
+                    seed_ts=None, rng_seed=None) -> dict:
+    """
+    Replay SafetyPacer on a virtual clock for a queue of downloads (runs instantly).
+    
+    Args:
+        safety_cfg: Safety settings (a SAFETY_PRESETS entry or get_safety_config())
+        queue_size: Number of downloads to simulate
+        durations_s: Observed per-download durations to resample; defaults to a
+            uniform SIM_DEFAULT_DURATION_RANGE
+        failure_rate: Share of downloads that fail (refunded cap tokens)
+        seed_ts: Real timestamps of recent downloads, so today's usage counts
+        rng_seed: Seed for reproducible runs
+        
+    Returns:
+        dict: eta_s, downloaded, posts_per_hour, seconds per activity
+              ('download', 'delay', 'long_break', 'cap_hourly', 'cap_daily')
+              and the post index at which each cap first binds
+    """
+    rng = random.Random(rng_seed)
+    now = [time.time() if seed_ts else 0.0]
+    start = now[0]
+    spent = {'download': 0.0, 'delay': 0.0, 'long_break': 0.0, 'cap_hourly': 0.0, 'cap_daily': 0.0}
+    first_bind = {'cap_hourly': None, 'cap_daily': None}
+    progress = {'done': 0}
+    pacer = None
+    
+    def sleeper(seconds, message, kind):
+        if kind == 'cap':
+            # Attribute the wait to whichever window is the binding one
+            kind = 'cap_daily' if pacer.day_bucket.wait_time(now[0]) >= pacer.hour_bucket.wait_time(now[0]) else 'cap_hourly'
+            if first_bind[kind] is None:
+                first_bind[kind] = progress['done']
+        spent[kind] += seconds
+        now[0] += seconds
+        return True
+    
+    pacer = SafetyPacer(safety_cfg, seed_ts, clock=lambda: now[0], sleeper=sleeper, rng=rng)
+    downloaded = 0
+    for _ in range(int(queue_size)):
+        pacer.acquire()
+        duration = rng.choice(durations_s) if durations_s else rng.uniform(*SIM_DEFAULT_DURATION_RANGE)
+        spent['download'] += duration
+        now[0] += duration
+        ok = rng.random() >= failure_rate
+        pacer.release(ok)
+        downloaded += ok
+        progress['done'] += 1
+    
+    eta_s = now[0] - start
+    return {
+        'eta_s': eta_s,
+        'downloaded': downloaded,
+        'posts_per_hour': downloaded / (eta_s / 3600) if eta_s > 0 else float('inf'),
+        'spent': spent,
+        'first_bind': first_bind,
+    }
+
+def _fmt_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    days, rem = divmod(seconds, 86400)
+    hours, rem = divmod(rem, 3600)
+    minutes = rem // 60
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m"
+
+def forecast_presets(conn, queue_size: int):
+    """Print a simulated ETA and time breakdown for every safety preset and the current settings."""
+    durations = get_recent_durations(conn)
+    if durations:
+        print(f"\n[FORECAST] Using {len(durations)} recorded download durations "
+              f"(median {sorted(durations)[len(durations) // 2]:.1f}s)")
+    else:
+        print(f"\n[FORECAST] No recorded durations yet; assuming {SIM_DEFAULT_DURATION_RANGE[0]:g}-"
+              f"{SIM_DEFAULT_DURATION_RANGE[1]:g}s per download")
+    seed_ts = get_recent_download_timestamps(conn, time.time() - 86400)
+    
+    rows = [(name, cfg) for name, cfg in SAFETY_PRESETS.items()]
+    rows.append(('current settings', get_safety_config()))
+    print(f"\nForecast for {queue_size} posts:")
+    print(f"{'Preset':<26}{'ETA':>9}{'posts/h':>9}{'download':>10}{'delays':>9}{'breaks':>9}{'hour cap':>10}{'day cap':>9}  binds at")
+    for name, cfg in rows:
+        r = simulate_pacing(cfg, queue_size, durations, seed_ts=seed_ts, rng_seed=1)
+        sp = r['spent']
+        binds = [f"{label} #{r['first_bind'][key]}" for key, label in (('cap_hourly', 'hourly'), ('cap_daily', 'daily'))
+                 if r['first_bind'][key] is not None]
+        pph = f"{r['posts_per_hour']:.0f}" if r['posts_per_hour'] != float('inf') else "-"
+        print(f"{name:<26}{_fmt_duration(r['eta_s']):>9}{pph:>9}{_fmt_duration(sp['download']):>10}"
+              f"{_fmt_duration(sp['delay']):>9}{_fmt_duration(sp['long_break']):>9}"
+              f"{_fmt_duration(sp['cap_hourly']):>10}{_fmt_duration(sp['cap_daily']):>9}  {', '.join(binds) or 'no cap'}")
+
+def pacing_forecast_menu():
+    """Ask for a queue size and print the preset forecast"""
+    while True:
+        raw = input("\nHow many posts are queued? (number or b to back): ").strip().lower()
+        if raw == 'b':
+            return
+        if raw.isdigit() and int(raw) > 0:
+            break
+        print("Please enter a positive number.")
+    db_path = os.path.join(os.path.dirname(__file__), 'downloaded_posts.db')
+    conn = init_db(db_path)
+    try:
+        forecast_presets(conn, int(raw))
+    finally:
+        close_db(conn)
+
 def settings_menu():
     """Main settings menu"""
     while True:
@@ -2622,6 +4495,7 @@ def settings_menu():
         print("1. View safety settings")
         print("2. Apply safety preset")
         print("3. Edit individual values")
+        print("4. Forecast run time per preset")
         print("b) Back to main menu")
         print("q) Quit")
         
@@ -2633,6 +4507,8 @@ def settings_menu():
             apply_safety_preset()
         elif choice == '3':
             edit_safety_values()
+        elif choice == '4':
+            pacing_forecast_menu()
         elif choice == 'b':
             break
         elif choice == 'q':
@@ -2641,7 +4517,17 @@ def settings_menu():
         else:
             print("Invalid choice. Please try again.")
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Download media referenced by Instagram data exports.")
+    parser.add_argument("--daemon", action="store_true",
+                        help="run unattended: drain the planned queue within the caps and pause (instead of prompting) on checkpoints/logins")
+    parser.add_argument("--startup-timing", action="store_true",
+                        help="measure the startup steps, print their timings and exit")
+    return parser.parse_args(argv)
+
+def main(args=None):
+    args = args or parse_args([])
+    preflight = Preflight()
     config = read_config()
     
     # Install signal handlers early
@@ -2656,45 +4542,78 @@ def main():
     # (optional) echo where failures will be recorded
     print(f"[LOG] Failures will append to: {FAIL_LOG_PATH}")
     
-    # --- Pre-flight ffmpeg check ---
-    if not check_ffmpeg_availability():
-        print_ffmpeg_warning()
-        # Continue anyway, but user is warned
+    # --- Pre-flight: independent checks run concurrently with the DB init ---
+    preflight.start('ffmpeg', check_ffmpeg_availability)
+    if not args.daemon:
+        _, cookie_file = resolve_profile_and_cookie(config)
+        preflight.start('cookies', startup_cookie_check, cookie_file,
+                        lambda result: preflight.update('cookies', 'cached_unconfirmed' if result == 'unreachable' else result))
+        preflight.start('dumps', scan_profile_dumps)
     
     # Initialize SQLite database
     db_path = os.path.join(os.path.dirname(__file__), 'downloaded_posts.db')
-    conn = init_db(db_path)
+    conn = preflight.run('database', init_db, db_path)
     
     try:
-        # --- New cookie gate with manual/automated login flow ---
-        if not ensure_valid_cookies(config):
-            print("[FATAL] Could not obtain valid cookies.")
+        if args.daemon:
+            if not preflight.result('ffmpeg'):
+                print_ffmpeg_warning()
+            run_daemon(conn, config)
             return
         
         # Initialize SafetyPacer
         safety_config = get_safety_config()
-        recent_timestamps = get_recent_download_timestamps(conn, time.time() - 86400)
-        pacer = SafetyPacer(safety_config, recent_timestamps)
+        pacer = build_pacer(conn, safety_config, config)
         
-        # Proceed to main script
-        dumps = get_profile_dumps()
+        # The menu only needs the dump list; cookies and ffmpeg fill in the status line
+        dumps, dump_availability = preflight.result('dumps')
+        preflight.mark('menu')
+        if args.startup_timing:
+            for name in ('ffmpeg', 'cookies'):
+                try:
+                    preflight.result(name)
+                except Exception:
+                    pass
+            preflight.mark('all done')
+            print(preflight.report())
+            return
         if not dumps:
             print("No profile dumps found.")
             return
         
-        dump_availability = {}
-        for name, path in dumps:
-            dump_availability[name] = scan_profile_dump(path)
+        downloads_ready = False
+        ffmpeg_warned = False
+        
+        def ready_to_download() -> bool:
+            """Finish what downloads depend on: the cookie gate (login if needed) and account rotation."""
+            nonlocal downloads_ready, ffmpeg_warned
+            if not ffmpeg_warned and not preflight.result('ffmpeg'):
+                print_ffmpeg_warning()
+                # Continue anyway, but user is warned
+            ffmpeg_warned = True
+            # The background recheck of cached cookies can report them invalid at any time
+            if preflight.done('cookies') and preflight.result('cookies') == 'invalid':
+                downloads_ready = False
+            if downloads_ready:
+                return True
+            # --- Cookie gate with manual/automated login flow ---
+            if not cookie_gate(preflight, lambda: ensure_valid_cookies(config, checked=True)):
+                print("[FATAL] Could not obtain valid cookies.")
+                return False
+            build_account_rotation(conn, safety_config, config)
+            downloads_ready = True
+            return True
         
         page = 0
         while True:
+            print(preflight_status_line(preflight))
             print_page(dumps, dump_availability, page)
             if len(dumps) > PAGE_SIZE:
-                prompt_msg = "Enter your choice (number, n, p, c, q): "
-                invalid_msg = f"Invalid option. Please enter a number between 1 and {len(dumps)}, 'n', 'p', 'c', or 'q'."
+                prompt_msg = "Enter your choice (number, n, p, w, c, q): "
+                invalid_msg = f"Invalid option. Please enter a number between 1 and {len(dumps)}, 'n', 'p', 'w', 'c', or 'q'."
             else:
-                prompt_msg = "Enter your choice (number, c, q): "
-                invalid_msg = f"Invalid option. Please enter a number between 1 and {len(dumps)}, 'c', or 'q'."
+                prompt_msg = "Enter your choice (number, w, c, q): "
+                invalid_msg = f"Invalid option. Please enter a number between 1 and {len(dumps)}, 'w', 'c', or 'q'."
             
             choice = input(prompt_msg).strip().lower()
             if choice.isdigit():
@@ -2722,10 +4641,13 @@ def main():
                             if 1 <= opt_num <= len(options):
                                 selected_option = options[opt_num-1]
                                 print(f"You selected: {selected_option}")
+                                if "Profile Posts Download" not in selected_option and not ready_to_download():
+                                    return
                                 
                                 # Handle different download options
                                 if "DM Download" in selected_option:
                                     result = process_dm_download(conn, selected_path, pacer, safety_config, config)
+                                    drain_postprocessing()
                                     if result is True:
                                         # Print download statistics only if completed
                                         print("\nDownload Statistics:")
@@ -2747,6 +4669,7 @@ def main():
                                     break
                                 elif "Liked Posts Download" in selected_option:
                                     result = process_liked_for_dump(conn, selected_path, pacer, safety_config, config)
+                                    drain_postprocessing()
                                     if result is True:
                                         print("\nDownload Statistics:")
                                         stats = get_download_stats(conn)
@@ -2762,6 +4685,7 @@ def main():
                                         break
                                 elif "Saved Posts Download" in selected_option:
                                     result = process_saved_for_dump(conn, selected_path, pacer, safety_config, config)
+                                    drain_postprocessing()
                                     if result is True:
                                         print("\nDownload Statistics:")
                                         stats = get_download_stats(conn)
@@ -2788,12 +4712,18 @@ def main():
                 page += 1
             elif len(dumps) > PAGE_SIZE and choice == 'p' and page > 0:
                 page -= 1
+            elif choice == 'w':
+                if not ready_to_download():
+                    return
+                if work_planner_menu(conn, pacer, safety_config, config) is False:
+                    return
             elif choice == 'c':
                 settings_menu()
                 # Refresh safety config after settings change
                 safety_config = get_safety_config()
-                recent_timestamps = get_recent_download_timestamps(conn, time.time() - 86400)
-                pacer = SafetyPacer(safety_config, recent_timestamps)
+                pacer = build_pacer(conn, safety_config, config)
+                if downloads_ready:
+                    build_account_rotation(conn, safety_config, config)
             elif choice == 'q':
                 print("Quitting.")
                 break
@@ -2802,6 +4732,9 @@ def main():
                 input("Press Enter to continue...")
     
     finally:
+        # Let pipelined post-processing record its last items before summarizing
+        drain_postprocessing()
+        
         # Print session summary on exit
         print(SESSION_TRACKER.get_session_summary())
         
@@ -2857,6 +4790,118 @@ def print_ffmpeg_warning():
     print("="*80)
     print()
 
+# --- Parallel startup preflight ---
+class Preflight:
+    """
+    Runs independent startup steps concurrently. start() puts a step on a worker
+    thread; run() times a step on the calling thread (e.g. the DB connection, which
+    belongs to the main thread). result(name) waits for a step and re-raises its
+    exception in the caller. Timings feed --startup-timing.
+    """
+    def __init__(self, started: float = None):
+        self.started = started if started is not None else time.perf_counter()
+        self._steps = {}
+        self._updates = {}  # name -> later result from the step's own background work
+        self.marks = {}
+
+    def start(self, name: str, fn, *args):
+        step = {'thread': None, 'result': None, 'error': None, 'start': time.perf_counter(), 'end': None}
+        def work():
+            try:
+                step['result'] = fn(*args)
+            except BaseException as e:  # SystemExit from config errors must reach the main thread
+                step['error'] = e
+            finally:
+                step['end'] = time.perf_counter()
+        step['thread'] = threading.Thread(target=work, name=f"preflight-{name}", daemon=True)
+        self._steps[name] = step
+        step['thread'].start()
+
+    def run(self, name: str, fn, *args):
+        step = {'thread': None, 'result': None, 'error': None, 'start': time.perf_counter(), 'end': None}
+        self._steps[name] = step
+        try:
+            step['result'] = fn(*args)
+            return step['result']
+        finally:
+            step['end'] = time.perf_counter()
+
+    def done(self, name: str) -> bool:
+        step = self._steps.get(name)
+        return bool(step) and step['end'] is not None
+
+    def result(self, name: str):
+        step = self._steps[name]
+        if step['thread'] is not None:
+            step['thread'].join()
+        if step['error'] is not None:
+            raise step['error']
+        return self._updates.get(name, step['result'])
+
+    def update(self, name: str, result):
+        """Replace a step's result once follow-up work finishes (e.g. the background cookie recheck)."""
+        self._updates[name] = result
+
+    def mark(self, name: str):
+        self.marks[name] = time.perf_counter()
+
+    def report(self) -> str:
+        lines = ["[STARTUP] Seconds since launch:"]
+        for name, step in self._steps.items():
+            end = step['end'] if step['end'] is not None else time.perf_counter()
+            lines.append(f"  {name:<10} {step['start'] - self.started:6.2f} -> {end - self.started:6.2f}  ({end - step['start']:.2f}s)")
+        for name, t in self.marks.items():
+            lines.append(f"  {name:<10} {t - self.started:6.2f}")
+        return "\n".join(lines)
+
+def startup_cookie_check(cookie_file, on_recheck=None) -> str:
+    """
+    Cookie preflight step: 'cached' (fresh cached validation; a live recheck runs in
+    the background and reports to on_recheck(result)), 'valid', 'invalid' or
+    'unreachable'. Never prompts.
+    """
+    if cached_cookie_validation(cookie_file):
+        check_cookies_in_background(cookie_file, on_done=on_recheck)
+        return 'cached'
+    return check_cookies_live(cookie_file)
+
+def cookie_gate(preflight, login) -> bool:
+    """
+    Download-time check of the 'cookies' preflight step (waits for it if needed).
+    When the startup check or the background recheck found the cookies invalid,
+    login() runs (True on success) and the step is marked valid again.
+    Returns False if the login failed.
+    """
+    if not preflight.done('cookies'):
+        print("[STARTUP] Waiting for the cookie check to finish...")
+    if preflight.result('cookies') != 'invalid':
+        return True
+    if not login():
+        return False
+    preflight.update('cookies', 'valid')
+    return True
+
+def scan_profile_dumps():
+    """The dump list and each dump's availability flags (what the menu shows)."""
+    dumps = get_profile_dumps()
+    return dumps, {name: scan_profile_dump(path) for name, path in dumps}
+
+def preflight_status_line(preflight) -> str:
+    """One line with the cookie and ffmpeg checks, 'checking...' while they run."""
+    def status(name, labels):
+        if not preflight.done(name):
+            return "checking..."
+        try:
+            return labels.get(preflight.result(name), "?")
+        except Exception:
+            return "check failed"
+    cookies = status('cookies', {'cached': "valid (cached, rechecking...)", 'valid': "valid",
+                                 'invalid': "INVALID (login before downloading)",
+                                 'unreachable': "not confirmed (Instagram unreachable)",
+                                 'cached_unconfirmed': "valid (cached; recheck could not reach Instagram)"})
+    ffmpeg = status('ffmpeg', {True: "found", False: "MISSING"})
+    return f"Cookies: {cookies} | ffmpeg: {ffmpeg}"
+
 # --- Session tracking for summary ---
 class SessionTracker:
     def __init__(self):
@@ -3093,4 +5138,4 @@ def enrich_post_from_sidecar(post_data: dict, saved_path: str, *, tool: str, bas
 		pass
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main(parse_args()) 
\ No newline at end of file
@@ -0,0 +1,197 @@
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "profile_grid")
+FIXTURE_USER = "alice"
+FIXTURE_PAGES = 25
+FIXTURE_POSTS = 300  # 25 feed pages of 12
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    feed_delay = 0.0
+
+    def do_GET(self):
+        if "/api/" in self.path and self.feed_delay:
+            time.sleep(self.feed_delay)  # stand-in for Instagram's feed latency
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GridServer:
+    """
+    Local stand-in for instagram.com serving the static profile grid fixture
+    (/<user>/ renders the grid, /api/v1/feed/user/<user>/page_N.json feeds it).
+    Point INSTAGRAM_BASE_URL at .base_url to crawl it.
+    """
+    def __init__(self, feed_delay: float = 0.0):
+        handler = type("GridHandler", (_Handler,), {"feed_delay": feed_delay})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), partial(handler, directory=FIXTURE_ROOT))
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, name="grid-server", daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class RoundTrips:
+    """
+    Counts WebDriver commands on the crawl's driver. Every command, element ones
+    included, is one HTTP round-trip to chromedriver through WebDriver.execute.
+    """
+    def __init__(self):
+        self.commands = Counter()  # 'execute_script' | 'find_elements' | other command names
+        self.extract = 0  # commands issued inside the link extractor
+        self.extractions = 0
+        self.scrolls = 0
+        self._extracting = False
+
+    def total(self) -> int:
+        return sum(self.commands.values())
+
+    @contextmanager
+    def counting(self, driver):
+        execute = driver.execute
+        def counted(command, params=None):
+            script = (params or {}).get("script")
+            if script is not None:
+                self.commands["execute_script"] += 1
+                if "scrollTo" in script:
+                    self.scrolls += 1
+            elif command.startswith("find"):
+                self.commands["find_elements"] += 1
+            else:
+                self.commands[command] += 1
+            if self._extracting:
+                self.extract += 1
+            return execute(command, params)
+        driver.execute = counted
+        try:
+            yield driver
+        finally:
+            del driver.execute
+
+    def extractor(self, extract):
+        def run(driver, username):
+            self.extractions += 1
+            self._extracting = True
+            try:
+                return extract(driver, username)
+            finally:
+                self._extracting = False
+        return run
+
+
+def extract_urls_per_element(driver, username):
+    """
+    The extraction crawl_profile_posts used before EXTRACT_LINKS_JS (kept for the
+    benchmark): find_elements per selector, then get_attribute and a caption lookup
+    per link, each its own round-trip.
+    """
+    from selenium.webdriver.common.by import By
+
+    urls = {}
+    post_data = {}
+    selectors = [
+        "a[href*='/p/']",
+        "a[href*='/reel/']",
+        "article a[href*='/p/']",
+        "article a[href*='/reel/']",
+        "div[role='button'] a[href*='/p/']",
+        "div[role='button'] a[href*='/reel/']"
+    ]
+    for selector in selectors:
+        try:
+            for link in driver.find_elements(By.CSS_SELECTOR, selector):
+                href = link.get_attribute('href')
+                if href and ('/p/' in href or '/reel/' in href):
+                    urls[href] = None
+                    try:
+                        caption_element = link.find_element(By.XPATH, ".//ancestor::article//div[contains(@class, 'caption') or contains(@class, 'text')]")
+                        caption = caption_element.text.strip()
+                        if caption:
+                            post_data[href] = caption
+                    except Exception:
+                        pass
+        except Exception:
+            pass
+    return list(urls), post_data
+
+
+def crawl_fixture(base_url: str, mode: str = "dom", scroll_wait: float = 2.0, extract: str = "script", trips: RoundTrips = None):
+    """
+    Drive crawl_profile_posts over the fixture grid with a throwaway browser profile.
+    extract: 'script' (the one-call EXTRACT_LINKS_JS) or 'elements' (extract_urls_per_element).
+    trips: optional RoundTrips that counts the crawl's WebDriver commands.
+    Returns (emitted [(url, meta)], outcome, seconds).
+    """
+    import tempfile
+    import social_export_tool as tool
+
+    config = {
+        "INSTAGRAM_BASE_URL": base_url,
+        "PROFILE_CRAWL_MODE": mode,
+        "PROFILE_MAX_SCROLLS": "0",
+        "PROFILE_SCROLL_WAIT": str(scroll_wait),
+    }
+    pool = tool.DriverPool(tempfile.mkdtemp(prefix="grid_fixture_chrome_"), capture_network=(mode == "network"))
+    get_driver_pool = tool.get_driver_pool
+    extract_urls = tool.extract_urls_from_current_page
+    tool.get_driver_pool = lambda account=None: pool  # keep the real profiles out of it
+    extractor = extract_urls_per_element if extract == "elements" else extract_urls
+    if trips is not None:
+        lease = pool.lease
+
+        @contextmanager
+        def counted_lease():
+            with lease() as driver, trips.counting(driver):
+                yield driver
+        pool.lease = counted_lease
+        extractor = trips.extractor(extractor)
+    tool.extract_urls_from_current_page = extractor
+    emitted = []
+    outcome = {}
+    started = time.perf_counter()
+    try:
+        tool.crawl_profile_posts(FIXTURE_USER, lambda url, meta: emitted.append((url, meta)), config, outcome)
+    finally:
+        elapsed = time.perf_counter() - started
+        pool.shutdown()
+        tool.get_driver_pool = get_driver_pool
+        tool.extract_urls_from_current_page = extract_urls
+    return emitted, outcome, elapsed
+
+
+if __name__ == "__main__":
+    # Benchmark: python tests/grid_server.py [dom|network] [runs] [feed_delay_seconds] [script|elements|both]
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    mode = sys.argv[1] if len(sys.argv) > 1 else "dom"
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    delay = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+    extracts = ("script", "elements") if (sys.argv[4] if len(sys.argv) > 4 else "both") == "both" else (sys.argv[4],)
+
+    with GridServer(feed_delay=delay) as server:
+        for run in range(1, runs + 1):
+            for extract in extracts:
+                trips = RoundTrips()
+                emitted, outcome, elapsed = crawl_fixture(server.base_url, mode, extract=extract, trips=trips)
+                per_scroll = max(trips.scrolls, 1)
+                print(f"run {run}: {mode:<7} {extract:<8} {len(emitted):3d}/{FIXTURE_POSTS} posts   "
+                      f"ended={outcome.get('ended'):<8} {elapsed:6.2f} s   "
+                      f"{elapsed / max(len(emitted), 1) * 1e3:7.1f} ms/post   {trips.scrolls:2d} scrolls   "
+                      f"round-trips/scroll: {trips.total() / per_scroll:7.1f} "
+                      f"(extract {trips.extract / per_scroll:7.1f}, "
+                      f"execute_script {trips.commands['execute_script'] / per_scroll:7.1f}, "
+                      f"find_elements {trips.commands['find_elements'] / per_scroll:7.1f})")
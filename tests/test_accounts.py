@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+pytest.importorskip("selenium")
+pytest.importorskip("webdriver_manager")
+import social_export_tool as tool
+
+
+def _paths(*parts):
+    return os.path.join(os.path.dirname(tool.__file__), *parts)
+
+
+def test_no_accounts_uses_profile_dir_and_cookie_file():
+    config = {"PROFILE_DIR": "/data/chrome_profile"}
+    assert tool.resolve_profile_and_cookie(config) == ("/data/chrome_profile", tool.COOKIE_FILE)
+
+
+def test_named_account_without_accounts_gets_its_own_paths():
+    config = {"PROFILE_DIR": "/data/chrome_profile"}
+    assert tool.resolve_profile_and_cookie(config, "bob") == (
+        _paths("profiles", "bob"), _paths("cookies", "bob_cookies.txt"))
+
+
+def test_first_account_keeps_the_single_account_login():
+    config = {"ACCOUNTS": "alice,bob", "PROFILE_DIR": "/data/chrome_profile"}
+    expected = ("/data/chrome_profile", tool.COOKIE_FILE)
+    assert tool.resolve_profile_and_cookie(config) == expected
+    assert tool.resolve_profile_and_cookie(config, "alice") == expected
+
+
+def test_other_accounts_default_to_their_own_paths():
+    config = {"ACCOUNTS": "alice,bob", "PROFILE_DIR": "/data/chrome_profile"}
+    assert tool.resolve_profile_and_cookie(config, "bob") == (
+        _paths("profiles", "bob"), _paths("cookies", "bob_cookies.txt"))
+
+
+def test_account_overrides_win():
+    config = {"ACCOUNTS": "alice,bob", "PROFILE_DIR": "/data/chrome_profile",
+              "ACCOUNT_ALICE_PROFILE_DIR": "/data/alice", "ACCOUNT_ALICE_COOKIE_FILE": "/data/alice.txt",
+              "ACCOUNT_BOB_COOKIE_FILE": '"/data/bob.txt"'}
+    assert tool.resolve_profile_and_cookie(config, "alice") == ("/data/alice", "/data/alice.txt")
+    assert tool.resolve_profile_and_cookie(config, "bob") == (_paths("profiles", "bob"), "/data/bob.txt")
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from dmshares import SEND_TEXT_WINDOW_MS, iter_dm_shares, load_dm_thread_messages
+
+FIXTURE_THREAD = os.path.join(os.path.dirname(__file__), "fixtures", "dm_pairing")
+BASE_MS = 1700000000000
+
+
+@pytest.fixture(scope="module")
+def thread():
+    messages, parts = load_dm_thread_messages(FIXTURE_THREAD)
+    posts, profiles = {}, []
+    for kind, item in iter_dm_shares(messages, "pairing"):
+        if kind == 'post':
+            posts[item['shortcode']] = item
+        else:
+            profiles.append(item)
+    return messages, parts, posts, profiles
+
+
+def test_parts_are_merged_oldest_first(thread):
+    messages, parts, _, _ = thread
+    assert parts == 2
+    stamps = [m["timestamp_ms"] for m in messages]
+    assert stamps == sorted(stamps)
+
+
+def test_send_text_is_the_senders_next_message(thread):
+    # Bob's "lol" comes first, but Alice's share pairs with Alice's next message
+    assert thread[2]["AAA111"]["send_text"] == "look at this"
+
+
+def test_send_text_window_is_strictly_under_one_second(thread):
+    posts = thread[2]
+    assert SEND_TEXT_WINDOW_MS == 1000
+    assert posts["BBB222"]["send_text"] is None      # exactly 1000 ms later
+    assert posts["CCC333"]["send_text"] == "just in time"  # 999 ms later
+
+
+def test_only_plain_text_pairs(thread):
+    # A photo message with a caption is not a send text
+    assert thread[2]["DDD444"]["send_text"] is None
+
+
+def test_pairs_across_export_parts(thread):
+    # Share in message_2.json, text in message_1.json; mojibake repaired on load
+    assert thread[2]["EEE555"]["send_text"] == "café time"
+
+
+def test_structured_shares_only_and_deduped(thread):
+    _, _, posts, profiles = thread
+    assert sorted(posts) == ["AAA111", "BBB222", "CCC333", "DDD444", "EEE555", "FFF666"]
+    assert posts["AAA111"]["timestamp_ms"] == BASE_MS  # first share wins
+    assert posts["FFF666"]["send_text"] is None        # decided at the end of the thread
+    assert [p["username"] for p in profiles] == ["carol_profile"]
+
+
+def test_since_ms_drops_older_shares():
+    messages, _ = load_dm_thread_messages(FIXTURE_THREAD)
+    shortcodes = [item['shortcode'] for kind, item in iter_dm_shares(messages, since_ms=BASE_MS + 30000) if kind == 'post']
+    # The later re-share of AAA111 is newer than the mark, so it counts again
+    assert sorted(shortcodes) == ["AAA111", "EEE555", "FFF666"]
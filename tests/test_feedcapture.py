@@ -0,0 +1,100 @@
+import json
+import urllib.request
+
+import pytest
+
+from feedcapture import GridMerge, grid_post_url, parse_feed_payload
+from grid_server import FIXTURE_PAGES, FIXTURE_POSTS, FIXTURE_USER, GridServer
+
+IG = "https://www.instagram.com"
+
+
+def _merge():
+    emitted = []
+    merge = GridMerge(lambda url, meta: emitted.append((url, meta)))
+    return merge, emitted
+
+
+def test_grid_post_url_normalizes_every_link_form():
+    assert grid_post_url(f"{IG}/p/AbCdE123/") == ("AbCdE123", f"{IG}/p/AbCdE123/")
+    assert grid_post_url(f"{IG}/alice/p/AbCdE123/") == ("AbCdE123", f"{IG}/p/AbCdE123/")
+    assert grid_post_url("http://127.0.0.1:8000/alice/reel/AbCdE123/?igsh=x") == ("AbCdE123", f"{IG}/reel/AbCdE123/")
+    assert grid_post_url(f"{IG}/alice/") is None
+    assert grid_post_url(f"{IG}/explore/tags/p/") is None
+
+
+def test_payload_metadata_merges_into_the_grid_item():
+    merge, emitted = _merge()
+    merge.add_feed([{"shortcode": "ReelOne1", "caption": "exact caption", "timestamp_ms": 1000, "original_owner": "alice"}])
+    href = f"{IG}/alice/reel/ReelOne1/"
+    merge.add_links([href, f"{IG}/reel/ReelOne1/"], {href: "grid caption…"})
+    merge.flush()
+    assert emitted == [(f"{IG}/reel/ReelOne1/",
+                        {"caption": "exact caption", "timestamp_ms": 1000, "original_owner": "alice"})]
+
+
+def test_link_before_payload_is_emitted_once():
+    merge, emitted = _merge()
+    merge.add_links([f"{IG}/p/PostOne1/"])
+    merge.add_feed([{"shortcode": "PostOne1", "caption": "late", "timestamp_ms": 1000}])
+    merge.add_links([f"{IG}/alice/p/PostOne1/"])
+    merge.flush()
+    assert [url for url, _ in emitted] == [f"{IG}/p/PostOne1/"]
+
+
+def test_flush_emits_payload_only_posts():
+    merge, emitted = _merge()
+    merge.add_feed([{"shortcode": "Unrendered1", "timestamp_ms": 5}])
+    merge.flush()
+    merge.flush()
+    assert emitted == [(f"{IG}/p/Unrendered1/", {"timestamp_ms": 5})]
+
+
+def test_publish_false_stops_the_merge():
+    calls = []
+    merge = GridMerge(lambda url, meta: calls.append(url) or len(calls) < 2)
+    merge.add_links([f"{IG}/p/First111/", f"{IG}/p/Second22/", f"{IG}/p/Third333/"])
+    merge.add_feed([{"shortcode": "Fourth44", "timestamp_ms": 1}])
+    merge.flush()
+    assert merge.stopped
+    assert calls == [f"{IG}/p/First111/", f"{IG}/p/Second22/"]
+
+
+@pytest.fixture(scope="module")
+def feed_pages():
+    with GridServer() as server:
+        pages = []
+        for page in range(1, FIXTURE_PAGES + 1):
+            url = f"{server.base_url}/api/v1/feed/user/{FIXTURE_USER}/page_{page}.json"
+            with urllib.request.urlopen(url, timeout=5) as res:
+                pages.append(json.loads(res.read().decode("utf-8")))
+        yield server.base_url, pages
+
+
+def test_stand_in_feed_and_grid_give_one_item_per_post(feed_pages):
+    base_url, pages = feed_pages
+    merge, emitted = _merge()
+    rendered = 0
+    for payload in pages:
+        # Network capture sees the payload before the page renders its links
+        merge.add_feed(parse_feed_payload(payload))
+        hrefs = []
+        for item in payload["items"]:
+            # Same link forms as tests/fixtures/profile_grid/alice/index.html
+            if item["product_type"] == "clips":
+                hrefs.append(f"{base_url}/reel/{item['code']}/")
+            elif rendered % 2:
+                hrefs.append(f"{base_url}/{FIXTURE_USER}/p/{item['code']}/")
+            else:
+                hrefs.append(f"{base_url}/p/{item['code']}/")
+            rendered += 1
+        merge.add_links(hrefs)
+    merge.flush()
+
+    urls = [url for url, _ in emitted]
+    assert len(urls) == len(set(urls)) == FIXTURE_POSTS
+    assert sum("/reel/" in url for url in urls) == FIXTURE_POSTS // 3
+    assert all(meta["timestamp_ms"] and meta["caption"] and meta["original_owner"] == FIXTURE_USER
+               for _, meta in emitted)
+    stamps = [meta["timestamp_ms"] for _, meta in emitted]
+    assert stamps == sorted(stamps, reverse=True)  # grid order, newest first
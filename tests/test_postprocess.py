@@ -0,0 +1,49 @@
+import pytest
+
+pytest.importorskip("selenium")
+pytest.importorskip("webdriver_manager")
+import social_export_tool as tool
+from db import init_db, record_download
+
+
+@pytest.fixture
+def conn(monkeypatch, tmp_path):
+    monkeypatch.setattr(tool, "_POSTPROCESSOR", None)
+    conn = init_db(str(tmp_path / "test.db"))
+    yield conn
+    conn.close()
+
+
+def _post(shortcode, ts):
+    return {'shortcode': shortcode, 'url': f"https://www.instagram.com/p/{shortcode}/", 'source': 'liked',
+            'timestamp_ms': ts}
+
+
+def _finalize(conn, post):
+    record_download(conn, post, None)
+
+
+def _broken_finalize(conn, post):
+    raise OSError("disk full")
+
+
+def test_failed_background_finalize_holds_the_watermark(conn):
+    posts = [_post("NEWEST", 3000), _post("MIDDLE", 2000), _post("OLDEST", 1000)]
+    processor = tool.get_postprocessor(conn)
+    processor.submit("NEWEST", _finalize, posts[0])
+    processor.submit("MIDDLE", _broken_finalize, posts[1])
+    processor.submit("OLDEST", _finalize, posts[2])
+
+    items = [(p['shortcode'], p['timestamp_ms']) for p in posts]
+    settled = tool.settled_shortcodes(conn, [sc for sc, _ in items])
+
+    assert not processor.is_pending("MIDDLE")
+    assert settled == {"NEWEST", "OLDEST"}
+    # The next export queues MIDDLE again
+    assert tool.completed_watermark(items, settled) == 1000
+
+
+def test_settled_shortcodes_counts_unavailable_posts(conn):
+    tool.record_failure(conn, _post("GONE", 2000), "Deleted/private/unavailable", terminal=True)
+    record_download(conn, _post("KEPT", 1000), None)
+    assert tool.settled_shortcodes(conn, ["GONE", "KEPT", "FAILED"]) == {"GONE", "KEPT"}
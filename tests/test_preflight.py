@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+pytest.importorskip("selenium")
+pytest.importorskip("webdriver_manager")
+import social_export_tool as tool
+
+
+def _start_cookie_step(monkeypatch, live_result):
+    """Cached cookies at startup; the background recheck reports live_result once released."""
+    release = threading.Event()
+    rechecked = threading.Event()
+
+    def live(cookie_file):
+        release.wait(5)
+        return live_result
+
+    monkeypatch.setattr(tool, "cached_cookie_validation", lambda cookie_file: True)
+    monkeypatch.setattr(tool, "check_cookies_live", live)
+    preflight = tool.Preflight()
+
+    def on_recheck(result):
+        preflight.update('cookies', 'cached_unconfirmed' if result == 'unreachable' else result)
+        rechecked.set()
+    preflight.start('cookies', tool.startup_cookie_check, "cookies.txt", on_recheck)
+    return preflight, release, rechecked
+
+
+def test_gate_passes_cached_cookies_without_login(monkeypatch):
+    preflight, release, rechecked = _start_cookie_step(monkeypatch, 'valid')
+    logins = []
+    assert tool.cookie_gate(preflight, lambda: logins.append(1) or True)
+    assert preflight.result('cookies') == 'cached'
+    assert logins == []
+    release.set()
+    assert rechecked.wait(5)
+    assert preflight.result('cookies') == 'valid'
+
+
+def test_gate_logs_in_after_background_recheck_reports_invalid(monkeypatch):
+    preflight, release, rechecked = _start_cookie_step(monkeypatch, 'invalid')
+    logins = []
+    # First download: only the cached validation is known
+    assert tool.cookie_gate(preflight, lambda: logins.append(1) or True)
+    assert logins == []
+
+    release.set()
+    assert rechecked.wait(5)
+    assert preflight.result('cookies') == 'invalid'
+
+    # Next download: the recheck's verdict forces the login flow, once
+    assert tool.cookie_gate(preflight, lambda: logins.append(1) or True)
+    assert logins == [1]
+    assert preflight.result('cookies') == 'valid'
+    assert tool.cookie_gate(preflight, lambda: logins.append(1) or True)
+    assert logins == [1]
+
+
+def test_gate_fails_when_login_fails(monkeypatch):
+    preflight, release, rechecked = _start_cookie_step(monkeypatch, 'invalid')
+    release.set()
+    assert rechecked.wait(5)
+    assert not tool.cookie_gate(preflight, lambda: False)
+    assert preflight.result('cookies') == 'invalid'
+
+
+def test_unreachable_recheck_keeps_cookies_usable(monkeypatch):
+    preflight, release, rechecked = _start_cookie_step(monkeypatch, 'unreachable')
+    release.set()
+    assert rechecked.wait(5)
+    assert preflight.result('cookies') == 'cached_unconfirmed'
+    assert tool.cookie_gate(preflight, lambda: pytest.fail("no login expected"))
@@ -0,0 +1,78 @@
+import json
+import re
+import shutil
+import urllib.error
+import urllib.request
+
+import pytest
+
+from grid_server import FIXTURE_PAGES, FIXTURE_POSTS, FIXTURE_USER, GridServer, RoundTrips, crawl_fixture
+
+GRID_SHORTCODE_RE = re.compile(r'/(?:p|reel)/([A-Za-z0-9_-]+)/')
+
+
+@pytest.fixture(scope="module")
+def server():
+    with GridServer() as srv:
+        yield srv
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=5) as res:
+        return res.read().decode("utf-8")
+
+
+def test_server_serves_grid_page_and_feed(server):
+    assert "loadNext" in _get(f"{server.base_url}/{FIXTURE_USER}/")
+    pages = []
+    for page in range(1, FIXTURE_PAGES + 1):
+        pages.append(json.loads(_get(f"{server.base_url}/api/v1/feed/user/{FIXTURE_USER}/page_{page}.json")))
+    assert sum(len(p["items"]) for p in pages) == FIXTURE_POSTS
+    assert [p["more_available"] for p in pages] == [True] * (FIXTURE_PAGES - 1) + [False]
+    with pytest.raises(urllib.error.HTTPError):
+        _get(f"{server.base_url}/api/v1/feed/user/{FIXTURE_USER}/page_{FIXTURE_PAGES + 1}.json")
+
+
+def _require_browser():
+    pytest.importorskip("selenium")
+    pytest.importorskip("webdriver_manager")
+    if not any(shutil.which(b) for b in ("google-chrome", "chromium", "chromium-browser", "chrome")):
+        pytest.skip("Chrome is not installed")
+
+
+def test_dom_crawl_walks_the_whole_grid(server):
+    _require_browser()
+    emitted, outcome, _ = crawl_fixture(server.base_url, "dom", scroll_wait=3)
+    shortcodes = {GRID_SHORTCODE_RE.search(url).group(1) for url, _ in emitted}
+    assert outcome["ended"] == "bottom"
+    assert len(shortcodes) == FIXTURE_POSTS
+
+
+def test_network_crawl_emits_each_post_once_with_feed_metadata(server):
+    _require_browser()
+    emitted, outcome, _ = crawl_fixture(server.base_url, "network", scroll_wait=3)
+    shortcodes = [GRID_SHORTCODE_RE.search(url).group(1) for url, _ in emitted]
+    assert outcome["ended"] == "bottom"
+    assert len(shortcodes) == len(set(shortcodes)) == FIXTURE_POSTS
+    assert all(meta.get("timestamp_ms") for _, meta in emitted)
+
+
+def test_dom_crawl_extracts_each_scroll_in_one_round_trip(server):
+    _require_browser()
+    trips = RoundTrips()
+    emitted, outcome, _ = crawl_fixture(server.base_url, "dom", scroll_wait=3, trips=trips)
+    assert outcome["ended"] == "bottom"
+    assert trips.scrolls >= FIXTURE_PAGES - 1
+    assert trips.extract == trips.extractions == trips.scrolls + 1
+
+
+def test_per_element_extraction_finds_the_same_posts_in_more_round_trips(server):
+    _require_browser()
+    script_trips, element_trips = RoundTrips(), RoundTrips()
+    by_script, _, _ = crawl_fixture(server.base_url, "dom", scroll_wait=3, trips=script_trips)
+    by_element, outcome, _ = crawl_fixture(server.base_url, "dom", scroll_wait=3, extract="elements", trips=element_trips)
+    assert outcome["ended"] == "bottom"
+    assert sorted(url for url, _ in by_element) == sorted(url for url, _ in by_script)
+    assert script_trips.extract == script_trips.extractions
+    # Every link costs at least a get_attribute and a caption lookup
+    assert element_trips.extract > 2 * FIXTURE_POSTS
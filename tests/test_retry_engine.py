@@ -0,0 +1,124 @@
+import types
+
+import pytest
+
+pytest.importorskip("selenium")
+pytest.importorskip("webdriver_manager")
+import social_export_tool as tool
+from db import init_db, get_post
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+        self.on_sleep = []  # (at, fn): run fn once the clock reaches `at`
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0)
+        for at, fn in list(self.on_sleep):
+            if self.now >= at:
+                self.on_sleep.remove((at, fn))
+                fn()
+        return False
+
+
+class FakeBreaker:
+    def __init__(self):
+        self.probes = 0
+
+    def allow_probe(self):
+        self.probes += 1
+
+
+@pytest.fixture
+def engine_env(monkeypatch, tmp_path):
+    clock = FakeClock()
+    cookie_file = tmp_path / "cookies.txt"
+    cookie_file.write_text("# Netscape HTTP Cookie File\n")
+    state = {'logged_in': False, 'attempts': [], 'prompts': [], 'valid': False}
+    account = types.SimpleNamespace(name=None, cookie_file=str(cookie_file), profile_dir=str(tmp_path / "profile"),
+                                    breaker=FakeBreaker(), suspended=None)
+
+    def attempt_download(conn, post, target_dir, pacer, config):
+        state['attempts'].append(post['shortcode'])
+        if not state['logged_in']:
+            raise tool.LoginRequiredError("login required")
+        return True
+
+    def prompt(text):
+        state['prompts'].append(text)
+        return "w"
+
+    monkeypatch.setattr(tool.time, "time", clock.time)
+    monkeypatch.setattr(tool, "sleep_with_cancel", clock.sleep)
+    monkeypatch.setattr(tool, "attempt_download", attempt_download)
+    monkeypatch.setattr(tool, "get_account_rotation", lambda: None)
+    monkeypatch.setattr(tool, "are_cookies_valid", lambda path, use_cache=False: state['valid'])
+    monkeypatch.setattr("builtins.input", prompt)
+    monkeypatch.setattr(tool.RetryEngine, "_blocked_accounts", lambda self: [account])
+    conn = init_db(str(tmp_path / "test.db"))
+    yield types.SimpleNamespace(clock=clock, cookie_file=cookie_file, state=state, account=account, conn=conn)
+    conn.close()
+
+
+def _run(env, shortcodes):
+    results = {}
+    items = [({'shortcode': code, 'url': f"https://www.instagram.com/p/{code}/", 'source': 'saved'}, "/tmp/out")
+              for code in shortcodes]
+    engine = tool.RetryEngine(env.conn)
+    done = engine.run(items, lambda post, target_dir, ok: results.__setitem__(post['shortcode'], ok))
+    return done, results
+
+
+def test_wait_keeps_login_items_until_the_cookie_file_changes(engine_env):
+    env = engine_env
+
+    def refresh():
+        env.cookie_file.write_text("# Netscape HTTP Cookie File\nrefreshed\n")
+        env.state['logged_in'] = True
+    # Cookies exported again two hours after the prompt
+    env.clock.on_sleep.append((env.clock.now + 7200, refresh))
+
+    done, results = _run(env, ["AAA", "BBB", "CCC"])
+
+    assert done is True
+    assert results == {"AAA": True, "BBB": True, "CCC": True}
+    assert len(env.state['prompts']) == 1  # later blocks are parked without asking again
+    # One blocked try each, then a single retry after the refresh: no attempt budget used up
+    assert sorted(env.state['attempts']) == ["AAA", "AAA", "BBB", "BBB", "CCC", "CCC"]
+    for code in results:
+        assert (get_post(env.conn, code) or {}).get('status') != 'failed'
+
+
+def test_wait_releases_login_items_once_the_cookies_validate(engine_env):
+    env = engine_env
+
+    def login_elsewhere():
+        env.state['valid'] = True
+        env.state['logged_in'] = True
+    env.clock.on_sleep.append((env.clock.now + 1000, login_elsewhere))
+    started = env.clock.now
+
+    done, results = _run(env, ["AAA", "BBB"])
+
+    assert done is True
+    assert results == {"AAA": True, "BBB": True}
+    # Released by the first live check after the login, not before
+    assert env.clock.now - started >= 1000
+    assert env.clock.now - started <= 1000 + tool.RetryEngine.park_poll + 5
+    assert env.account.breaker.probes == 0  # waiting leaves the breaker cooldown alone
+
+
+def test_retry_now_still_uses_up_the_attempts(engine_env, monkeypatch):
+    env = engine_env
+    monkeypatch.setattr("builtins.input", lambda text: env.state['prompts'].append(text) or "r")
+
+    done, results = _run(env, ["AAA"])
+
+    assert done is True
+    assert results == {"AAA": False}
+    assert env.state['attempts'] == ["AAA"] * tool.RETRY_POLICIES[tool.LoginRequiredError].attempts
+    assert get_post(env.conn, "AAA")['status'] == 'failed'
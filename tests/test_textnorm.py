@@ -0,0 +1,120 @@
+import random
+import re
+import unicodedata
+
+import pytest
+
+from textnorm import EARLY_TRUNCATE_FACTOR, clean_text_for_filename, normalize_caption_text, repair_mojibake
+
+BUDGET = 205  # MAX_BASENAME in social_export_tool
+
+
+# --- Reference: the pipeline as it was before textnorm (repair ran per string) ---
+def _old_mojibake_candidate(s):
+    return any('\u0080' <= ch <= 'ÿ' for ch in s)
+
+def _old_looks_much_better(a, b):
+    bad = "ÃÂØð¢¬¤§"
+    score = lambda s: (sum(ch.isalnum() for ch in s) - sum(ch in bad for ch in s))
+    return score(a) > score(b)
+
+def _old_repair_mojibake(s):
+    if not s: return s
+    if _old_mojibake_candidate(s):
+        try:
+            cand = s.encode('latin-1', 'ignore').decode('utf-8', 'ignore')
+            if _old_looks_much_better(cand, s):
+                return cand
+        except Exception:
+            pass
+    return s
+
+def _old_normalize_caption_text(s):
+    if not s:
+        return s
+    s = _old_repair_mojibake(s)
+    s = unicodedata.normalize("NFKC", s)
+    s = ''.join(ch if (ch >= ' ' and ch not in '​‌‍⁠') else ' ' for ch in s)
+    s = re.sub(r'\s+', ' ', s).strip()
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    return s
+
+def _old_sanitize_filename(filename):
+    filename = unicodedata.normalize('NFKD', filename)
+    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    filename = re.sub(r'\s+', ' ', filename)
+    return filename.strip()
+
+def _old_clean_text_for_filename(s, max_len=None):
+    if not s:
+        return s
+    s = _old_normalize_caption_text(s)
+    s = _old_sanitize_filename(s)
+    if max_len and len(s) > max_len:
+        s = s[:max_len-1] + '…'
+    return s
+
+
+def _new(raw, **kwargs):
+    # Export strings are repaired once at load time (load_export_json), then cleaned
+    return clean_text_for_filename(repair_mojibake(raw), **kwargs)
+
+
+SAMPLES = {
+    "ascii": "Sunset at the beach #travel",
+    "emoji": "Sunset 🌅 at the beach 🏖️🔥 #travel",
+    "cjk": "東京の夜景 Tokyo night view 夜景",
+    "accents": "Café con leche, buenos días, über naïve",
+    "fullwidth": "ｆｕｌｌｗｉｄｔｈ ｔｅｘｔ １２３",
+    "zero_width": "zero​width‌and‍joiner⁠text",
+    "controls": "line one\nline two\ttabbed\r\x07bell",
+    "bad_chars": 'a/b\\c:d*e?f"g<h>i|j',
+    "mojibake": "CafÃ© con leche â\u0098\u0095 buenos dÃ­as",
+    "mojibake_emoji": "Party time ð\u009f\u008e\u0089 with friends",
+    "whitespace": "   lots    of　 spaces   ",
+    "long_latin": "Long caption with many words. " * 60,
+    "long_mixed": ("Long caption with emojis 🎉🔥 and​zero-width   spacing, "
+                   "unicode ｆｕｌｌｗｉｄｔｈ and accents éàü. ") * 60,
+    "long_cjk_then_latin": "東京" * (BUDGET * EARLY_TRUNCATE_FACTOR) + " the latin part after the cutoff",
+    "long_emoji_then_latin": "🎉" * (BUDGET * EARLY_TRUNCATE_FACTOR + 7) + " caption text that must survive",
+}
+
+
+@pytest.mark.parametrize("name", sorted(SAMPLES))
+def test_matches_old_pipeline_within_budget(name):
+    raw = SAMPLES[name]
+    old = _old_clean_text_for_filename(raw)
+    new = _new(raw, budget=BUDGET)
+    assert new[:BUDGET] == old[:BUDGET]
+    if len(raw) <= BUDGET * EARLY_TRUNCATE_FACTOR:
+        assert new == old
+
+
+@pytest.mark.parametrize("name", sorted(SAMPLES))
+def test_max_len_matches_old_pipeline(name):
+    raw = SAMPLES[name]
+    assert _new(raw, max_len=60) == _old_clean_text_for_filename(raw, max_len=60)
+
+
+def test_latin_text_after_a_long_non_latin_prefix_is_kept():
+    new = _new(SAMPLES["long_cjk_then_latin"], budget=BUDGET)
+    assert new == "the latin part after the cutoff"
+
+
+def test_normalize_matches_old_on_repaired_input():
+    # The old pass left double spaces where the ASCII fold dropped emoji; the filename
+    # sanitizer collapsed them afterwards, the new pass collapses them itself
+    for raw in SAMPLES.values():
+        assert normalize_caption_text(repair_mojibake(raw)) == " ".join(_old_normalize_caption_text(raw).split())
+
+
+def test_random_strings_match_old_pipeline():
+    # No strings that are valid UTF-8 read as latin-1 here, so per-string repair is a no-op
+    alphabet = (list("abcdefghij KLMNOP 0123 .,#@_-/:*?") + list("éàüñ") + list("東京夜景한국어")
+                + ["🎉", "🔥", "🏖️", "​", "⁠", "\n", "\t", "　", " ", "ｆ", "１", "́"])
+    rng = random.Random(28)
+    for _ in range(3000):
+        raw = "".join(rng.choice(alphabet) for _ in range(rng.choice((5, 40, 200, 900, 1500))))
+        old = _old_clean_text_for_filename(raw)
+        new = clean_text_for_filename(raw, budget=BUDGET)
+        assert new[:BUDGET] == old[:BUDGET], raw